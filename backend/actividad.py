@@ -0,0 +1,69 @@
+# backend/actividad.py
+
+import os
+import threading
+from datetime import datetime
+
+from sqlalchemy import bindparam, update
+from sqlalchemy.orm import Session
+
+import models
+from escritor import ejecutar_escritura
+from tareas import TareaPeriodica
+
+# =====================================================================
+# ÚLTIMO ACCESO DE LOS USUARIOS
+# =====================================================================
+# get_current_user anota en memoria la hora de cada request autenticado;
+# cada ACTIVIDAD_FLUSH_INTERVALO segundos (y al apagar) se escriben todas
+# las pendientes en 'usuario.fecha_ultimo_acceso' con un solo UPDATE
+# (executemany) a través del escritor. Los accesos de un mismo usuario entre
+# dos escrituras se reducen al último.
+
+ACTIVIDAD_FLUSH_INTERVALO = float(os.getenv("ACTIVIDAD_FLUSH_INTERVALO", 5))
+
+_usuarios = models.Usuario.__table__
+
+
+def escribir_accesos(db: Session, accesos: dict):
+    """ Actualiza fecha_ultimo_acceso de {id_usuario: fecha}. No hace commit. """
+    db.execute(
+        update(_usuarios)
+        .where(_usuarios.c.id_usuario == bindparam("b_id_usuario"))
+        .values(fecha_ultimo_acceso=bindparam("b_fecha")),
+        [{"b_id_usuario": id_usuario, "b_fecha": fecha} for id_usuario, fecha in accesos.items()],
+    )
+
+
+class ActividadUsuarios:
+
+    def __init__(self):
+        self._pendientes = {}
+        self._lock = threading.Lock()
+
+    def registrar(self, id_usuario: int):
+        """ Anota un acceso del usuario (sin tocar la base). """
+        ahora = datetime.utcnow()
+        with self._lock:
+            self._pendientes[id_usuario] = ahora
+
+    def flush(self) -> int:
+        """ Escribe los accesos pendientes. Devuelve cuántos usuarios actualizó. """
+        with self._lock:
+            accesos, self._pendientes = self._pendientes, {}
+        if not accesos:
+            return 0
+        try:
+            ejecutar_escritura(escribir_accesos, accesos)
+        except Exception:
+            # Se reintentan en la próxima escritura, salvo los que ya
+            # tengan un acceso más nuevo
+            with self._lock:
+                for id_usuario, fecha in accesos.items():
+                    self._pendientes.setdefault(id_usuario, fecha)
+            raise
+        return len(accesos)
+
+
+actividad_usuarios = ActividadUsuarios()
+tarea_flush_actividad = TareaPeriodica("actividad-flush", ACTIVIDAD_FLUSH_INTERVALO, actividad_usuarios.flush)
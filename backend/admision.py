@@ -0,0 +1,207 @@
+# backend/admision.py
+
+import asyncio
+import itertools
+import os
+import time
+from bisect import insort
+from typing import NamedTuple, Optional
+
+from fastapi.responses import JSONResponse
+
+# =====================================================================
+# CONTROL DE ADMISIÓN
+# =====================================================================
+# Cada request de la API se clasifica según su ruta. Cada clase tiene un
+# máximo de requests en curso y una cola de espera acotada, y además hay un
+# tope global (ADMISION_CAPACIDAD, del orden del threadpool de Starlette).
+# Cuando se libera un lugar, entra primero quien espera en la clase más
+# prioritaria: un checkout pasa antes que la navegación del catálogo.
+#
+# Si la cola de la clase está llena, o el request espera más de lo que su
+# clase permite, se responde 503 con Retry-After sin llegar al handler: un
+# login (bcrypt) o un pedido lentos ya no frenan al resto de la API.
+
+ADMISION_CAPACIDAD = int(os.getenv("ADMISION_CAPACIDAD", 40))
+# Segundos que se sugieren al cliente antes de reintentar
+ADMISION_RETRY_AFTER = int(os.getenv("ADMISION_RETRY_AFTER", 1))
+
+
+class ClaseRuta(NamedTuple):
+    nombre: str
+    prioridad: int  # menor = pasa antes
+    limite: int     # requests de la clase en curso a la vez
+    cola: int       # requests de la clase que pueden esperar
+    espera: float   # segundos máximos en la cola
+
+
+CHECKOUT = ClaseRuta("checkout", 0, 8, 64, 10.0)
+AUTENTICACION = ClaseRuta("autenticacion", 1, 4, 32, 5.0)
+ESCRITURA = ClaseRuta("escritura", 1, 16, 64, 5.0)
+BANDEJA = ClaseRuta("bandeja", 2, 8, 32, 3.0)
+LECTURA = ClaseRuta("lectura", 2, 32, 128, 2.0)
+
+CLASES = (CHECKOUT, AUTENTICACION, ESCRITURA, BANDEJA, LECTURA)
+
+
+def clasificar(metodo: str, ruta: str) -> Optional[ClaseRuta]:
+    """ Clase de un request. None para lo que no es de la API (docs, raíz). """
+    if not ruta.startswith("/api/"):
+        return None
+    if ruta in ("/api/auth/login", "/api/auth/register"):
+        # bcrypt; /api/auth/refresh es una escritura común
+        return AUTENTICACION
+    if metodo in ("GET", "HEAD") or ruta == "/api/batch":
+        # El lote solo ejecuta GETs internos; los que no son de LECTURA
+        # piden su propio lugar desde api/batch.py
+        return BANDEJA if ruta == "/api/conversations" else LECTURA
+    if metodo == "POST" and ruta == "/api/orders":
+        return CHECKOUT
+    return ESCRITURA
+
+
+class _EstadoClase:
+
+    def __init__(self):
+        self.en_curso = 0
+        self.esperando = 0
+        self.admitidos = 0
+        self.encolados = 0
+        self.rechazados = 0  # cola llena
+        self.vencidos = 0    # esperaron más que 'espera'
+        self.espera_total = 0.0
+        self.espera_max = 0.0
+
+
+class ControlAdmision:
+    """
+    Lugares de ejecución por clase de ruta. Solo se usa desde el event loop
+    (el middleware), así que no necesita locks.
+    """
+
+    def __init__(self, capacidad: int = ADMISION_CAPACIDAD, clases=CLASES):
+        self.capacidad = capacidad
+        self._en_curso = 0
+        self._estados = {clase.nombre: _EstadoClase() for clase in clases}
+        # Entradas [prioridad, orden, clase, futuro], ordenadas
+        self._cola = []
+        self._orden = itertools.count()
+
+    def _hay_lugar(self, clase: ClaseRuta) -> bool:
+        return self._en_curso < self.capacidad and self._estados[clase.nombre].en_curso < clase.limite
+
+    def _ocupar(self, clase: ClaseRuta):
+        self._en_curso += 1
+        estado = self._estados[clase.nombre]
+        estado.en_curso += 1
+        estado.admitidos += 1
+
+    async def entrar(self, clase: ClaseRuta) -> bool:
+        """ Espera un lugar para un request de 'clase'. False si se lo descarta. """
+        estado = self._estados[clase.nombre]
+        # Tras cada salida se despacha la cola, así que quien espera no
+        # puede entrar todavía: solo se pasa directo si nadie de la clase espera
+        if not estado.esperando and self._hay_lugar(clase):
+            self._ocupar(clase)
+            return True
+        if estado.esperando >= clase.cola:
+            estado.rechazados += 1
+            return False
+
+        futuro = asyncio.get_running_loop().create_future()
+        entrada = [clase.prioridad, next(self._orden), clase, futuro]
+        insort(self._cola, entrada)
+        estado.esperando += 1
+        estado.encolados += 1
+        inicio = time.monotonic()
+        try:
+            await asyncio.wait_for(futuro, clase.espera)
+            return True
+        except asyncio.TimeoutError:
+            estado.vencidos += 1
+            return False
+        except BaseException:
+            # Cliente desconectado: si ya tenía el lugar, se libera
+            if futuro.done() and not futuro.cancelled():
+                self.salir(clase)
+            raise
+        finally:
+            if futuro.cancelled() and entrada in self._cola:
+                self._cola.remove(entrada)
+            estado.esperando -= 1
+            espera = time.monotonic() - inicio
+            estado.espera_total += espera
+            estado.espera_max = max(estado.espera_max, espera)
+
+    def salir(self, clase: ClaseRuta):
+        """ Libera el lugar de un request terminado y deja entrar a los que esperan. """
+        self._en_curso -= 1
+        self._estados[clase.nombre].en_curso -= 1
+        self._despachar()
+
+    def _despachar(self):
+        pendientes = []
+        for entrada in self._cola:
+            clase, futuro = entrada[2], entrada[3]
+            if futuro.done():
+                # Venció o se canceló mientras esperaba
+                continue
+            if self._hay_lugar(clase):
+                self._ocupar(clase)
+                futuro.set_result(None)
+            else:
+                pendientes.append(entrada)
+        self._cola = pendientes
+
+    def metricas(self) -> dict:
+        """ Estado y contadores acumulados de cada clase. """
+        return {
+            nombre: {
+                "en_curso": estado.en_curso,
+                "esperando": estado.esperando,
+                "admitidos": estado.admitidos,
+                "encolados": estado.encolados,
+                "rechazados": estado.rechazados,
+                "vencidos": estado.vencidos,
+                "espera_promedio_ms": round(estado.espera_total * 1000 / estado.encolados, 3) if estado.encolados else 0.0,
+                "espera_max_ms": round(estado.espera_max * 1000, 3),
+            }
+            for nombre, estado in self._estados.items()
+        }
+
+
+control_admision = ControlAdmision()
+
+# =====================================================================
+# MIDDLEWARE
+# =====================================================================
+
+class AdmisionMiddleware:
+    """
+    Middleware ASGI que pasa cada request de la API por el control de
+    admisión. El lugar se libera cuando termina de enviarse la respuesta
+    (incluidas las de streaming).
+    """
+
+    def __init__(self, app, control: ControlAdmision = control_admision):
+        self.app = app
+        self.control = control
+
+    async def __call__(self, scope, receive, send):
+        clase = clasificar(scope["method"], scope["path"]) if scope["type"] == "http" else None
+        if clase is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.control.entrar(clase):
+            respuesta = JSONResponse(
+                {"detail": "El servidor está ocupado. Intenta nuevamente."},
+                status_code=503,
+                headers={"Retry-After": str(ADMISION_RETRY_AFTER)},
+            )
+            await respuesta(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.control.salir(clase)
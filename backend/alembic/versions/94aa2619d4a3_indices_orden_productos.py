@@ -0,0 +1,38 @@
+"""Indices de orden para productos
+
+Revision ID: 94aa2619d4a3
+Revises: 7fac33b71a0c
+Create Date: 2026-10-18 10:12:41.512304
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '94aa2619d4a3'
+down_revision: Union[str, Sequence[str], None] = '7fac33b71a0c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index('ix_productos_categoria_precio', 'productos', ['categoria', 'precio', 'id_producto'], unique=False)
+    op.create_index('ix_productos_categoria_fecha', 'productos', ['categoria', 'fecha_agregado', 'id_producto'], unique=False)
+    op.create_index('ix_productos_categoria_nombre', 'productos', ['categoria', 'nombre_producto', 'id_producto'], unique=False)
+    op.create_index('ix_productos_precio', 'productos', ['precio', 'id_producto'], unique=False)
+    op.create_index('ix_productos_fecha', 'productos', ['fecha_agregado', 'id_producto'], unique=False)
+    op.create_index('ix_productos_nombre', 'productos', ['nombre_producto', 'id_producto'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_productos_nombre', table_name='productos')
+    op.drop_index('ix_productos_fecha', table_name='productos')
+    op.drop_index('ix_productos_precio', table_name='productos')
+    op.drop_index('ix_productos_categoria_nombre', table_name='productos')
+    op.drop_index('ix_productos_categoria_fecha', table_name='productos')
+    op.drop_index('ix_productos_categoria_precio', table_name='productos')
@@ -0,0 +1,36 @@
+"""Tabla productos_relacionados e índice de itemspedido por pedido
+
+Revision ID: a83d5f2c9b17
+Revises: f71c2a9d4e60
+Create Date: 2026-10-18 23:58:31.417206
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a83d5f2c9b17'
+down_revision: Union[str, Sequence[str], None] = 'f71c2a9d4e60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('productos_relacionados',
+    sa.Column('id_producto', sa.Integer(), nullable=False),
+    sa.Column('posicion', sa.Integer(), nullable=False),
+    sa.Column('id_relacionado', sa.Integer(), nullable=False),
+    sa.Column('pedidos', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id_producto', 'posicion')
+    )
+    op.create_index('ix_itemspedido_pedido_producto', 'itemspedido', ['id_pedido', 'id_producto'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_itemspedido_pedido_producto', table_name='itemspedido')
+    op.drop_table('productos_relacionados')
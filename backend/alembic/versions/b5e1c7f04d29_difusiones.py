@@ -0,0 +1,42 @@
+"""Tabla difusiones
+
+Revision ID: b5e1c7f04d29
+Revises: a83d5f2c9b17
+Create Date: 2026-10-19 00:41:07.258913
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b5e1c7f04d29'
+down_revision: Union[str, Sequence[str], None] = 'a83d5f2c9b17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('difusiones',
+    sa.Column('id_difusion', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('id_mensaje', sa.Integer(), nullable=False),
+    sa.Column('id_usuario', sa.Integer(), nullable=False),
+    sa.Column('destino', sa.String(length=20), nullable=False),
+    sa.Column('tipo_usuario', sa.String(length=20), nullable=True),
+    sa.Column('total', sa.Integer(), nullable=False),
+    sa.Column('enviados', sa.Integer(), nullable=False),
+    sa.Column('estado', sa.String(length=20), nullable=False),
+    sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+    sa.Column('fecha_fin', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['id_mensaje'], ['mensajes.id_mensaje'], ),
+    sa.ForeignKeyConstraint(['id_usuario'], ['usuario.id_usuario'], ),
+    sa.PrimaryKeyConstraint('id_difusion')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('difusiones')
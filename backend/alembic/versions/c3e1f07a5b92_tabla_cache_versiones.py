@@ -0,0 +1,32 @@
+"""Tabla cache_versiones para invalidar cachés entre workers
+
+Revision ID: c3e1f07a5b92
+Revises: 94aa2619d4a3
+Create Date: 2026-10-18 12:03:17.208455
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e1f07a5b92'
+down_revision: Union[str, Sequence[str], None] = '94aa2619d4a3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('cache_versiones',
+    sa.Column('nombre', sa.String(length=50), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('nombre')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('cache_versiones')
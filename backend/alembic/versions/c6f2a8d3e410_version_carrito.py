@@ -0,0 +1,29 @@
+"""Versión de cada carrito
+
+Revision ID: c6f2a8d3e410
+Revises: b5e1c7f04d29
+Create Date: 2026-10-19 10:12:44.518203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c6f2a8d3e410'
+down_revision: Union[str, Sequence[str], None] = 'b5e1c7f04d29'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('carrito', sa.Column('version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.batch_alter_table('carrito') as batch_op:
+        batch_op.drop_column('version')
@@ -0,0 +1,52 @@
+"""Rollups diarios de ventas para la analítica de pedidos
+
+Revision ID: d84b2c6e1f03
+Revises: c3e1f07a5b92
+Create Date: 2026-10-18 19:41:52.613027
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd84b2c6e1f03'
+down_revision: Union[str, Sequence[str], None] = 'c3e1f07a5b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('ventas_diarias',
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('pedidos', sa.Integer(), nullable=False),
+    sa.Column('unidades', sa.Integer(), nullable=False),
+    sa.Column('ingresos', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('fecha')
+    )
+    op.create_table('ventas_productos_diarias',
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('id_producto', sa.Integer(), nullable=False),
+    sa.Column('unidades', sa.Integer(), nullable=False),
+    sa.Column('ingresos', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('fecha', 'id_producto')
+    )
+    op.create_table('ventas_categorias_diarias',
+    sa.Column('fecha', sa.Date(), nullable=False),
+    sa.Column('categoria', sa.String(length=50), nullable=False),
+    sa.Column('unidades', sa.Integer(), nullable=False),
+    sa.Column('ingresos', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('fecha', 'categoria')
+    )
+    op.create_index('ix_pedidos_fecha_pedido', 'pedidos', ['fecha_pedido'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_pedidos_fecha_pedido', table_name='pedidos')
+    op.drop_table('ventas_categorias_diarias')
+    op.drop_table('ventas_productos_diarias')
+    op.drop_table('ventas_diarias')
@@ -0,0 +1,55 @@
+"""Tablas de archivo de mensajería e índices de conversaciones
+
+Revision ID: e5a0d9b37c18
+Revises: d84b2c6e1f03
+Create Date: 2026-10-18 21:07:33.481250
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e5a0d9b37c18'
+down_revision: Union[str, Sequence[str], None] = 'd84b2c6e1f03'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('conversaciones_archivo',
+    sa.Column('id_conversacion', sa.Integer(), nullable=False),
+    sa.Column('id_usuario_remitente', sa.Integer(), nullable=False),
+    sa.Column('id_usuario_destinatario', sa.Integer(), nullable=False),
+    sa.Column('id_mensaje', sa.Integer(), nullable=False),
+    sa.Column('fecha_envio', sa.DateTime(), nullable=True),
+    sa.Column('leido', sa.Boolean(), nullable=True),
+    sa.Column('tipo_participacion', sa.String(length=20), nullable=True),
+    sa.PrimaryKeyConstraint('id_conversacion')
+    )
+    op.create_index('ix_conversaciones_archivo_par_fecha', 'conversaciones_archivo', ['id_usuario_remitente', 'id_usuario_destinatario', 'fecha_envio'], unique=False)
+    op.create_table('mensajes_archivo',
+    sa.Column('id_mensaje', sa.Integer(), nullable=False),
+    sa.Column('id_usuario', sa.Integer(), nullable=False),
+    sa.Column('asunto', sa.String(length=200), nullable=False),
+    sa.Column('mensaje', sa.Text(), nullable=False),
+    sa.Column('fecha_mensaje', sa.DateTime(), nullable=True),
+    sa.Column('estado', sa.String(length=20), nullable=True),
+    sa.Column('tipo', sa.String(length=50), nullable=True),
+    sa.Column('email_contacto', sa.String(length=100), nullable=True),
+    sa.PrimaryKeyConstraint('id_mensaje')
+    )
+    op.create_index('ix_conversaciones_par_fecha', 'conversaciones', ['id_usuario_remitente', 'id_usuario_destinatario', 'fecha_envio'], unique=False)
+    op.create_index('ix_conversaciones_mensaje', 'conversaciones', ['id_mensaje'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_conversaciones_mensaje', table_name='conversaciones')
+    op.drop_index('ix_conversaciones_par_fecha', table_name='conversaciones')
+    op.drop_table('mensajes_archivo')
+    op.drop_index('ix_conversaciones_archivo_par_fecha', table_name='conversaciones_archivo')
+    op.drop_table('conversaciones_archivo')
@@ -0,0 +1,45 @@
+"""Tabla refresh_tokens
+
+Revision ID: f71c2a9d4e60
+Revises: e5a0d9b37c18
+Create Date: 2026-10-18 23:20:14.902331
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f71c2a9d4e60'
+down_revision: Union[str, Sequence[str], None] = 'e5a0d9b37c18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('refresh_tokens',
+    sa.Column('id_refresh_token', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('id_usuario', sa.Integer(), nullable=False),
+    sa.Column('token_hash', sa.String(length=64), nullable=False),
+    sa.Column('familia', sa.String(length=32), nullable=False),
+    sa.Column('fecha_creacion', sa.DateTime(), nullable=True),
+    sa.Column('fecha_expiracion', sa.DateTime(), nullable=False),
+    sa.Column('usado', sa.Boolean(), nullable=False),
+    sa.Column('revocado', sa.Boolean(), nullable=False),
+    sa.ForeignKeyConstraint(['id_usuario'], ['usuario.id_usuario'], ),
+    sa.PrimaryKeyConstraint('id_refresh_token')
+    )
+    op.create_index('ix_refresh_tokens_hash', 'refresh_tokens', ['token_hash'], unique=True)
+    op.create_index('ix_refresh_tokens_familia', 'refresh_tokens', ['familia'], unique=False)
+    op.create_index('ix_refresh_tokens_usuario', 'refresh_tokens', ['id_usuario'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_refresh_tokens_usuario', table_name='refresh_tokens')
+    op.drop_index('ix_refresh_tokens_familia', table_name='refresh_tokens')
+    op.drop_index('ix_refresh_tokens_hash', table_name='refresh_tokens')
+    op.drop_table('refresh_tokens')
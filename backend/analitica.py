@@ -0,0 +1,163 @@
+# backend/analitica.py
+# Rollups de ventas (tablas ventas_*_diarias) para los reportes de
+# api/analytics.py. create_order los actualiza dentro de su transacción; para
+# reconstruirlos desde el histórico de pedidos, desde backend/:
+#
+#   python analitica.py [--desde AAAA-MM-DD] [--hasta AAAA-MM-DD] [--dias 7]
+#
+# El backfill recalcula de a 'dias' días por transacción, así no bloquea al
+# escritor de la app por mucho tiempo y puede correr con la app levantada.
+
+import argparse
+from datetime import date, datetime, time, timedelta
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+import models
+from database import SessionLocal
+
+_ventas = models.VentaDiaria.__table__
+_ventas_productos = models.VentaProductoDiaria.__table__
+_ventas_categorias = models.VentaCategoriaDiaria.__table__
+
+ANALITICA_DIAS_POR_LOTE = 7
+
+
+def _acumular(db: Session, tabla, claves: list, filas: list):
+    """ Suma 'filas' a los acumulados existentes (upsert con executemany). """
+    stmt = sqlite_insert(tabla)
+    db.execute(
+        stmt.on_conflict_do_update(
+            index_elements=claves,
+            set_={c.name: c + stmt.excluded[c.name] for c in tabla.c if c.name not in claves},
+        ),
+        filas,
+    )
+
+
+def registrar_pedido(db: Session, fecha: date, total: float, lineas: list):
+    """
+    Suma un pedido a los rollups. 'lineas' es una lista de
+    (id_producto, categoria, cantidad, subtotal). No hace commit.
+    """
+    por_producto = {}
+    por_categoria = {}
+    for id_producto, categoria, cantidad, subtotal in lineas:
+        acumulado = por_producto.setdefault(id_producto, [0, 0.0])
+        acumulado[0] += cantidad
+        acumulado[1] += subtotal
+        acumulado = por_categoria.setdefault(categoria, [0, 0.0])
+        acumulado[0] += cantidad
+        acumulado[1] += subtotal
+
+    _acumular(db, _ventas, ["fecha"], [{
+        "fecha": fecha,
+        "pedidos": 1,
+        "unidades": sum(cantidad for _, _, cantidad, _ in lineas),
+        "ingresos": total,
+    }])
+    _acumular(db, _ventas_productos, ["fecha", "id_producto"], [
+        {"fecha": fecha, "id_producto": id_producto, "unidades": unidades, "ingresos": ingresos}
+        for id_producto, (unidades, ingresos) in por_producto.items()
+    ])
+    _acumular(db, _ventas_categorias, ["fecha", "categoria"], [
+        {"fecha": fecha, "categoria": categoria, "unidades": unidades, "ingresos": ingresos}
+        for categoria, (unidades, ingresos) in por_categoria.items()
+    ])
+
+
+# =====================================================================
+# BACKFILL
+# =====================================================================
+
+def _reconstruir_lote(db: Session, inicio: date, fin: date):
+    """ Recalcula los rollups de los días [inicio, fin] en una sola transacción. """
+    Pedido, ItemPedido, Producto = models.Pedido, models.ItemPedido, models.Producto
+    dia = func.date(Pedido.fecha_pedido)
+    en_rango = (
+        (Pedido.fecha_pedido >= datetime.combine(inicio, time.min))
+        & (Pedido.fecha_pedido < datetime.combine(fin + timedelta(days=1), time.min))
+    )
+    unidades_pedido = (
+        select(func.coalesce(func.sum(ItemPedido.cantidad), 0))
+        .where(ItemPedido.id_pedido == Pedido.id_pedido)
+        .scalar_subquery()
+    )
+
+    # Lock de escritura desde el inicio: ningún pedido nuevo se cuela entre
+    # el borrado y el recálculo
+    db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+    try:
+        for tabla in (_ventas, _ventas_productos, _ventas_categorias):
+            db.execute(delete(tabla).where(tabla.c.fecha.between(inicio, fin)))
+
+        db.execute(insert(_ventas).from_select(
+            ["fecha", "pedidos", "unidades", "ingresos"],
+            select(dia, func.count(Pedido.id_pedido), func.sum(unidades_pedido), func.sum(Pedido.total))
+            .where(en_rango).group_by(dia),
+        ))
+        db.execute(insert(_ventas_productos).from_select(
+            ["fecha", "id_producto", "unidades", "ingresos"],
+            select(dia, ItemPedido.id_producto, func.sum(ItemPedido.cantidad), func.sum(ItemPedido.subtotal))
+            .join(Pedido, ItemPedido.id_pedido == Pedido.id_pedido)
+            .where(en_rango).group_by(dia, ItemPedido.id_producto),
+        ))
+        db.execute(insert(_ventas_categorias).from_select(
+            ["fecha", "categoria", "unidades", "ingresos"],
+            select(dia, Producto.categoria, func.sum(ItemPedido.cantidad), func.sum(ItemPedido.subtotal))
+            .join(Pedido, ItemPedido.id_pedido == Pedido.id_pedido)
+            .join(Producto, ItemPedido.id_producto == Producto.id_producto)
+            .where(en_rango).group_by(dia, Producto.categoria),
+        ))
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def reconstruir(desde: date = None, hasta: date = None, dias_por_lote: int = ANALITICA_DIAS_POR_LOTE) -> int:
+    """
+    Reconstruye los rollups desde el histórico de pedidos, de a
+    'dias_por_lote' días. Sin fechas, cubre todo el histórico.
+    Devuelve la cantidad de días recalculados.
+    """
+    db = SessionLocal()
+    try:
+        if desde is None or hasta is None:
+            minimo, maximo = db.execute(
+                select(func.min(models.Pedido.fecha_pedido), func.max(models.Pedido.fecha_pedido))
+            ).one()
+            db.rollback()
+            if minimo is None:
+                return 0
+            desde = desde or minimo.date()
+            hasta = hasta or maximo.date()
+
+        dias = 0
+        inicio = desde
+        while inicio <= hasta:
+            fin = min(inicio + timedelta(days=dias_por_lote - 1), hasta)
+            _reconstruir_lote(db, inicio, fin)
+            dias += (fin - inicio).days + 1
+            print(f"Rollups recalculados: {inicio} a {fin}")
+            inicio = fin + timedelta(days=1)
+        return dias
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Reconstruye los rollups de ventas desde los pedidos.")
+    parser.add_argument("--desde", type=date.fromisoformat, default=None, help="Primer día (AAAA-MM-DD)")
+    parser.add_argument("--hasta", type=date.fromisoformat, default=None, help="Último día (AAAA-MM-DD)")
+    parser.add_argument("--dias", type=int, default=ANALITICA_DIAS_POR_LOTE, help="Días por transacción")
+    args = parser.parse_args()
+
+    dias = reconstruir(args.desde, args.hasta, max(args.dias, 1))
+    print(f"Listo: {dias} día(s) recalculados.")
+
+
+if __name__ == "__main__":
+    main()
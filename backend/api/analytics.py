@@ -0,0 +1,109 @@
+# backend/api/analytics.py
+
+from fastapi import APIRouter, Depends, HTTPException, status, Query
+from sqlalchemy.orm import Session
+from sqlalchemy import func
+from typing import List, Literal, Optional
+from datetime import date, datetime, timedelta
+
+import schemas
+import models
+from database import get_db
+from serializers import filas_a_dicts
+from dependencies import require_admin
+
+router = APIRouter()
+
+# Los reportes leen los rollups diarios (ver analitica.py): el costo depende
+# de la cantidad de días del rango, no de la cantidad de pedidos.
+
+ANALITICA_DIAS_DEFECTO = 30
+
+def _rango(desde: Optional[date], hasta: Optional[date]):
+    """ Rango por defecto: los últimos ANALITICA_DIAS_DEFECTO días. """
+    hasta = hasta or datetime.utcnow().date()
+    desde = desde or hasta - timedelta(days=ANALITICA_DIAS_DEFECTO - 1)
+    if desde > hasta:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="'desde' no puede ser posterior a 'hasta'.")
+    return desde, hasta
+
+
+@router.get("/analytics/revenue", response_model=List[schemas.VentaDiariaResponse])
+def get_revenue_by_day(
+    desde: Optional[date] = Query(None, description="Primer día (por defecto, hace 30 días)"),
+    hasta: Optional[date] = Query(None, description="Último día (por defecto, hoy)"),
+    db: Session = Depends(get_db),
+    current_user: models.Usuario = Depends(require_admin)
+):
+    """ Pedidos, unidades e ingresos por día (solo los días con ventas). """
+    desde, hasta = _rango(desde, hasta)
+    filas = db.query(
+        models.VentaDiaria.fecha,
+        models.VentaDiaria.pedidos,
+        models.VentaDiaria.unidades,
+        models.VentaDiaria.ingresos
+    ).filter(
+        models.VentaDiaria.fecha.between(desde, hasta)
+    ).order_by(models.VentaDiaria.fecha).all()
+    return filas_a_dicts(filas)
+
+
+@router.get("/analytics/top-products", response_model=List[schemas.VentaProductoResponse])
+def get_top_products(
+    desde: Optional[date] = Query(None, description="Primer día (por defecto, hace 30 días)"),
+    hasta: Optional[date] = Query(None, description="Último día (por defecto, hoy)"),
+    limit: int = Query(10, ge=1, le=100, description="Cantidad de productos"),
+    sort: Literal["unidades", "ingresos"] = Query("unidades", description="Criterio del ranking"),
+    db: Session = Depends(get_db),
+    current_user: models.Usuario = Depends(require_admin)
+):
+    """ Productos más vendidos del rango, por unidades o por ingresos. """
+    desde, hasta = _rango(desde, hasta)
+    unidades = func.sum(models.VentaProductoDiaria.unidades).label("unidades")
+    ingresos = func.sum(models.VentaProductoDiaria.ingresos).label("ingresos")
+    ranking = db.query(
+        models.VentaProductoDiaria.id_producto,
+        unidades,
+        ingresos
+    ).filter(
+        models.VentaProductoDiaria.fecha.between(desde, hasta)
+    ).group_by(
+        models.VentaProductoDiaria.id_producto
+    ).order_by(
+        (unidades if sort == "unidades" else ingresos).desc(),
+        models.VentaProductoDiaria.id_producto
+    ).limit(limit).subquery()
+
+    filas = db.query(
+        ranking.c.id_producto,
+        models.Producto.nombre_producto,
+        ranking.c.unidades,
+        ranking.c.ingresos
+    ).outerjoin(
+        models.Producto, models.Producto.id_producto == ranking.c.id_producto
+    ).order_by(
+        ranking.c[sort].desc(), ranking.c.id_producto
+    ).all()
+    return filas_a_dicts(filas)
+
+
+@router.get("/analytics/categories", response_model=List[schemas.VentaCategoriaResponse])
+def get_units_by_category(
+    desde: Optional[date] = Query(None, description="Primer día (por defecto, hace 30 días)"),
+    hasta: Optional[date] = Query(None, description="Último día (por defecto, hoy)"),
+    db: Session = Depends(get_db),
+    current_user: models.Usuario = Depends(require_admin)
+):
+    """ Unidades e ingresos por categoría en el rango. """
+    desde, hasta = _rango(desde, hasta)
+    unidades = func.sum(models.VentaCategoriaDiaria.unidades).label("unidades")
+    filas = db.query(
+        models.VentaCategoriaDiaria.categoria,
+        unidades,
+        func.sum(models.VentaCategoriaDiaria.ingresos).label("ingresos")
+    ).filter(
+        models.VentaCategoriaDiaria.fecha.between(desde, hasta)
+    ).group_by(
+        models.VentaCategoriaDiaria.categoria
+    ).order_by(unidades.desc(), models.VentaCategoriaDiaria.categoria).all()
+    return filas_a_dicts(filas)
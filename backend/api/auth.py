@@ -1,16 +1,93 @@
 # backend/api/auth.py
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
 from fastapi.security import OAuth2PasswordRequestForm
+from sqlalchemy import bindparam, delete, insert, select, update
 from sqlalchemy.orm import Session
+from datetime import datetime, timedelta
 
 import schemas
 import models
 import auth  # Tu archivo auth.py (el de la raíz de backend/)
 from database import get_db
+from escritor import ejecutar_escritura
 
 router = APIRouter()
 
+# =====================================================================
+# REFRESH TOKENS
+# =====================================================================
+# El login entrega, junto al access token, un refresh token de un solo uso.
+# POST /refresh lo canjea por un access token nuevo y otro refresh token
+# (rotación) con una búsqueda por el sha256, sin verificar la contraseña.
+# Si llega un refresh token ya canjeado, alguien más lo tiene: se revoca
+# toda la familia (los tokens de ese login) y hay que volver a loguearse.
+# Las funciones _* corren en el hilo escritor (ver escritor.py): no hacen
+# commit y devuelven datos planos.
+
+_refresh_tokens = models.RefreshToken.__table__
+
+_REFRESH_POR_HASH = select(
+    _refresh_tokens.c.id_refresh_token,
+    _refresh_tokens.c.id_usuario,
+    _refresh_tokens.c.familia,
+    _refresh_tokens.c.fecha_expiracion,
+    _refresh_tokens.c.usado,
+    _refresh_tokens.c.revocado,
+).where(_refresh_tokens.c.token_hash == bindparam("token_hash"))
+
+def _revocar_familia(db: Session, familia: str):
+    db.execute(update(_refresh_tokens).where(_refresh_tokens.c.familia == familia).values(revocado=True))
+
+def _emitir_refresh_token(db: Session, id_usuario: int, familia: str) -> str:
+    token = auth.generar_refresh_token()
+    db.execute(insert(_refresh_tokens).values(
+        id_usuario=id_usuario,
+        token_hash=auth.hash_refresh_token(token),
+        familia=familia,
+        fecha_creacion=datetime.utcnow(),
+        fecha_expiracion=datetime.utcnow() + timedelta(days=auth.REFRESH_TOKEN_EXPIRE_DAYS),
+        usado=False,
+        revocado=False,
+    ))
+    return token
+
+def _iniciar_sesion(db: Session, id_usuario: int) -> str:
+    """ Refresh token de una familia nueva. De paso borra los vencidos del usuario. """
+    db.execute(delete(_refresh_tokens).where(
+        _refresh_tokens.c.id_usuario == id_usuario,
+        _refresh_tokens.c.fecha_expiracion < datetime.utcnow()
+    ))
+    return _emitir_refresh_token(db, id_usuario, auth.nueva_familia_refresh())
+
+def _rotar_refresh_token(db: Session, token_hash: str):
+    """ Canjea el token. Devuelve (id_usuario, nombre_usuario, nuevo token) o None si no es válido. """
+    fila = db.execute(_REFRESH_POR_HASH, {"token_hash": token_hash}).first()
+    if fila is None:
+        return None
+    if fila.usado or fila.revocado:
+        # Reutilización de un token ya canjeado (o de una sesión cerrada)
+        _revocar_familia(db, fila.familia)
+        return None
+    if fila.fecha_expiracion < datetime.utcnow():
+        return None
+
+    db.execute(update(_refresh_tokens).where(
+        _refresh_tokens.c.id_refresh_token == fila.id_refresh_token
+    ).values(usado=True))
+    nombre_usuario = db.execute(
+        select(models.Usuario.nombre_usuario).where(models.Usuario.id_usuario == fila.id_usuario)
+    ).scalar()
+    if nombre_usuario is None:
+        return None
+    return fila.id_usuario, nombre_usuario, _emitir_refresh_token(db, fila.id_usuario, fila.familia)
+
+def _cerrar_sesion(db: Session, token_hash: str):
+    fila = db.execute(_REFRESH_POR_HASH, {"token_hash": token_hash}).first()
+    if fila is not None:
+        _revocar_familia(db, fila.familia)
+
+
 @router.post("/register", response_model=schemas.UsuarioResponse, status_code=status.HTTP_201_CREATED)
 def register_user(
     user_data: schemas.UsuarioCreate, 
@@ -82,4 +159,34 @@ def login_for_access_token(
     }
     access_token = auth.crear_access_token(data=token_data)
 
-    return {"access_token": access_token, "token_type": "bearer"}
\ No newline at end of file
+    # 4. Refresh token para renovar el access token sin repetir el login
+    refresh_token = ejecutar_escritura(_iniciar_sesion, usuario.id_usuario, agrupable=True)
+
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+
+@router.post("/refresh", response_model=schemas.Token)
+def refresh_access_token(datos: schemas.RefreshTokenRequest):
+    """
+    Canjea un refresh token por un access token nuevo y el siguiente refresh
+    token de la sesión. El token canjeado deja de servir.
+    """
+    resultado = ejecutar_escritura(
+        _rotar_refresh_token, auth.hash_refresh_token(datos.refresh_token), agrupable=True
+    )
+    if resultado is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Refresh token inválido, vencido o revocado",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    id_usuario, nombre_usuario, refresh_token = resultado
+    access_token = auth.crear_access_token(data={"sub": nombre_usuario, "user_id": id_usuario})
+    return {"access_token": access_token, "token_type": "bearer", "refresh_token": refresh_token}
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(datos: schemas.RefreshTokenRequest):
+    """ Revoca la sesión del refresh token (todos los tokens de ese login). """
+    ejecutar_escritura(_cerrar_sesion, auth.hash_refresh_token(datos.refresh_token), agrupable=True)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
\ No newline at end of file
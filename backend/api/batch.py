@@ -0,0 +1,181 @@
+# backend/api/batch.py
+
+import asyncio
+import logging
+import os
+from urllib.parse import unquote, urlsplit
+
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic_core import to_json
+from sqlalchemy.orm import Session
+from starlette.exceptions import HTTPException as StarletteHTTPException
+
+import schemas
+import models
+from admision import ADMISION_RETRY_AFTER, LECTURA, clasificar, control_admision
+from database import SESION_COMPARTIDA, get_db
+from dependencies import USUARIO_AUTENTICADO, get_current_user
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# =====================================================================
+# LOTES DE GETs (POST /batch)
+# =====================================================================
+# El frontend pide al entrar la página del catálogo, el conteo, el carrito y
+# los pedidos: cuatro requests con su JWT, su sesión y su paso por los
+# middlewares. Un lote los ejecuta dentro de un solo request: el token se
+# verifica una vez, todos usan la misma sesión de lectura y la misma
+# transacción (una foto consistente de la base) y la respuesta combinada se
+# comprime una sola vez.
+#
+# Los sub-requests se despachan directo al router (sin middlewares: ya pasó
+# el lote) y corren uno detrás de otro: la sesión de SQLAlchemy no se puede
+# usar desde dos hilos a la vez. El lote entra como LECTURA; una ruta de otra
+# clase (la bandeja de conversaciones) pide además su propio lugar en el
+# control de admisión y, si no lo obtiene, queda con el mismo 503. El handler es async para poder esperar al
+# router, pero no hace I/O en el event loop: el BEGIN de acá, get_db y los
+# handlers de cada ruta (todos síncronos) corren en el threadpool.
+
+BATCH_MAX_RUTAS = int(os.getenv("BATCH_MAX_RUTAS", 10))
+
+# Del scope del lote no pasan los headers del cuerpo del POST ni
+# Accept-Encoding (la compresión se hace sobre la respuesta combinada)
+_HEADERS_EXCLUIDOS = (b"content-length", b"content-type", b"accept-encoding")
+# Ni lo que el router completa para cada ruta
+_CLAVES_EXCLUIDAS = ("endpoint", "route", "path_params")
+# Headers de la sub-respuesta que ya describe la respuesta combinada
+_HEADERS_RESPUESTA_EXCLUIDOS = ("content-length", "content-type", "content-encoding", "vary")
+
+
+def _validar_ruta(ruta: str) -> str:
+    """ Mensaje de error si la ruta no se puede ejecutar en un lote, o '' si se puede. """
+    if not ruta.startswith("/api/"):
+        return "Solo se pueden agrupar rutas de la API (/api/...)"
+    if urlsplit(ruta).path == "/api/batch":
+        return "Un lote no puede incluir otro lote"
+    return ""
+
+
+def _iniciar_lectura(db: Session):
+    # Transacción de lectura explícita: todas las rutas ven la misma foto
+    # de la base (la cierra el rollback de db.close() al terminar)
+    db.connection().exec_driver_sql("BEGIN")
+
+
+def _receptor():
+    # Los sub-requests son GETs sin cuerpo. Después del primer mensaje no
+    # llega nada más (las respuestas en streaming esperan una desconexión)
+    enviado = False
+
+    async def receive():
+        nonlocal enviado
+        if enviado:
+            await asyncio.Event().wait()
+        enviado = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    return receive
+
+
+async def _admitir_y_ejecutar(request: Request, base: dict, ruta: str) -> tuple:
+    """ Como _ejecutar, pero antes pasa por el control de admisión si la ruta no es de LECTURA. """
+    clase = clasificar("GET", urlsplit(ruta).path)
+    if clase is None or clase == LECTURA:
+        # El lugar del propio lote
+        return await _ejecutar(request, base, ruta)
+    if not await control_admision.entrar(clase):
+        return (
+            status.HTTP_503_SERVICE_UNAVAILABLE,
+            {"retry-after": str(ADMISION_RETRY_AFTER)},
+            to_json({"detail": "El servidor está ocupado. Intenta nuevamente."}),
+            True,
+        )
+    try:
+        return await _ejecutar(request, base, ruta)
+    finally:
+        control_admision.salir(clase)
+
+
+async def _ejecutar(request: Request, base: dict, ruta: str) -> tuple:
+    """ Despacha un GET interno al router. Devuelve (status, headers, cuerpo, es_json). """
+    partes = urlsplit(ruta)
+    scope = dict(base, path=unquote(partes.path), raw_path=partes.path.encode(), query_string=partes.query.encode())
+    respuesta = {"status": 500, "headers": [], "cuerpo": []}
+
+    async def send(mensaje):
+        if mensaje["type"] == "http.response.start":
+            respuesta["status"] = mensaje["status"]
+            respuesta["headers"] = mensaje.get("headers", [])
+        elif mensaje["type"] == "http.response.body":
+            respuesta["cuerpo"].append(mensaje.get("body", b""))
+
+    try:
+        await request.app.router(scope, _receptor(), send)
+    except StarletteHTTPException as e:
+        # 404 / 405 del router: se levantan fuera del manejo de excepciones de la ruta
+        return e.status_code, {}, to_json({"detail": e.detail}), True
+    except Exception:
+        logger.exception("Error en la ruta '%s' de un lote", ruta)
+        return 500, {}, to_json({"detail": "Error interno del servidor"}), True
+
+    headers = {}
+    es_json = False
+    for nombre, valor in respuesta["headers"]:
+        nombre = nombre.decode("latin-1").lower()
+        if nombre == "content-type":
+            es_json = valor.startswith(b"application/json")
+        elif nombre not in _HEADERS_RESPUESTA_EXCLUIDOS:
+            headers[nombre] = valor.decode("latin-1")
+    return respuesta["status"], headers, b"".join(respuesta["cuerpo"]), es_json
+
+
+@router.post("/batch", response_model=schemas.BatchResponse)
+async def batch(
+    lote: schemas.BatchRequest,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: models.Usuario = Depends(get_current_user)
+):
+    """
+    Ejecuta varios GETs de la API en un solo request, en orden, y devuelve
+    el status, los headers y el cuerpo de cada uno. Un error en una ruta
+    no corta el lote: queda en su propio status.
+    """
+    if len(lote.rutas) > BATCH_MAX_RUTAS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Un lote admite hasta {BATCH_MAX_RUTAS} rutas",
+        )
+
+    await run_in_threadpool(_iniciar_lectura, db)
+
+    base = {clave: valor for clave, valor in request.scope.items() if clave not in _CLAVES_EXCLUIDAS}
+    base["method"] = "GET"
+    base["headers"] = [(k, v) for k, v in request.scope["headers"] if k not in _HEADERS_EXCLUIDOS]
+    base["state"] = dict(request.scope.get("state", {}), **{
+        SESION_COMPARTIDA: db,
+        USUARIO_AUTENTICADO: current_user,
+    })
+
+    # Cada respuesta se arma con los bytes JSON de la sub-respuesta tal
+    # cual, sin volver a parsearlos
+    partes = []
+    for ruta in lote.rutas:
+        error = _validar_ruta(ruta)
+        if error:
+            estado, headers, cuerpo, es_json = status.HTTP_400_BAD_REQUEST, {}, to_json({"detail": error}), True
+        else:
+            estado, headers, cuerpo, es_json = await _admitir_y_ejecutar(request, base, ruta)
+        if not cuerpo:
+            cuerpo = b"null"
+        elif not es_json:
+            cuerpo = to_json(cuerpo.decode("utf-8", errors="replace"))
+        cabecera = to_json({"ruta": ruta, "status": estado, "headers": headers})
+        partes.append(cabecera[:-1] + b',"cuerpo":' + cuerpo + b"}")
+
+    return Response(
+        content=b'{"respuestas":[' + b",".join(partes) + b"]}",
+        media_type="application/json",
+    )
@@ -1,39 +1,81 @@
 # backend/api/cart.py
 
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session, joinedload
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session
 from typing import List, Optional
-from datetime import datetime
 
 import schemas
 import models
+import cache
 from database import get_db
+from carritos import tienda_carritos
+from serializers import filas_a_dicts
+from stock import disponibilidad_stock
 # Importamos la dependencia que devuelve el OBJETO
 from dependencies import get_current_user
 
 router = APIRouter()
 
-# --- FUNCIÓN AUXILIAR DEL CARRITO ---
-def get_or_create_cart(db: Session, user_id: int) -> models.Carrito:
-    carrito = db.query(models.Carrito).options(
-        joinedload(models.Carrito.items).joinedload(models.ItemCarrito.producto)
-    ).filter(models.Carrito.id_usuario == user_id).first()
-    
-    if not carrito:
-        usuario = db.query(models.Usuario).filter(models.Usuario.id_usuario == user_id).first()
-        if not usuario:
-             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado.")
-
-        carrito = models.Carrito(id_usuario=user_id, items=[]) 
-        db.add(carrito)
-        db.commit()
-        db.refresh(carrito) 
-        
-        carrito = db.query(models.Carrito).options(
-            joinedload(models.Carrito.items).joinedload(models.ItemCarrito.producto)
-        ).filter(models.Carrito.id_usuario == user_id).first()
-        
-    return carrito
+# --- FUNCIONES AUXILIARES DEL CARRITO ---
+# El estado del carrito vive en memoria (ver carritos.py) y el stock en
+# stock.py; acá solo se leen los datos de los productos (cacheados) para
+# tomar el precio y armar la respuesta.
+
+_cache_productos_carrito = cache.CacheVersionada(cache.CATALOGO, maxsize=4096)
+
+_PRODUCTOS_POR_IDS = select(
+    models.Producto.id_producto,
+    models.Producto.nombre_producto,
+    models.Producto.precio,
+    models.Producto.imagen
+).where(models.Producto.id_producto.in_(bindparam("ids", expanding=True)))
+
+def _productos(db: Session, ids) -> dict:
+    """ Devuelve {id_producto: datos del producto} de los ids (los inexistentes no aparecen). """
+    productos = {}
+    faltantes = []
+    for id_producto in ids:
+        producto = _cache_productos_carrito.get(id_producto)
+        if producto is None:
+            faltantes.append(id_producto)
+        else:
+            productos[id_producto] = producto
+
+    if faltantes:
+        version = cache.get_version(cache.CATALOGO)
+        filas = db.execute(_PRODUCTOS_POR_IDS, {"ids": faltantes}).all()
+        for fila in filas_a_dicts(filas):
+            productos[fila["id_producto"]] = fila
+            _cache_productos_carrito.set(fila["id_producto"], fila, version)
+    return productos
+
+def _obtener_producto(db: Session, producto_id: int):
+    """ Devuelve (stock, precio) del producto, sin leer la base si está en memoria. """
+    producto = _productos(db, [producto_id]).get(producto_id)
+    stock = disponibilidad_stock.consultar([producto_id], db).get(producto_id)
+    if producto is None or stock is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado.")
+    return stock, producto["precio"]
+
+def _respuesta_carrito(db: Session, estado: dict) -> dict:
+    """
+    Completa el estado del carrito con los datos de cada producto.
+    Si los precios cambiaron desde que se calcularon los totales, los revalida.
+    """
+    version_precios = cache.get_version(cache.PRECIOS)
+    productos = _productos(db, [item["id_producto"] for item in estado["items"]])
+
+    if estado["version_precios"] != version_precios:
+        precios = {id_producto: producto["precio"] for id_producto, producto in productos.items()}
+        estado = tienda_carritos.revalidar_precios(estado["id_usuario"], precios, version_precios, db)
+
+    # Los productos borrados del catálogo no se muestran
+    estado["items"] = [
+        {**item, "producto": productos[item["id_producto"]]}
+        for item in estado["items"] if item["id_producto"] in productos
+    ]
+    return estado
 
 # --- ENDPOINTS DE CARRITO ---
 
@@ -45,8 +87,7 @@ def get_cart(
 ):
     # --- CORREGIDO: Acceso como objeto ---
     user_id = current_user.id_usuario
-    carrito = get_or_create_cart(db, user_id)
-    return carrito
+    return _respuesta_carrito(db, tienda_carritos.leer(user_id, db))
 
 @router.post("/cart/add", response_model=schemas.CarritoResponse)
 def add_to_cart(
@@ -60,45 +101,9 @@ def add_to_cart(
     producto_id = item_data.id_producto
     cantidad_a_agregar = item_data.cantidad
     
-    carrito = get_or_create_cart(db, user_id)
-    
-    producto = db.query(models.Producto).filter(models.Producto.id_producto == producto_id).first()
-    if not producto:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado.")
-    
-    item_existente = None
-    for item in carrito.items:
-        if item.id_producto == producto_id:
-            item_existente = item
-            break
-            
-    if item_existente:
-        cantidad_nueva_total = item_existente.cantidad + cantidad_a_agregar
-        if producto.stock < cantidad_nueva_total:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Stock insuficiente. Stock disponible: {producto.stock}. (En carrito: {item_existente.cantidad})"
-            )
-        item_existente.cantidad = cantidad_nueva_total
-    else:
-        if producto.stock < cantidad_a_agregar:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Stock insuficiente. Stock disponible: {producto.stock}."
-            )
-        
-        nuevo_item = models.ItemCarrito(
-            id_carrito=carrito.id_usuario,
-            id_producto=producto_id,
-            cantidad=cantidad_a_agregar
-        )
-        db.add(nuevo_item)
-        carrito.items.append(nuevo_item) 
-    
-    carrito.fecha_actualizacion = datetime.utcnow()
-    db.commit()
-    carrito_respuesta = get_or_create_cart(db, user_id)
-    return carrito_respuesta
+    stock, precio = _obtener_producto(db, producto_id)
+    estado = tienda_carritos.agregar(user_id, producto_id, cantidad_a_agregar, stock, precio, db)
+    return _respuesta_carrito(db, estado)
 
 @router.put("/cart/update", response_model=schemas.CarritoResponse)
 def update_cart_item(
@@ -112,31 +117,9 @@ def update_cart_item(
     producto_id = item_data.id_producto
     cantidad_nueva = item_data.cantidad 
     
-    carrito = get_or_create_cart(db, user_id)
-    
-    producto = db.query(models.Producto).filter(models.Producto.id_producto == producto_id).first()
-    if not producto:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado.")
-    
-    if producto.stock < cantidad_nueva:
-         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Stock insuficiente. Stock disponible: {producto.stock}."
-        )
-
-    item_existente = db.query(models.ItemCarrito).filter(
-        models.ItemCarrito.id_carrito == carrito.id_usuario,
-        models.ItemCarrito.id_producto == producto_id
-    ).first()
-    
-    if not item_existente:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado en el carrito.")
-        
-    item_existente.cantidad = cantidad_nueva
-    carrito.fecha_actualizacion = datetime.utcnow()
-    db.commit()
-    carrito_respuesta = get_or_create_cart(db, user_id)
-    return carrito_respuesta
+    stock, precio = _obtener_producto(db, producto_id)
+    estado = tienda_carritos.actualizar(user_id, producto_id, cantidad_nueva, stock, precio, db)
+    return _respuesta_carrito(db, estado)
 
 @router.delete("/cart/remove/{id_producto}", response_model=schemas.CarritoResponse)
 def remove_from_cart(
@@ -147,18 +130,5 @@ def remove_from_cart(
 ):
     # --- CORREGIDO ---
     user_id = current_user.id_usuario
-    carrito = get_or_create_cart(db, user_id)
-
-    item_a_eliminar = db.query(models.ItemCarrito).filter(
-        models.ItemCarrito.id_carrito == carrito.id_usuario,
-        models.ItemCarrito.id_producto == id_producto
-    ).first()
-    
-    if not item_a_eliminar:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado en el carrito.")
-        
-    db.delete(item_a_eliminar)
-    carrito.fecha_actualizacion = datetime.utcnow()
-    db.commit()
-    carrito_respuesta = get_or_create_cart(db, user_id)
-    return carrito_respuesta
\ No newline at end of file
+    estado = tienda_carritos.quitar(user_id, id_producto, db)
+    return _respuesta_carrito(db, estado)
\ No newline at end of file
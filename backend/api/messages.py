@@ -4,16 +4,228 @@ from fastapi import APIRouter, Depends, HTTPException, status, Query
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from datetime import datetime
-from sqlalchemy import case, distinct, func, update
+from sqlalchemy import bindparam, case, distinct, func, select, union_all, update
 
 import schemas
 import models
 from database import get_db
+from escritor import ejecutar_escritura
+from serializers import json_response
+from difusiones import (
+    TIPO_DIFUSION, contar_destinatarios, crear_difusion, filtrar_existentes, reparto_difusiones
+)
 # Importamos la dependencia que devuelve el OBJETO
-from dependencies import get_current_user
+from dependencies import get_current_user, require_admin
 
 router = APIRouter()
 
+# --- FUNCIONES AUXILIARES DE SERIALIZACIÓN ---
+# Construyen los dicts con la forma de los schemas de respuesta, que se
+# serializan directo con json_response (sin instanciar los modelos Pydantic).
+
+def _participante_dict(usuario: models.Usuario) -> dict:
+    return {
+        "id_usuario": usuario.id_usuario,
+        "nombre_usuario": usuario.nombre_usuario,
+        "nombre": usuario.nombre,
+        "apellido": usuario.apellido,
+    }
+
+def _mensaje_dict(contenido, id_mensaje, id_conversacion, id_usuario_remitente, fecha_envio, leido) -> dict:
+    return {
+        "contenido": contenido,
+        "id_mensaje": id_mensaje,
+        "id_conversacion": id_conversacion,
+        "id_usuario_remitente": id_usuario_remitente,
+        "fecha_envio": fecha_envio,
+        "leido": leido,
+    }
+
+# --- ESCRITURAS (hilo escritor, ver escritor.py) ---
+# No hacen commit; devuelven ids o dicts planos para armar la respuesta.
+
+def _crear_conversacion(db: Session, remitente_id: int, destinatario_id: int) -> int:
+    primer_mensaje = models.Mensaje(
+        id_usuario=remitente_id,
+        asunto="Nueva Conversación",
+        mensaje="Iniciada conversación.",
+        estado="leido"
+    )
+    db.add(primer_mensaje)
+    db.flush()
+
+    nueva_conversacion = models.Conversacion(
+        id_usuario_remitente=remitente_id,
+        id_usuario_destinatario=destinatario_id,
+        id_mensaje=primer_mensaje.id_mensaje,
+        fecha_envio=primer_mensaje.fecha_mensaje,
+        leido=True
+    )
+    db.add(nueva_conversacion)
+    db.flush()
+    return nueva_conversacion.id_conversacion
+
+def _marcar_leidos(db: Session, conv_ids_list: List[int]) -> None:
+    db.execute(
+        update(models.Conversacion)
+        .where(models.Conversacion.id_conversacion.in_(conv_ids_list))
+        .values(leido=True)
+    )
+    
+    # Una difusión es un único mensaje compartido por todos sus destinatarios:
+    # su lectura queda solo en la fila de cada uno ('leido'), no en el mensaje
+    mensaje_ids_to_mark = db.query(models.Conversacion.id_mensaje).filter(
+         models.Conversacion.id_conversacion.in_(conv_ids_list),
+         models.Conversacion.tipo_participacion.is_distinct_from(TIPO_DIFUSION)
+    ).all()
+    mensaje_ids_list = [m[0] for m in mensaje_ids_to_mark]
+    
+    if mensaje_ids_list:
+         db.execute(
+            update(models.Mensaje)
+            .where(models.Mensaje.id_mensaje.in_(mensaje_ids_list))
+            .values(estado='leido')
+        )
+
+def _enviar_mensaje(db: Session, id_conversacion: int, user_id: int, destinatario_id: int, contenido: str) -> dict:
+    nuevo_mensaje = models.Mensaje(
+        id_usuario=user_id,
+        asunto=f"Mensaje en Conversación {id_conversacion}",
+        mensaje=contenido,
+        estado='no_leido'
+    )
+    db.add(nuevo_mensaje)
+    db.flush()
+
+    registro_conversacion = models.Conversacion(
+        id_usuario_remitente=user_id,
+        id_usuario_destinatario=destinatario_id,
+        id_mensaje=nuevo_mensaje.id_mensaje,
+        fecha_envio=nuevo_mensaje.fecha_mensaje,
+        leido=False
+    )
+    
+    db.add(registro_conversacion)
+    db.flush()
+    db.refresh(nuevo_mensaje)
+    
+    return _mensaje_dict(
+        nuevo_mensaje.mensaje, nuevo_mensaje.id_mensaje, registro_conversacion.id_conversacion,
+        user_id, nuevo_mensaje.fecha_mensaje, False
+    )
+
+# --- CONSULTAS FRECUENTES ---
+# Armadas una sola vez con bindparam: cada request solo pasa los valores
+# ('id_usuario' y, en las de un par de usuarios, 'id_otro').
+
+_C, _M = models.Conversacion, models.Mensaje
+_id_usuario = bindparam("id_usuario")
+_id_otro = bindparam("id_otro")
+
+def _entre(tabla, user_id, partner_id):
+    """ Filtro de las filas de 'tabla' entre los dos usuarios (en ambos sentidos). """
+    return (
+        ((tabla.id_usuario_remitente == user_id) & (tabla.id_usuario_destinatario == partner_id)) |
+        ((tabla.id_usuario_remitente == partner_id) & (tabla.id_usuario_destinatario == user_id))
+    )
+
+# Bandeja: la última conversación con cada usuario. Las difusiones que el
+# usuario envió no cuentan (serían una fila por destinatario); se siguen
+# desde GET /broadcasts/{id}
+_otro_usuario = case(
+    (_C.id_usuario_remitente == _id_usuario, _C.id_usuario_destinatario),
+    else_=_C.id_usuario_remitente
+)
+_ranking_conversaciones = select(
+    _C.id_conversacion,
+    func.row_number().over(partition_by=_otro_usuario, order_by=_C.fecha_envio.desc()).label("rn")
+).where(
+    ((_C.id_usuario_remitente == _id_usuario) & _C.tipo_participacion.is_distinct_from(TIPO_DIFUSION))
+    | (_C.id_usuario_destinatario == _id_usuario)
+).subquery()
+_ULTIMAS_CONVERSACIONES = select(_C).options(
+    joinedload(_C.usuario_remitente),
+    joinedload(_C.usuario_destinatario),
+    joinedload(_C.mensaje)
+).where(
+    _C.id_conversacion.in_(
+        select(_ranking_conversaciones.c.id_conversacion).where(_ranking_conversaciones.c.rn == 1)
+    )
+).order_by(_C.fecha_envio.desc())
+
+# No leídos que 'id_usuario' recibió de cualquiera de los dos participantes
+_NO_LEIDOS_DE = select(func.count()).select_from(_C).where(
+    _C.id_usuario_remitente.in_([bindparam("remitente"), bindparam("destinatario")]),
+    _C.id_usuario_destinatario == _id_usuario,
+    _C.leido == False
+)
+_REMITENTES_NO_LEIDOS = select(func.count(distinct(_C.id_usuario_remitente))).where(
+    _C.id_usuario_destinatario == _id_usuario,
+    _C.leido == False
+)
+
+# Historial de un par
+_POR_MARCAR_LEIDAS = select(_C.id_conversacion).where(
+    _C.id_usuario_remitente == _id_otro,
+    _C.id_usuario_destinatario == _id_usuario,
+    _C.leido == False
+)
+_PAGINA_ACTIVA = select(
+    _M.mensaje, _M.id_mensaje, _C.id_conversacion, _C.id_usuario_remitente, _C.fecha_envio, _C.leido
+).join(
+    _M, _C.id_mensaje == _M.id_mensaje
+).where(
+    _entre(_C, _id_usuario, _id_otro)
+).order_by(_C.fecha_envio.desc()).offset(bindparam("skip")).limit(bindparam("limit"))
+_ULTIMA_ARCHIVADA_DEL_PAR = select(func.max(models.ConversacionArchivo.fecha_envio)).where(
+    _entre(models.ConversacionArchivo, _id_usuario, _id_otro)
+)
+_ACTIVAS_DEL_PAR = select(func.count(_C.id_conversacion)).where(_entre(_C, _id_usuario, _id_otro))
+_ACTIVAS_DEL_PAR_DESDE = _ACTIVAS_DEL_PAR.where(_C.fecha_envio > bindparam("desde"))
+
+# --- HISTORIAL ACTIVO Y ARCHIVADO ---
+# Las conversaciones viejas se mueven a tablas de archivo (ver
+# archivo_mensajes.py). Las páginas del historial que caen dentro de lo
+# activo no tocan el archivo; las demás combinan ambas tablas.
+
+def _filas_activas(db: Session, user_id: int, partner_id: int) -> int:
+    """
+    Cantidad de filas activas más nuevas que todo lo archivado del par: hasta
+    ahí el historial se puede paginar sin mirar el archivo.
+    """
+    par = {"id_usuario": user_id, "id_otro": partner_id}
+    ultima_archivada = db.execute(_ULTIMA_ARCHIVADA_DEL_PAR, par).scalar()
+    if ultima_archivada is None:
+        return db.execute(_ACTIVAS_DEL_PAR, par).scalar()
+    return db.execute(_ACTIVAS_DEL_PAR_DESDE, {**par, "desde": ultima_archivada}).scalar()
+
+def _historial_con_archivo(db: Session, user_id: int, partner_id: int, skip: int, limit: int) -> list:
+    """ Página del historial combinando las tablas activas y las de archivo. """
+    C, CA = models.Conversacion, models.ConversacionArchivo
+    M, MA = models.Mensaje, models.MensajeArchivo
+    # Cada rama trae como mucho skip + limit filas (usa el índice par/fecha)
+    activas = select(
+        M.mensaje, M.id_mensaje, C.id_conversacion, C.id_usuario_remitente, C.fecha_envio, C.leido
+    ).join(
+        M, C.id_mensaje == M.id_mensaje
+    ).where(_entre(C, user_id, partner_id)).order_by(C.fecha_envio.desc()).limit(skip + limit)
+    archivadas = select(
+        # El mensaje puede seguir activo si otra conversación activa lo usa
+        func.coalesce(MA.mensaje, M.mensaje).label("mensaje"), CA.id_mensaje, CA.id_conversacion,
+        CA.id_usuario_remitente, CA.fecha_envio, CA.leido
+    ).outerjoin(
+        MA, CA.id_mensaje == MA.id_mensaje
+    ).outerjoin(
+        M, CA.id_mensaje == M.id_mensaje
+    ).where(_entre(CA, user_id, partner_id)).order_by(CA.fecha_envio.desc()).limit(skip + limit)
+
+    historial = union_all(activas.subquery().select(), archivadas.subquery().select()).subquery()
+    return db.execute(
+        select(historial).order_by(
+            historial.c.fecha_envio.desc(), historial.c.id_conversacion.desc()
+        ).offset(skip).limit(limit)
+    ).all()
+
 # --- ENDPOINT NUEVO (Issue 8) ---
 @router.get("/notifications/unread-messages", response_model=schemas.NotificacionUnreadResponse)
 def get_unread_notification_count(
@@ -22,10 +234,7 @@ def get_unread_notification_count(
 ):
     user_id = current_user.id_usuario
 
-    count = db.query(func.count(distinct(models.Conversacion.id_usuario_remitente))).filter(
-        models.Conversacion.id_usuario_destinatario == user_id,
-        models.Conversacion.leido == False
-    ).scalar() or 0
+    count = db.execute(_REMITENTES_NO_LEIDOS, {"id_usuario": user_id}).scalar() or 0
 
     return {"total_conversaciones_no_leidas": int(count)}
 
@@ -38,76 +247,34 @@ def get_user_conversations(
     current_user: models.Usuario = Depends(get_current_user)
 ):
     user_id = current_user.id_usuario
-    
-    other_user_id = case(
-        (models.Conversacion.id_usuario_remitente == user_id, models.Conversacion.id_usuario_destinatario),
-        else_=models.Conversacion.id_usuario_remitente
-    ).label("other_user_id")
-
-    subquery = db.query(
-        models.Conversacion.id_conversacion,
-        other_user_id,
-        func.row_number().over(
-            partition_by=other_user_id,
-            order_by=models.Conversacion.fecha_envio.desc()
-        ).label('rn')
-    ).filter(
-        (models.Conversacion.id_usuario_remitente == user_id) |
-        (models.Conversacion.id_usuario_destinatario == user_id)
-    ).subquery()
-
-    latest_conv_ids = db.query(subquery.c.id_conversacion).filter(subquery.c.rn == 1).all()
-    latest_conv_ids = [c_id[0] for c_id in latest_conv_ids]
 
-    if not latest_conv_ids:
-        return []
-
-    conversaciones = db.query(models.Conversacion).options(
-        joinedload(models.Conversacion.usuario_remitente),
-        joinedload(models.Conversacion.usuario_destinatario),
-        joinedload(models.Conversacion.mensaje)
-    ).filter(
-        models.Conversacion.id_conversacion.in_(latest_conv_ids)
-    ).order_by(
-        models.Conversacion.fecha_envio.desc()
-    ).all()
+    conversaciones = db.scalars(_ULTIMAS_CONVERSACIONES, {"id_usuario": user_id}).all()
     
     response_list = []
     for conv in conversaciones:
-        ultimo_mensaje_schema = None
+        ultimo_mensaje = None
         if conv.mensaje:
-            ultimo_mensaje_schema = schemas.MensajeResponse(
-                id_mensaje=conv.mensaje.id_mensaje,
-                id_conversacion=conv.id_conversacion,
-                id_usuario_remitente=conv.id_usuario_remitente,
-                fecha_envio=conv.fecha_envio,
-                leido=conv.leido,
-                contenido=conv.mensaje.mensaje
+            ultimo_mensaje = _mensaje_dict(
+                conv.mensaje.mensaje, conv.mensaje.id_mensaje, conv.id_conversacion,
+                conv.id_usuario_remitente, conv.fecha_envio, conv.leido
             )
         
-        mensajes_no_leidos_count = db.query(models.Conversacion).filter(
-            (
-                (models.Conversacion.id_usuario_remitente == conv.usuario_remitente.id_usuario) &
-                (models.Conversacion.id_usuario_destinatario == user_id)
-            ) |
-            (
-                (models.Conversacion.id_usuario_remitente == conv.usuario_destinatario.id_usuario) &
-                (models.Conversacion.id_usuario_destinatario == user_id)
-            ),
-            models.Conversacion.leido == False
-        ).count()
-
-        conv_schema = schemas.ConversacionResponse(
-            id_conversacion=conv.id_conversacion,
-            fecha_envio=conv.fecha_envio,
-            usuario_remitente=conv.usuario_remitente,
-            usuario_destinatario=conv.usuario_destinatario,
-            ultimo_mensaje=ultimo_mensaje_schema,
-            mensajes_no_leidos=mensajes_no_leidos_count
-        )
-        response_list.append(conv_schema)
+        mensajes_no_leidos_count = db.execute(_NO_LEIDOS_DE, {
+            "remitente": conv.usuario_remitente.id_usuario,
+            "destinatario": conv.usuario_destinatario.id_usuario,
+            "id_usuario": user_id,
+        }).scalar()
+
+        response_list.append({
+            "id_conversacion": conv.id_conversacion,
+            "fecha_envio": conv.fecha_envio,
+            "usuario_remitente": _participante_dict(conv.usuario_remitente),
+            "usuario_destinatario": _participante_dict(conv.usuario_destinatario),
+            "ultimo_mensaje": ultimo_mensaje,
+            "mensajes_no_leidos": mensajes_no_leidos_count,
+        })
 
-    return response_list
+    return json_response(response_list)
 
 
 @router.post("/conversations", response_model=schemas.ConversacionResponse, status_code=status.HTTP_201_CREATED)
@@ -143,30 +310,12 @@ def create_or_get_conversation(
     if not destinatario:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario destinatario no encontrado.")
     
-    primer_mensaje = models.Mensaje(
-        id_usuario=remitente_id,
-        asunto="Nueva Conversación",
-        mensaje="Iniciada conversación.",
-        estado="leido"
-    )
-    db.add(primer_mensaje)
-    db.flush()
-
-    nueva_conversacion = models.Conversacion(
-        id_usuario_remitente=remitente_id,
-        id_usuario_destinatario=destinatario_id,
-        id_mensaje=primer_mensaje.id_mensaje,
-        fecha_envio=primer_mensaje.fecha_mensaje,
-        leido=True
-    )
-    db.add(nueva_conversacion)
-    db.commit()
+    id_conversacion = ejecutar_escritura(_crear_conversacion, remitente_id, destinatario_id, agrupable=True)
     
-    db.refresh(nueva_conversacion)
     conversacion_respuesta = db.query(models.Conversacion).options(
         joinedload(models.Conversacion.usuario_remitente),
         joinedload(models.Conversacion.usuario_destinatario)
-    ).filter(models.Conversacion.id_conversacion == nueva_conversacion.id_conversacion).first()
+    ).filter(models.Conversacion.id_conversacion == id_conversacion).first()
 
     return conversacion_respuesta
 
@@ -181,65 +330,20 @@ def get_conversation_messages(
 ):
     user_id = current_user.id_usuario
     
-    conv_ids_to_mark = db.query(models.Conversacion.id_conversacion).filter(
-        models.Conversacion.id_usuario_remitente == conversation_partner_id,
-        models.Conversacion.id_usuario_destinatario == user_id,
-        models.Conversacion.leido == False
-    ).all()
-    
-    conv_ids_list = [c[0] for c in conv_ids_to_mark]
+    par = {"id_usuario": user_id, "id_otro": conversation_partner_id}
+    conv_ids_list = list(db.execute(_POR_MARCAR_LEIDAS, par).scalars())
 
     if conv_ids_list:
-        db.execute(
-            update(models.Conversacion)
-            .where(models.Conversacion.id_conversacion.in_(conv_ids_list))
-            .values(leido=True)
-        )
-        
-        mensaje_ids_to_mark = db.query(models.Conversacion.id_mensaje).filter(
-             models.Conversacion.id_conversacion.in_(conv_ids_list)
-        ).all()
-        mensaje_ids_list = [m[0] for m in mensaje_ids_to_mark]
-        
-        if mensaje_ids_list:
-             db.execute(
-                update(models.Mensaje)
-                .where(models.Mensaje.id_mensaje.in_(mensaje_ids_list))
-                .values(estado='leido')
-            )
-        
-        db.commit()
-
-    mensajes_query = db.query(models.Conversacion).options(
-        joinedload(models.Conversacion.mensaje)
-    ).filter(
-        (
-            (models.Conversacion.id_usuario_remitente == user_id) &
-            (models.Conversacion.id_usuario_destinatario == conversation_partner_id)
-        ) |
-        (
-            (models.Conversacion.id_usuario_remitente == conversation_partner_id) &
-            (models.Conversacion.id_usuario_destinatario == user_id)
-        )
-    ).order_by(models.Conversacion.fecha_envio.desc())
+        ejecutar_escritura(_marcar_leidos, conv_ids_list, agrupable=True)
 
     skip = (page - 1) * limit
-    mensajes = mensajes_query.offset(skip).limit(limit).all()
+    if skip + limit <= _filas_activas(db, user_id, conversation_partner_id):
+        # Consulta por columnas (JOIN con mensajes): filas planas, sin objetos ORM
+        mensajes = db.execute(_PAGINA_ACTIVA, {**par, "skip": skip, "limit": limit}).all()
+    else:
+        mensajes = _historial_con_archivo(db, user_id, conversation_partner_id, skip, limit)
     
-    response_list = []
-    for conv in mensajes:
-        if conv.mensaje:
-            msg_schema = schemas.MensajeResponse(
-                id_mensaje=conv.mensaje.id_mensaje,
-                id_conversacion=conv.id_conversacion,
-                id_usuario_remitente=conv.id_usuario_remitente,
-                fecha_envio=conv.fecha_envio,
-                leido=conv.leido,
-                contenido=conv.mensaje.mensaje
-            )
-            response_list.append(msg_schema)
-            
-    return response_list
+    return json_response([_mensaje_dict(*fila) for fila in mensajes])
 
 
 @router.post("/conversations/{id_conversacion}/messages", response_model=schemas.MensajeResponse, status_code=status.HTTP_201_CREATED)
@@ -254,6 +358,11 @@ def send_message(
     conversacion_base = db.query(models.Conversacion).filter(
         models.Conversacion.id_conversacion == id_conversacion
     ).first()
+    if not conversacion_base:
+        # El cliente puede tener el id de una conversación ya archivada
+        conversacion_base = db.query(models.ConversacionArchivo).filter(
+            models.ConversacionArchivo.id_conversacion == id_conversacion
+        ).first()
 
     if not conversacion_base:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Conversación no encontrada.")
@@ -265,42 +374,68 @@ def send_message(
     if not es_participante:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="No eres participante de esta conversación.")
 
-    nuevo_mensaje = models.Mensaje(
-        id_usuario=user_id,
-        asunto=f"Mensaje en Conversación {id_conversacion}",
-        mensaje=data.contenido,
-        estado='no_leido'
-    )
-    db.add(nuevo_mensaje)
-    db.flush()
-
     destinatario_id = (
         conversacion_base.id_usuario_destinatario 
         if conversacion_base.id_usuario_remitente == user_id 
         else conversacion_base.id_usuario_remitente
     )
 
-    registro_conversacion = models.Conversacion(
-        id_usuario_remitente=user_id,
-        id_usuario_destinatario=destinatario_id,
-        id_mensaje=nuevo_mensaje.id_mensaje,
-        fecha_envio=nuevo_mensaje.fecha_mensaje,
-        leido=False
+    mensaje_respuesta = ejecutar_escritura(
+        _enviar_mensaje, id_conversacion, user_id, destinatario_id, data.contenido, agrupable=True
     )
-    
-    db.add(registro_conversacion)
-    
-    db.commit()
-    db.refresh(nuevo_mensaje)
-    db.refresh(registro_conversacion)
-    
-    mensaje_respuesta = schemas.MensajeResponse(
-        id_mensaje=nuevo_mensaje.id_mensaje,
-        id_conversacion=registro_conversacion.id_conversacion,
-        id_usuario_remitente=user_id,
-        fecha_envio=nuevo_mensaje.fecha_mensaje,
-        leido=False,
-        contenido=nuevo_mensaje.mensaje
+
+    return json_response(mensaje_respuesta, status_code=status.HTTP_201_CREATED)
+
+
+# --- DIFUSIONES (solo admin, ver difusiones.py) ---
+
+_DIFUSION_POR_ID = select(
+    models.Difusion.id_difusion, models.Difusion.id_mensaje, models.Difusion.destino,
+    models.Difusion.tipo_usuario, models.Difusion.total, models.Difusion.enviados,
+    models.Difusion.estado, models.Difusion.fecha_creacion, models.Difusion.fecha_fin,
+).where(models.Difusion.id_difusion == bindparam("id_difusion"))
+
+@router.post("/broadcasts", response_model=schemas.DifusionResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_broadcast(
+    data: schemas.DifusionCreate,
+    db: Session = Depends(get_db),
+    current_user: models.Usuario = Depends(require_admin)
+):
+    """
+    Envía un mensaje a todos los usuarios, a los de un rol (tipo_usuario) o
+    a una lista (ids_usuario). El mensaje se guarda una vez y las
+    conversaciones se reparten en segundo plano: la respuesta trae el id
+    para seguir el progreso. Los ids inexistentes se ignoran y se informan.
+    """
+    admin_id = current_user.id_usuario
+    ids, ids_inexistentes = None, []
+    if data.ids_usuario is not None:
+        destino = "lista"
+        ids = filtrar_existentes(db, data.ids_usuario, admin_id)
+        ids_inexistentes = sorted(set(data.ids_usuario) - set(ids) - {admin_id})
+        total = len(ids)
+    else:
+        destino = "todos" if data.tipo_usuario is None else "rol"
+        total = contar_destinatarios(db, admin_id, data.tipo_usuario)
+
+    id_difusion, id_mensaje, fecha = ejecutar_escritura(
+        crear_difusion, admin_id, data.asunto, data.contenido, destino, data.tipo_usuario, total
     )
+    if total:
+        reparto_difusiones.iniciar(id_difusion, id_mensaje, admin_id, fecha, data.tipo_usuario, ids)
+
+    difusion = db.execute(_DIFUSION_POR_ID, {"id_difusion": id_difusion}).one()._asdict()
+    difusion["ids_inexistentes"] = ids_inexistentes
+    return json_response(difusion, status_code=status.HTTP_202_ACCEPTED)
 
-    return mensaje_respuesta
\ No newline at end of file
+@router.get("/broadcasts/{id_difusion}", response_model=schemas.DifusionResponse)
+def get_broadcast(
+    id_difusion: int,
+    db: Session = Depends(get_db),
+    current_user: models.Usuario = Depends(require_admin)
+):
+    """ Progreso del reparto: enviados de total y estado. """
+    difusion = db.execute(_DIFUSION_POR_ID, {"id_difusion": id_difusion}).first()
+    if difusion is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Difusión no encontrada.")
+    return json_response(difusion._asdict())
\ No newline at end of file
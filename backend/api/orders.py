@@ -1,18 +1,128 @@
 # backend/api/orders.py
 
 from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session, joinedload
 from typing import List, Optional
 from datetime import datetime
 
 import schemas
 import models
+import cache
+import analitica
 from database import get_db
+from carritos import tienda_carritos
+from escritor import ejecutar_escritura
+from stock import disponibilidad_stock
 # Importamos la dependencia que devuelve el OBJETO
 from dependencies import get_current_user
 
 router = APIRouter()
 
+# --- ESCRITURA DEL PEDIDO ---
+# Se ejecuta en el hilo escritor (ver escritor.py): no hace commit y
+# devuelve el id del pedido creado, el stock resultante de cada producto y
+# lo necesario para vaciar el carrito en memoria una vez confirmado.
+# El carrito en memoria (ver carritos.py) se escribe primero, en la misma
+# transacción. Si sus precios coinciden línea a línea con los productos
+# recién leídos, se usan sus totales en lugar de recalcular cada línea. También suma el pedido a
+# los rollups de analítica (ver analitica.py).
+
+_CARRITO_DEL_USUARIO = select(models.Carrito).options(
+    joinedload(models.Carrito.items).joinedload(models.ItemCarrito.producto)
+).where(models.Carrito.id_usuario == bindparam("id_usuario"))
+
+def _precios_vigentes(instantanea, items) -> bool:
+    # La versión PRECIOS en caché puede ir hasta CACHE_SYNC_INTERVAL por
+    # detrás: se compara cada precio con el producto leído en esta transacción.
+    return (
+        instantanea is not None
+        and instantanea.items == {item.id_producto: item.cantidad for item in items}
+        and all(
+            instantanea.precios.get(item.id_producto) == float(item.producto.precio)
+            for item in items
+        )
+    )
+
+def _crear_pedido(db: Session, user_id: int) -> tuple:
+    instantanea = tienda_carritos.escribir_para_pedido(db, user_id)
+
+    carrito = db.scalars(_CARRITO_DEL_USUARIO, {"id_usuario": user_id}).unique().first()
+
+    if not carrito or not carrito.items:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El carrito está vacío.")
+
+    total_pedido = 0
+    items_pedido_creados = []
+    stock_nuevo = {}
+    lineas_analitica = []
+    usar_instantanea = _precios_vigentes(instantanea, carrito.items)
+    
+    for item_carrito in carrito.items:
+        producto = item_carrito.producto
+        if producto.stock < item_carrito.cantidad:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Stock insuficiente para {producto.nombre_producto}. Disponible: {producto.stock}"
+            )
+        if not usar_instantanea:
+            subtotal = float(producto.precio) * item_carrito.cantidad
+            total_pedido += subtotal
+
+    if usar_instantanea:
+        total_pedido = instantanea.total
+    
+    nuevo_pedido = models.Pedido(
+        id_usuario=user_id,
+        total=total_pedido,
+        estado="pendiente",
+        direccion_envio="Dirección de prueba"
+    )
+    db.add(nuevo_pedido)
+    db.flush()
+
+    for item_carrito in carrito.items:
+        producto = item_carrito.producto
+        producto.stock -= item_carrito.cantidad
+        stock_nuevo[producto.id_producto] = producto.stock
+        precio = instantanea.precios[item_carrito.id_producto] if usar_instantanea else float(producto.precio)
+        
+        item_pedido = models.ItemPedido(
+            id_pedido=nuevo_pedido.id_pedido,
+            id_producto=item_carrito.id_producto,
+            cantidad=item_carrito.cantidad,
+            precio_unitario=precio,
+            subtotal=precio * item_carrito.cantidad
+        )
+        items_pedido_creados.append(item_pedido)
+        lineas_analitica.append((producto.id_producto, producto.categoria, item_carrito.cantidad, item_pedido.subtotal))
+        db.delete(item_carrito)
+    # Las copias del carrito en otros workers quedan viejas: no pueden
+    # volver a escribir los items comprados (ver carritos.py)
+    carrito.version += 1
+
+    db.add_all(items_pedido_creados)
+    db.flush()
+    analitica.registrar_pedido(db, nuevo_pedido.fecha_pedido.date(), nuevo_pedido.total, lineas_analitica)
+    # El stock de las páginas cacheadas del catálogo puede quedar atrasado
+    # (se invalidarían con cada pedido); solo se invalidan si se agotó algo
+    nombres = [cache.CARRITOS, cache.STOCK]
+    if 0 in stock_nuevo.values():
+        nombres.append(cache.CATALOGO)
+    versiones = cache.bump_version_en(db, *nombres)
+    return nuevo_pedido.id_pedido, stock_nuevo, instantanea, carrito.version, versiones
+
+# --- CONSULTAS DE PEDIDOS ---
+# Armadas una sola vez (con sus joinedload); cada request solo pasa los valores.
+
+_SELECT_PEDIDOS = select(models.Pedido).options(
+    joinedload(models.Pedido.items).joinedload(models.ItemPedido.producto)
+)
+_PEDIDO_POR_ID = _SELECT_PEDIDOS.where(models.Pedido.id_pedido == bindparam("id_pedido"))
+_PEDIDOS_DEL_USUARIO = _SELECT_PEDIDOS.where(
+    models.Pedido.id_usuario == bindparam("id_usuario")
+).order_by(models.Pedido.fecha_pedido.desc())
+
 # --- ENDPOINTS DE PEDIDOS ---
 
 @router.post("/orders", response_model=schemas.PedidoResponse, status_code=status.HTTP_201_CREATED)
@@ -24,66 +134,23 @@ def create_order(
     # --- CORREGIDO ---
     user_id = current_user.id_usuario
     
-    carrito = db.query(models.Carrito).options(
-        joinedload(models.Carrito.items).joinedload(models.ItemCarrito.producto)
-    ).filter(models.Carrito.id_usuario == user_id).first()
-
-    if not carrito or not carrito.items:
-        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="El carrito está vacío.")
-
     try:
-        total_pedido = 0
-        items_pedido_creados = []
-        
-        for item_carrito in carrito.items:
-            producto = item_carrito.producto
-            if producto.stock < item_carrito.cantidad:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Stock insuficiente para {producto.nombre_producto}. Disponible: {producto.stock}"
-                )
-            subtotal = float(producto.precio) * item_carrito.cantidad
-            total_pedido += subtotal
-        
-        nuevo_pedido = models.Pedido(
-            id_usuario=user_id,
-            total=total_pedido,
-            estado="pendiente",
-            direccion_envio="Dirección de prueba"
-        )
-        db.add(nuevo_pedido)
-        db.flush()
-
-        for item_carrito in carrito.items:
-            producto = item_carrito.producto
-            producto.stock -= item_carrito.cantidad
-            
-            item_pedido = models.ItemPedido(
-                id_pedido=nuevo_pedido.id_pedido,
-                id_producto=item_carrito.id_producto,
-                cantidad=item_carrito.cantidad,
-                precio_unitario=producto.precio,
-                subtotal=float(producto.precio) * item_carrito.cantidad
-            )
-            items_pedido_creados.append(item_pedido)
-            db.delete(item_carrito)
-
-        db.add_all(items_pedido_creados)
-        db.commit()
-        
-        db.refresh(nuevo_pedido)
-        pedido_respuesta = db.query(models.Pedido).options(
-            joinedload(models.Pedido.items).joinedload(models.ItemPedido.producto)
-        ).filter(models.Pedido.id_pedido == nuevo_pedido.id_pedido).first()
-        
-        return pedido_respuesta
-
+        id_pedido, stock_nuevo, instantanea, version_carrito, versiones = ejecutar_escritura(_crear_pedido, user_id)
     except Exception as e:
-        db.rollback()
+        # El escritor ya hizo rollback de la transacción
         if isinstance(e, HTTPException):
             raise e
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al crear el pedido: {str(e)}")
 
+    # Recién con el pedido confirmado se vacía el carrito en memoria
+    cache.publicar_versiones(versiones)
+    tienda_carritos.vaciar_tras_pedido(user_id, instantanea, version_carrito, versiones.get(cache.CARRITOS))
+    disponibilidad_stock.fijar(stock_nuevo)
+
+    pedido_respuesta = db.scalars(_PEDIDO_POR_ID, {"id_pedido": id_pedido}).unique().first()
+    
+    return pedido_respuesta
+
 @router.get("/orders", response_model=List[schemas.PedidoResponse])
 def get_user_orders(
     db: Session = Depends(get_db),
@@ -92,9 +159,7 @@ def get_user_orders(
 ):
     # --- CORREGIDO ---
     user_id = current_user.id_usuario
-    pedidos = db.query(models.Pedido).options(
-        joinedload(models.Pedido.items).joinedload(models.ItemPedido.producto)
-    ).filter(models.Pedido.id_usuario == user_id).order_by(models.Pedido.fecha_pedido.desc()).all()
+    pedidos = db.scalars(_PEDIDOS_DEL_USUARIO, {"id_usuario": user_id}).unique().all()
     return pedidos
 
 @router.get("/orders/{id_pedido}", response_model=schemas.PedidoResponse)
@@ -106,9 +171,7 @@ def get_order_details(
 ):
     # --- CORREGIDO ---
     user_id = current_user.id_usuario
-    pedido = db.query(models.Pedido).options(
-        joinedload(models.Pedido.items).joinedload(models.ItemPedido.producto)
-    ).filter(models.Pedido.id_pedido == id_pedido).first()
+    pedido = db.scalars(_PEDIDO_POR_ID, {"id_pedido": id_pedido}).unique().first()
     
     if not pedido:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Pedido no encontrado.")
@@ -1,19 +1,45 @@
 # backend/api/products.py
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Request, UploadFile, File
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session, joinedload
-from typing import List, Optional
-from sqlalchemy import func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+from typing import List, Literal, Optional
+from sqlalchemy import DateTime, String, bindparam, case, func, insert, select, tuple_, type_coerce, update
+from pydantic import ValidationError
+import base64
+import csv
+import io
+import json
 
 import schemas
 import models
+import cache
 from database import get_db
+from serializers import filas_a_dicts, json_response
+from stock import disponibilidad_stock
+from sugerencias import indice_sugerencias
+from relacionados import RELACIONADOS_TOP
+from compression import PayloadCacheado
+from pydantic_core import to_json
 # Importamos ambas dependencias
 from dependencies import get_current_user, require_admin
 
 router = APIRouter()
 
 # --- FUNCIÓN AUXILIAR DE FILTRO ---
+# Los criterios se arman una sola vez con bindparam; cada consulta solo
+# agrega los que usa y pasa los valores con .params().
+_FILTRO_BUSQUEDA = (
+    models.Producto.nombre_producto.ilike(bindparam("f_busqueda"))
+    | models.Producto.descripcion.ilike(bindparam("f_busqueda"))
+)
+_FILTRO_CATEGORIA = models.Producto.categoria == bindparam("f_categoria")
+_FILTRO_MARCA = models.Producto.marca == bindparam("f_marca")
+_FILTRO_PRECIO_MIN = models.Producto.precio >= bindparam("f_precio_min")
+_FILTRO_PRECIO_MAX = models.Producto.precio <= bindparam("f_precio_max")
+
 def _apply_product_filters(
     query: "Query", 
     search: Optional[str] = None,
@@ -25,26 +51,434 @@ def _apply_product_filters(
     """
     Función auxiliar para aplicar filtros de producto comunes a una consulta.
     """
+    valores = {}
     if search:
-        search_pattern = f"%{search}%"
-        query = query.filter(
-            (models.Producto.nombre_producto.ilike(search_pattern)) |
-            (models.Producto.descripcion.ilike(search_pattern))
-        )
+        query = query.filter(_FILTRO_BUSQUEDA)
+        valores["f_busqueda"] = f"%{search}%"
     if category:
-        query = query.filter(models.Producto.categoria == category)
+        query = query.filter(_FILTRO_CATEGORIA)
+        valores["f_categoria"] = category
     if marca:
-        query = query.filter(models.Producto.marca == marca)
+        query = query.filter(_FILTRO_MARCA)
+        valores["f_marca"] = marca
     if precio_min is not None:
-        query = query.filter(models.Producto.precio >= precio_min)
+        query = query.filter(_FILTRO_PRECIO_MIN)
+        valores["f_precio_min"] = precio_min
     if precio_max is not None:
-        query = query.filter(models.Producto.precio <= precio_max)
-    return query
+        query = query.filter(_FILTRO_PRECIO_MAX)
+        valores["f_precio_max"] = precio_max
+    return query.params(valores) if valores else query
+
+# --- ORDEN Y PAGINACIÓN POR CURSOR ---
+
+# sort -> (columna, descendente). El desempate siempre es por id_producto
+# en el mismo sentido, así cada orden coincide con un índice (ver models.py).
+ORDENES_PRODUCTO = {
+    "precio_asc": (models.Producto.precio, False),
+    "precio_desc": (models.Producto.precio, True),
+    "fecha_agregado": (models.Producto.fecha_agregado, True),
+    "nombre_producto": (models.Producto.nombre_producto, False),
+}
+
+def _clave_cursor(columna):
+    """
+    Expresión cuyo valor va en el cursor. SQLite guarda las fechas como
+    texto y el keyset las compara como texto: el cursor lleva el texto tal
+    como está guardado, que puede tener o no '.000000' según cómo se
+    insertó la fila (CURRENT_TIMESTAMP o un datetime desde Python).
+    """
+    if isinstance(columna.type, DateTime):
+        return type_coerce(columna, String).label("clave_cursor")
+    return columna
+
+def _codificar_cursor(sort: Optional[str], valor, id_producto: int) -> str:
+    # El cursor lleva el orden que lo generó: solo sirve para ese mismo 'sort'
+    crudo = json.dumps([sort, valor, id_producto]).encode()
+    return base64.urlsafe_b64encode(crudo).decode().rstrip("=")
+
+def _decodificar_cursor(cursor: str, sort: Optional[str]):
+    try:
+        crudo = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        orden, valor, id_producto = json.loads(crudo)
+        if orden != sort:
+            raise ValueError("El cursor es de otro orden")
+        return valor, int(id_producto)
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido.")
+
+def _apply_product_order(query: "Query", sort: Optional[str] = None, cursor: Optional[str] = None):
+    """
+    Aplica el ORDER BY del parámetro 'sort' y, si hay cursor, la condición
+    de keyset "(clave, id) > (último valor, último id)" para la página siguiente.
+    """
+    if sort is None:
+        if cursor:
+            _, ultimo_id = _decodificar_cursor(cursor, sort)
+            query = query.filter(models.Producto.id_producto > ultimo_id)
+        return query.order_by(models.Producto.id_producto)
+
+    columna, descendente = ORDENES_PRODUCTO[sort]
+    if cursor:
+        valor, ultimo_id = _decodificar_cursor(cursor, sort)
+        clave = tuple_(columna, models.Producto.id_producto)
+        limite = tuple_(valor, ultimo_id)
+        query = query.filter(clave < limite if descendente else clave > limite)
+    if descendente:
+        return query.order_by(columna.desc(), models.Producto.id_producto.desc())
+    return query.order_by(columna, models.Producto.id_producto)
+
+# --- IMPORTACIÓN / EXPORTACIÓN MASIVA ---
+
+# Filas por transacción (un executemany por bloque)
+BULK_CHUNK_SIZE = 1000
+# Máximo de errores detallados en la respuesta de la importación
+BULK_MAX_ERRORES = 500
+
+CAMPOS_EXPORTACION = [
+    "id_producto", "nombre_producto", "descripcion", "marca",
+    "categoria", "precio", "stock", "imagen",
+]
+
+def _leer_filas(archivo: UploadFile, formato: str):
+    """
+    Generador que recorre el archivo subido fila por fila (sin cargarlo
+    entero en memoria). Devuelve tuplas (numero_fila, dict | None, error).
+    """
+    texto = io.TextIOWrapper(archivo.file, encoding="utf-8-sig", newline="")
+    if formato == "csv":
+        # La fila 1 es la cabecera
+        for numero, fila in enumerate(csv.DictReader(texto), start=2):
+            # En CSV las celdas vacías significan "sin valor" (se usa el default)
+            yield numero, {k: v for k, v in fila.items() if k and v not in ("", None)}, None
+    else:
+        for numero, linea in enumerate(texto, start=1):
+            if not linea.strip():
+                continue
+            try:
+                fila = json.loads(linea)
+            except ValueError as e:
+                yield numero, None, f"JSON inválido: {e}"
+                continue
+            if not isinstance(fila, dict):
+                yield numero, None, "Cada línea debe ser un objeto JSON"
+                continue
+            yield numero, fila, None
+
+def _validar_fila(fila: dict) -> dict:
+    """
+    Valida una fila contra ProductoCreate. Si trae 'id_producto' se conserva
+    para hacer upsert sobre ese producto.
+    """
+    id_producto = fila.pop("id_producto", None)
+    valores = schemas.ProductoCreate.model_validate(fila).model_dump()
+    if id_producto is not None:
+        try:
+            valores["id_producto"] = int(id_producto)
+        except (TypeError, ValueError):
+            raise ValueError("id_producto debe ser un entero")
+    return valores
+
+def _escribir_bloque(db: Session, bloque: List[tuple]) -> List[tuple]:
+    """
+    Inserta/actualiza un bloque de filas validadas en una sola transacción.
+    Las filas con id_producto hacen upsert; el resto se insertan.
+    Si el bloque falla, se reintenta fila por fila para aislar las erróneas.
+    Devuelve la lista de (numero_fila, detalle) que no se pudieron escribir.
+    """
+    tabla = models.Producto.__table__
+    upsert = sqlite_insert(tabla)
+    upsert = upsert.on_conflict_do_update(
+        index_elements=[tabla.c.id_producto],
+        set_={campo: upsert.excluded[campo] for campo in CAMPOS_EXPORTACION if campo != "id_producto"},
+    )
+
+    def _ejecutar(filas: List[dict]):
+        con_id = [f for f in filas if "id_producto" in f]
+        sin_id = [f for f in filas if "id_producto" not in f]
+        if con_id:
+            db.execute(upsert, con_id)
+        if sin_id:
+            db.execute(insert(tabla), sin_id)
+
+    try:
+        _ejecutar([valores for _, valores in bloque])
+        db.commit()
+        return []
+    except SQLAlchemyError:
+        db.rollback()
+
+    errores = []
+    for numero, valores in bloque:
+        try:
+            _ejecutar([valores])
+            db.commit()
+        except SQLAlchemyError as e:
+            db.rollback()
+            errores.append((numero, f"Error al guardar: {e.orig if hasattr(e, 'orig') else e}"))
+    return errores
+
+@router.post("/products/bulk", response_model=schemas.ProductoImportResponse)
+def bulk_import_productos(
+    archivo: UploadFile = File(..., description="Archivo CSV (con cabecera) o NDJSON"),
+    formato: Optional[Literal["csv", "ndjson"]] = Query(None, description="Si se omite, se deduce de la extensión"),
+    db: Session = Depends(get_db),
+    current_user: models.Usuario = Depends(require_admin)
+):
+    """
+    Importación masiva de productos (solo admin).
+    Las filas se validan contra ProductoCreate y se escriben en bloques de
+    BULK_CHUNK_SIZE con un único executemany por bloque.
+    """
+    if formato is None:
+        nombre = (archivo.filename or "").lower()
+        formato = "ndjson" if nombre.endswith((".ndjson", ".jsonl")) else "csv"
+
+    filas_procesadas = 0
+    importados = 0
+    errores: List[tuple] = []
+    bloque: List[tuple] = []
+
+    def _vaciar_bloque():
+        nonlocal importados
+        fallidas = _escribir_bloque(db, bloque)
+        importados += len(bloque) - len(fallidas)
+        errores.extend(fallidas)
+        bloque.clear()
+
+    for numero, fila, error in _leer_filas(archivo, formato):
+        filas_procesadas += 1
+        if error:
+            errores.append((numero, error))
+            continue
+        try:
+            bloque.append((numero, _validar_fila(fila)))
+        except ValidationError as e:
+            detalle = "; ".join(f"{'.'.join(str(l) for l in err['loc'])}: {err['msg']}" for err in e.errors())
+            errores.append((numero, detalle))
+            continue
+        except ValueError as e:
+            errores.append((numero, str(e)))
+            continue
+        if len(bloque) >= BULK_CHUNK_SIZE:
+            _vaciar_bloque()
+
+    if bloque:
+        _vaciar_bloque()
+    if importados:
+        cache.bump_version(cache.CATALOGO, cache.PRECIOS, cache.NOMBRES, cache.STOCK)
+        disponibilidad_stock.invalidar()
+        indice_sugerencias.invalidar()
+
+    errores.sort()
+    return {
+        "filas_procesadas": filas_procesadas,
+        "importados": importados,
+        "errores": [{"fila": n, "detalle": d} for n, d in errores[:BULK_MAX_ERRORES]],
+        "errores_omitidos": max(len(errores) - BULK_MAX_ERRORES, 0),
+    }
+
+@router.get("/products/export")
+def export_productos(
+    formato: Literal["csv", "ndjson"] = Query("csv"),
+    db: Session = Depends(get_db),
+    current_user: models.Usuario = Depends(require_admin)
+):
+    """
+    Exporta el catálogo completo (solo admin) en streaming.
+    Las filas se leen del cursor de a BULK_CHUNK_SIZE, nunca todas juntas.
+    """
+    columnas = [getattr(models.Producto, campo) for campo in CAMPOS_EXPORTACION]
+    stmt = (
+        select(*columnas)
+        .order_by(models.Producto.id_producto)
+        .execution_options(yield_per=BULK_CHUNK_SIZE)
+    )
+
+    def _generar():
+        resultado = db.execute(stmt)
+        if formato == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(CAMPOS_EXPORTACION)
+            for particion in resultado.partitions():
+                writer.writerows(particion)
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            yield buffer.getvalue()
+        else:
+            for particion in resultado.mappings().partitions():
+                yield "".join(json.dumps(dict(fila), ensure_ascii=False) + "\n" for fila in particion)
+
+    media_type = "text/csv" if formato == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        _generar(),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="productos.{formato}"'},
+    )
+
+# --- ACTUALIZACIÓN MASIVA DE STOCK / PRECIO ---
+
+# Máximo de parámetros por 'IN (...)' al comprobar qué ids existen
+_IN_CHUNK_SIZE = 500
+
+@router.patch("/products/stock", response_model=schemas.ProductoStockBatchResponse)
+def bulk_update_stock(
+    lote: schemas.ProductoStockBatch,
+    db: Session = Depends(get_db),
+    current_user: models.Usuario = Depends(require_admin)
+):
+    """
+    Aplica un lote de cambios de stock/precio (solo admin) en una única
+    transacción: un UPDATE con executemany por cada forma de cambio.
+    Los ids inexistentes se ignoran y se informan en la respuesta.
+    """
+    tabla = models.Producto.__table__
+
+    ids = list({item.id_producto for item in lote.items})
+    existentes = set()
+    for i in range(0, len(ids), _IN_CHUNK_SIZE):
+        bloque = ids[i:i + _IN_CHUNK_SIZE]
+        existentes.update(db.execute(
+            select(tabla.c.id_producto).where(tabla.c.id_producto.in_(bloque))
+        ).scalars())
+
+    # Agrupamos por "forma" del cambio para que cada grupo sea un executemany
+    grupos = {}
+    for item in lote.items:
+        if item.id_producto not in existentes:
+            continue
+        forma = (item.modo if item.stock is not None else None, item.precio is not None)
+        params = {"b_id": item.id_producto}
+        if item.stock is not None:
+            params["b_stock"] = item.stock
+        if item.precio is not None:
+            params["b_precio"] = item.precio
+        grupos.setdefault(forma, []).append(params)
+
+    try:
+        for (modo_stock, con_precio), params in grupos.items():
+            valores = {}
+            if modo_stock == "absoluto":
+                valores["stock"] = bindparam("b_stock")
+            elif modo_stock == "delta":
+                # El stock nunca queda negativo
+                valores["stock"] = func.max(func.coalesce(tabla.c.stock, 0) + bindparam("b_stock"), 0)
+            if con_precio:
+                valores["precio"] = bindparam("b_precio")
+            stmt = update(tabla).where(tabla.c.id_producto == bindparam("b_id")).values(**valores)
+            db.execute(stmt, params)
+        db.commit()
+    except SQLAlchemyError as e:
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Error al actualizar el stock: {str(e)}")
+
+    # Los ids son únicos en el lote (ver schemas.ProductoStockBatch)
+    actualizados = sum(len(params) for params in grupos.values())
+    if actualizados:
+        # Una sola invalidación por lote, no una por fila
+        if any(con_precio for _, con_precio in grupos):
+            cache.bump_version(cache.CATALOGO, cache.PRECIOS, cache.STOCK)
+        else:
+            cache.bump_version(cache.CATALOGO, cache.STOCK)
+        disponibilidad_stock.invalidar(existentes)
+
+    return {
+        "actualizados": actualizados,
+        "ids_inexistentes": sorted(set(ids) - existentes),
+    }
 
 # --- ENDPOINTS DE PRODUCTOS ---
 
+# --- CACHÉS DEL CATÁLOGO ---
+# Se invalidan con la versión del catálogo (escrituras de productos). Los
+# pedidos no la incrementan salvo que agoten un producto (ver orders.py):
+# el stock de una página cacheada puede quedar atrasado, la disponibilidad
+# no. El detalle del producto y el carrito siempre ven el stock actual.
+# Las páginas se guardan como PayloadCacheado: bytes JSON + variantes comprimidas.
+_cache_paginas = cache.CacheVersionada(cache.CATALOGO, maxsize=1024)
+_cache_conteos = cache.CacheVersionada(cache.CATALOGO, maxsize=1024)
+
+# --- PROYECCIÓN DE COLUMNAS (fields= / view=) ---
+
+# Campos de ProductoResponse, en el mismo orden que el schema
+CAMPOS_PRODUCTO = tuple(schemas.ProductoResponse.model_fields)
+
+# Vistas predefinidas: 'card' es lo que muestra la grilla del catálogo
+VISTAS_PRODUCTO = {
+    "card": ("id_producto", "nombre_producto", "precio", "stock", "imagen"),
+    "full": CAMPOS_PRODUCTO,
+}
+
+def _resolver_campos(view: str, fields: Optional[str]) -> tuple:
+    """
+    Devuelve los campos a seleccionar, en el orden del schema.
+    'fields' (lista separada por comas) tiene prioridad sobre 'view'.
+    id_producto se incluye siempre.
+    """
+    if not fields:
+        return VISTAS_PRODUCTO[view]
+    pedidos = {campo.strip() for campo in fields.split(",") if campo.strip()}
+    invalidos = pedidos - set(CAMPOS_PRODUCTO)
+    if invalidos:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Campos inválidos: {', '.join(sorted(invalidos))}. Válidos: {', '.join(CAMPOS_PRODUCTO)}"
+        )
+    pedidos.add("id_producto")
+    return tuple(campo for campo in CAMPOS_PRODUCTO if campo in pedidos)
+
+def _calcular_pagina(
+    db: Session, campos: tuple, page: int, limit: int,
+    search, category, marca, precio_min, precio_max, sort, cursor
+) -> PayloadCacheado:
+    """ Consulta una página del catálogo y la deja serializada para la caché. """
+    columnas = [getattr(models.Producto, campo) for campo in campos]
+    # El cursor necesita el valor de la clave de orden aunque no se haya pedido
+    clave_orden = _clave_cursor(ORDENES_PRODUCTO[sort][0]) if sort else None
+    if clave_orden is not None and clave_orden.key not in campos:
+        columnas.append(clave_orden)
+
+    # Consulta por columnas: solo se leen los campos pedidos (p. ej. sin 'descripcion')
+    query = db.query(*columnas)
+    query = _apply_product_filters(
+        query, search, category, marca, precio_min, precio_max
+    )
+    query = _apply_product_order(query, sort, cursor)
+    if cursor:
+        productos = query.limit(limit).all()
+    else:
+        skip = (page - 1) * limit
+        productos = query.offset(skip).limit(limit).all()
+
+    headers = {}
+    if len(productos) == limit:
+        ultimo = productos[-1]
+        valor = getattr(ultimo, clave_orden.key) if sort else None
+        headers["X-Next-Cursor"] = _codificar_cursor(sort, valor, ultimo.id_producto)
+
+    if len(columnas) > len(campos):
+        datos = [{campo: fila[i] for i, campo in enumerate(campos)} for fila in productos]
+    else:
+        datos = filas_a_dicts(productos)
+    return PayloadCacheado(to_json(datos), headers=headers)
+
+def _pagina_cacheada(
+    db: Session, campos: tuple, page: int, limit: int,
+    search=None, category=None, marca=None, precio_min=None, precio_max=None, sort=None, cursor=None
+) -> PayloadCacheado:
+    clave_cache = (
+        page if not cursor else None, limit, search, category, marca,
+        precio_min, precio_max, sort, cursor, campos,
+    )
+    return _cache_paginas.get_or_set(
+        clave_cache,
+        lambda: _calcular_pagina(db, campos, page, limit, search, category, marca, precio_min, precio_max, sort, cursor)
+    )
+
 @router.get("/products", response_model=List[schemas.ProductoResponse])
 def get_productos(
+    request: Request,
     page: int = Query(1, ge=1), 
     limit: int = Query(10, ge=1, le=100),
     search: Optional[str] = None,
@@ -52,15 +486,23 @@ def get_productos(
     marca: Optional[str] = None,
     precio_min: Optional[float] = None,
     precio_max: Optional[float] = None,
+    sort: Optional[Literal["precio_asc", "precio_desc", "fecha_agregado", "nombre_producto"]] = None,
+    cursor: Optional[str] = Query(None, description="Cursor de la cabecera X-Next-Cursor (reemplaza a 'page')"),
+    view: Literal["card", "full"] = Query("full", description="'card': id, nombre, precio, stock e imagen"),
+    fields: Optional[str] = Query(None, description="Campos separados por comas (tiene prioridad sobre 'view')"),
     db: Session = Depends(get_db)
 ):
-    query = db.query(models.Producto)
-    query = _apply_product_filters(
-        query, search, category, marca, precio_min, precio_max
-    )
-    skip = (page - 1) * limit
-    productos = query.offset(skip).limit(limit).all()
-    return productos
+    campos = _resolver_campos(view, fields)
+    payload = _pagina_cacheada(db, campos, page, limit, search, category, marca, precio_min, precio_max, sort, cursor)
+    return payload.respuesta(request)
+
+def _conteo_cacheado(db: Session, filtros: tuple) -> int:
+    def _contar():
+        query = db.query(models.Producto)
+        query = _apply_product_filters(query, *filtros)
+        return query.count()
+
+    return _cache_conteos.get_or_set(filtros, _contar)
 
 @router.get("/products/count", response_model=dict)
 def get_productos_count(
@@ -71,20 +513,136 @@ def get_productos_count(
     precio_max: Optional[float] = None, 
     db: Session = Depends(get_db)
 ):
-    query = db.query(models.Producto)
-    query = _apply_product_filters(
-        query, search, category, marca, precio_min, precio_max
+    filtros = (search, category, marca, precio_min, precio_max)
+    return {"total": _conteo_cacheado(db, filtros)}
+
+# Límites de los rangos de precio para las facetas: [0, 25), [25, 50), ...
+FACETA_LIMITES_PRECIO = (25, 50, 100, 250, 500, 1000)
+
+_cache_facetas = cache.CacheVersionada(cache.CATALOGO, maxsize=512)
+
+def _calcular_facetas(db: Session, filtros: tuple) -> dict:
+    """
+    Cuenta productos por categoría, marca y rango de precio en una sola
+    consulta agrupada por las tres columnas; los totales de cada faceta
+    se obtienen sumando los grupos.
+    """
+    rango = case(
+        *[(models.Producto.precio < limite, i) for i, limite in enumerate(FACETA_LIMITES_PRECIO)],
+        else_=len(FACETA_LIMITES_PRECIO)
+    ).label("rango")
+
+    query = db.query(
+        models.Producto.categoria, models.Producto.marca, rango, func.count()
+    )
+    query = _apply_product_filters(query, *filtros)
+    grupos = query.group_by(models.Producto.categoria, models.Producto.marca, rango).all()
+
+    total = 0
+    categorias, marcas = {}, {}
+    rangos = [0] * (len(FACETA_LIMITES_PRECIO) + 1)
+    for categoria, marca, indice_rango, cantidad in grupos:
+        total += cantidad
+        categorias[categoria] = categorias.get(categoria, 0) + cantidad
+        marcas[marca] = marcas.get(marca, 0) + cantidad
+        rangos[indice_rango] += cantidad
+
+    def _ordenar(conteos: dict) -> List[dict]:
+        return [
+            {"valor": valor, "cantidad": cantidad}
+            for valor, cantidad in sorted(conteos.items(), key=lambda kv: (-kv[1], kv[0]))
+        ]
+
+    limites = (None,) + FACETA_LIMITES_PRECIO + (None,)
+    return {
+        "total": total,
+        "categorias": _ordenar(categorias),
+        "marcas": _ordenar(marcas),
+        "precios": [
+            {"desde": limites[i], "hasta": limites[i + 1], "cantidad": cantidad}
+            for i, cantidad in enumerate(rangos)
+        ],
+    }
+
+def _facetas_cacheadas(db: Session, filtros: tuple) -> PayloadCacheado:
+    return _cache_facetas.get_or_set(
+        filtros, lambda: PayloadCacheado(to_json(_calcular_facetas(db, filtros)))
     )
-    total = query.count()
-    return {"total": total}
+
+@router.get("/products/facets", response_model=schemas.FacetasResponse)
+def get_productos_facets(
+    request: Request,
+    search: Optional[str] = None,
+    category: Optional[str] = None,
+    marca: Optional[str] = None,
+    precio_min: Optional[float] = None,
+    precio_max: Optional[float] = None,
+    db: Session = Depends(get_db)
+):
+    """
+    Conteos por categoría, marca y rango de precio para los filtros actuales.
+    El resultado se cachea por versión del catálogo (ya serializado y comprimible).
+    """
+    filtros = (search, category, marca, precio_min, precio_max)
+    return _facetas_cacheadas(db, filtros).respuesta(request)
+
+@router.get("/products/suggest", response_model=List[schemas.ProductoSugerenciaResponse])
+def get_productos_suggest(
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(8, ge=1, le=20)
+):
+    """
+    Autocompletado por prefijo sobre nombre y marca ("cam so" -> "Cámara Sony"),
+    los más vendidos primero. Se resuelve en memoria (ver sugerencias.py).
+    """
+    return json_response(indice_sugerencias.sugerir(q, limit))
+
+# Páginas que se precargan al arrancar: la primera de la grilla del frontend
+# (vista 'card', 6 por página) y la del listado por defecto.
+PAGINAS_CALENTAMIENTO = (("card", 6), ("full", 10))
+
+def calentar_catalogo(db: Session):
+    """ Carga en las cachés las primeras páginas, el conteo y las facetas sin filtros (ver arranque.py). """
+    sin_filtros = (None, None, None, None, None)
+    for view, limit in PAGINAS_CALENTAMIENTO:
+        _pagina_cacheada(db, VISTAS_PRODUCTO[view], 1, limit)
+    _conteo_cacheado(db, sin_filtros)
+    _facetas_cacheadas(db, sin_filtros)
+
+_PRODUCTO_POR_ID = select(models.Producto).where(models.Producto.id_producto == bindparam("id_producto")).limit(1)
 
 @router.get("/products/{id_producto}", response_model=schemas.ProductoResponse)
 def get_producto(id_producto: int, db: Session = Depends(get_db)):
-    producto = db.query(models.Producto).filter(models.Producto.id_producto == id_producto).first()
+    producto = db.scalars(_PRODUCTO_POR_ID, {"id_producto": id_producto}).first()
     if not producto:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado")
     return producto
 
+# Un rango de la PK de productos_relacionados, ya ordenado (ver relacionados.py)
+_RELACIONADOS_DE = (
+    select(
+        models.Producto.id_producto, models.Producto.nombre_producto, models.Producto.precio,
+        models.Producto.stock, models.Producto.imagen, models.ProductoRelacionado.pedidos,
+    )
+    .join(models.ProductoRelacionado, models.ProductoRelacionado.id_relacionado == models.Producto.id_producto)
+    .where(models.ProductoRelacionado.id_producto == bindparam("id_producto"))
+    .order_by(models.ProductoRelacionado.posicion)
+    .limit(bindparam("limite"))
+)
+
+@router.get("/products/{id_producto}/related", response_model=List[schemas.ProductoRelacionadoResponse])
+def get_producto_related(
+    id_producto: int,
+    limit: int = Query(6, ge=1, le=RELACIONADOS_TOP),
+    db: Session = Depends(get_db)
+):
+    """
+    Productos que más se compran junto a este, según el último cálculo
+    de relacionados.py. Lista vacía si todavía no tiene.
+    """
+    filas = db.execute(_RELACIONADOS_DE, {"id_producto": id_producto, "limite": limit}).all()
+    return json_response(filas_a_dicts(filas))
+
 @router.post("/products", response_model=schemas.ProductoResponse, status_code=status.HTTP_201_CREATED)
 def create_producto(
     producto: schemas.ProductoCreate, 
@@ -96,6 +654,9 @@ def create_producto(
     db.add(db_producto)
     db.commit()
     db.refresh(db_producto)
+    cache.bump_version(cache.CATALOGO, cache.PRECIOS, cache.NOMBRES, cache.STOCK)
+    disponibilidad_stock.fijar({db_producto.id_producto: db_producto.stock})
+    indice_sugerencias.agregar(db_producto.id_producto, db_producto.nombre_producto, db_producto.marca)
     return db_producto
 
 @router.put("/products/{id_producto}", response_model=schemas.ProductoResponse)
@@ -110,11 +671,23 @@ def update_producto(
     if not db_producto:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado")
     
+    precio_anterior = db_producto.precio
+    nombre_anterior = (db_producto.nombre_producto, db_producto.marca)
     for key, value in producto.model_dump().items():
         setattr(db_producto, key, value)
     
     db.commit()
     db.refresh(db_producto)
+    versiones = [cache.CATALOGO, cache.STOCK]
+    if db_producto.precio != precio_anterior:
+        versiones.append(cache.PRECIOS)
+    cambio_nombre = (db_producto.nombre_producto, db_producto.marca) != nombre_anterior
+    if cambio_nombre:
+        versiones.append(cache.NOMBRES)
+    cache.bump_version(*versiones)
+    disponibilidad_stock.fijar({db_producto.id_producto: db_producto.stock})
+    if cambio_nombre:
+        indice_sugerencias.agregar(db_producto.id_producto, db_producto.nombre_producto, db_producto.marca)
     return db_producto
 
 @router.delete("/products/{id_producto}", status_code=status.HTTP_204_NO_CONTENT)
@@ -130,4 +703,7 @@ def delete_producto(
     
     db.delete(db_producto)
     db.commit()
+    cache.bump_version(cache.CATALOGO, cache.PRECIOS, cache.NOMBRES, cache.STOCK)
+    disponibilidad_stock.invalidar([id_producto])
+    indice_sugerencias.quitar(id_producto)
     return None
\ No newline at end of file
@@ -0,0 +1,41 @@
+# backend/api/sistema.py
+
+from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
+from typing import Dict
+
+import schemas
+import models
+from admision import control_admision
+from arranque import estado_arranque
+from database import estadisticas_cache_sentencias
+from dependencies import require_admin
+
+router = APIRouter()
+
+
+@router.get("/sistema/listo", response_model=schemas.ArranqueResponse)
+def get_readiness():
+    """
+    Readiness: 200 cuando el proceso terminó de calentarse (ver arranque.py),
+    503 mientras tanto. No requiere autenticación.
+    """
+    resumen = estado_arranque.resumen()
+    return JSONResponse(resumen, status_code=200 if resumen["listo"] else 503)
+
+
+@router.get("/sistema/admision", response_model=Dict[str, schemas.AdmisionClaseResponse])
+async def get_admission_metrics(
+    current_user: models.Usuario = Depends(require_admin)
+):
+    """ Requests en curso, en espera y descartados por clase de ruta (ver admision.py). """
+    # async: se lee en el event loop, el mismo hilo que actualiza los contadores
+    return control_admision.metricas()
+
+
+@router.get("/sistema/consultas", response_model=schemas.CacheSentenciasResponse)
+def get_statement_cache_stats(
+    current_user: models.Usuario = Depends(require_admin)
+):
+    """ Aciertos de la caché de sentencias compiladas de SQLAlchemy (ver database.py). """
+    return estadisticas_cache_sentencias()
@@ -0,0 +1,110 @@
+# backend/archivo_mensajes.py
+
+import logging
+import os
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, exists, insert, select, tuple_
+from sqlalchemy.orm import Session, aliased
+
+import models
+from escritor import ejecutar_escritura
+from tareas import TareaPeriodica
+
+logger = logging.getLogger(__name__)
+
+# =====================================================================
+# ARCHIVADO DEL HISTORIAL DE MENSAJERÍA
+# =====================================================================
+# Las conversaciones leídas con más de MENSAJES_RETENCION_DIAS pasan a
+# 'conversaciones_archivo', y sus mensajes a 'mensajes_archivo' cuando ya
+# no los referencia ninguna conversación activa. Así las consultas de
+# api/messages.py trabajan sobre tablas chicas.
+#
+# Nunca se archiva:
+#   - la última conversación de cada par de usuarios (la usan la bandeja y
+#     create_or_get_conversation),
+#   - las no leídas (la usan los contadores de notificaciones).
+#
+# Se archiva en lotes de MENSAJES_ARCHIVO_LOTE filas, cada uno en su propia
+# transacción del escritor (ver escritor.py), así nunca retiene el lock de
+# escritura por mucho tiempo.
+
+MENSAJES_RETENCION_DIAS = int(os.getenv("MENSAJES_RETENCION_DIAS", 180))
+MENSAJES_ARCHIVO_LOTE = int(os.getenv("MENSAJES_ARCHIVO_LOTE", 500))
+# Cada cuántos segundos corre el archivado
+MENSAJES_ARCHIVO_INTERVALO = float(os.getenv("MENSAJES_ARCHIVO_INTERVALO", 3600))
+
+_conversaciones = models.Conversacion.__table__
+_mensajes = models.Mensaje.__table__
+_conversaciones_archivo = models.ConversacionArchivo.__table__
+_mensajes_archivo = models.MensajeArchivo.__table__
+
+
+def _hay_posterior(conversacion, remitente, destinatario):
+    """ Existe una conversación más nueva entre 'remitente' y 'destinatario'. """
+    otra = aliased(_conversaciones)
+    return exists().where(
+        otra.c.id_usuario_remitente == remitente,
+        otra.c.id_usuario_destinatario == destinatario,
+        tuple_(otra.c.fecha_envio, otra.c.id_conversacion)
+        > tuple_(conversacion.c.fecha_envio, conversacion.c.id_conversacion),
+    )
+
+
+def _archivar_lote(db: Session, corte: datetime, limite: int) -> int:
+    """ Mueve al archivo hasta 'limite' conversaciones. No hace commit. """
+    c = _conversaciones
+    candidatas = db.execute(
+        select(c.c.id_conversacion, c.c.id_mensaje)
+        .where(
+            c.c.fecha_envio < corte,
+            c.c.leido == True,
+            _hay_posterior(c, c.c.id_usuario_remitente, c.c.id_usuario_destinatario)
+            | _hay_posterior(c, c.c.id_usuario_destinatario, c.c.id_usuario_remitente),
+        )
+        .order_by(c.c.id_conversacion)
+        .limit(limite)
+    ).all()
+    if not candidatas:
+        return 0
+
+    ids = [fila.id_conversacion for fila in candidatas]
+    columnas = [col.name for col in _conversaciones_archivo.c]
+    db.execute(insert(_conversaciones_archivo).from_select(
+        columnas, select(*[c.c[nombre] for nombre in columnas]).where(c.c.id_conversacion.in_(ids))
+    ))
+    db.execute(delete(c).where(c.c.id_conversacion.in_(ids)))
+
+    # Solo se mueven los mensajes que ya no usa ninguna conversación activa
+    ids_mensajes = {fila.id_mensaje for fila in candidatas}
+    m = _mensajes
+    sin_uso = select(m.c.id_mensaje).where(
+        m.c.id_mensaje.in_(ids_mensajes),
+        ~exists().where(c.c.id_mensaje == m.c.id_mensaje),
+    )
+    ids_sin_uso = list(db.execute(sin_uso).scalars())
+    if ids_sin_uso:
+        columnas = [col.name for col in _mensajes_archivo.c]
+        db.execute(insert(_mensajes_archivo).from_select(
+            columnas, select(*[m.c[nombre] for nombre in columnas]).where(m.c.id_mensaje.in_(ids_sin_uso))
+        ))
+        db.execute(delete(m).where(m.c.id_mensaje.in_(ids_sin_uso)))
+    return len(ids)
+
+
+def archivar(retencion_dias: int = MENSAJES_RETENCION_DIAS, lote: int = MENSAJES_ARCHIVO_LOTE) -> int:
+    """ Archiva todo lo que superó la retención, de a 'lote' filas. Devuelve cuántas conversaciones movió. """
+    corte = datetime.utcnow() - timedelta(days=retencion_dias)
+    total = 0
+    while True:
+        movidas = ejecutar_escritura(_archivar_lote, corte, lote)
+        total += movidas
+        if movidas < lote:
+            break
+    if total:
+        logger.info("Mensajería: %d conversaciones archivadas", total)
+    return total
+
+
+tarea_archivo_mensajes = TareaPeriodica("mensajes-archivo", MENSAJES_ARCHIVO_INTERVALO, archivar)
@@ -0,0 +1,104 @@
+# backend/arranque.py
+
+import logging
+import os
+import threading
+import time
+
+from sqlalchemy.orm import configure_mappers
+
+import auth
+from api.products import calentar_catalogo
+from database import ReadSessionLocal, SessionLocal
+from dependencies import cargar_usuario
+from stock import disponibilidad_stock
+from sugerencias import indice_sugerencias
+
+logger = logging.getLogger(__name__)
+
+# =====================================================================
+# CALENTAMIENTO AL ARRANCAR
+# =====================================================================
+# Lo que de otro modo pagarían los primeros requests: configuración de los
+# mappers de SQLAlchemy, compilación de las consultas más usadas, detección
+# del backend de bcrypt, inicialización de jose, las cachés del catálogo
+# vacías y el índice del autocompletado sin armar. Corre en un hilo desde
+# el lifespan (main.py): el proceso ya acepta conexiones, pero
+# GET /api/sistema/listo responde 503 hasta que termina.
+
+ARRANQUE_CALENTAR = os.getenv("ARRANQUE_CALENTAR", "1") != "0"
+
+
+class EstadoArranque:
+
+    def __init__(self):
+        self.listo = False
+        self.importacion_ms = None
+        self.calentamiento_ms = None
+        self.pasos = {}
+
+    def resumen(self) -> dict:
+        return {
+            "listo": self.listo,
+            "importacion_ms": self.importacion_ms,
+            "calentamiento_ms": self.calentamiento_ms,
+            "pasos": dict(self.pasos),
+        }
+
+
+estado_arranque = EstadoArranque()
+
+
+def _consultas_frecuentes():
+    # El usuario se busca en las dos sesiones: cada engine tiene su propia
+    # caché de sentencias compiladas.
+    for fabrica in (ReadSessionLocal, SessionLocal):
+        db = fabrica()
+        try:
+            cargar_usuario(db, 0)
+        finally:
+            db.close()
+    disponibilidad_stock.consultar([0])
+
+
+def _catalogo():
+    db = ReadSessionLocal()
+    try:
+        calentar_catalogo(db)
+    finally:
+        db.close()
+
+
+PASOS = (
+    ("mapeos", configure_mappers),
+    ("bcrypt", lambda: auth.pwd_context.handler().get_backend()),
+    ("jwt", lambda: auth.decodificar_token(auth.crear_access_token({"user_id": 0}))),
+    ("consultas", _consultas_frecuentes),
+    ("catalogo", _catalogo),
+    ("sugerencias", indice_sugerencias.cargar),
+)
+
+
+def calentar():
+    """ Ejecuta los pasos de calentamiento y marca el proceso como listo. """
+    inicio = time.perf_counter()
+    if ARRANQUE_CALENTAR:
+        for nombre, paso in PASOS:
+            inicio_paso = time.perf_counter()
+            try:
+                paso()
+            except Exception:
+                # Un paso fallido (p. ej. migraciones sin aplicar) solo se
+                # pierde el calentamiento: el request lo pagará después
+                logger.exception("Error en el paso de calentamiento '%s'", nombre)
+            estado_arranque.pasos[nombre] = round((time.perf_counter() - inicio_paso) * 1000, 3)
+    estado_arranque.calentamiento_ms = round((time.perf_counter() - inicio) * 1000, 3)
+    estado_arranque.listo = True
+    logger.info(
+        "Arranque: importación %.0f ms, calentamiento %.0f ms",
+        estado_arranque.importacion_ms or 0, estado_arranque.calentamiento_ms,
+    )
+
+
+def iniciar_calentamiento():
+    threading.Thread(target=calentar, name="calentamiento", daemon=True).start()
@@ -1,5 +1,7 @@
 # backend/auth.py
+import hashlib
 import os
+import secrets
 from datetime import datetime, timedelta, timezone
 from typing import Optional
 from fastapi import Depends, HTTPException, status
@@ -18,6 +20,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
 SECRET_KEY = os.getenv("SECRET_KEY")
 ALGORITHM = os.getenv("ALGORITHM", "HS256")
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", 14))
 
 if not SECRET_KEY:
     raise EnvironmentError("Falta la variable de entorno SECRET_KEY en el archivo .env (¡Crítico para seguridad!)")
@@ -51,4 +54,16 @@ def decodificar_token(token: str) -> dict:
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail=f"Token inválido o expirado: {str(e)}",
             headers={"WWW-Authenticate": "Bearer"},
-        )
\ No newline at end of file
+        )
+
+# --- Funciones Auxiliares de Refresh Tokens ---
+# Tokens opacos y aleatorios: la base guarda solo su sha256, así que
+# validarlos es una búsqueda por índice, sin bcrypt (ver api/auth.py).
+def generar_refresh_token() -> str:
+    return secrets.token_urlsafe(32)
+
+def hash_refresh_token(token: str) -> str:
+    return hashlib.sha256(token.encode()).hexdigest()
+
+def nueva_familia_refresh() -> str:
+    return secrets.token_hex(16)
\ No newline at end of file
@@ -0,0 +1,87 @@
+# backend/benchmarks/_comun.py
+# Utilidades compartidas por los benchmarks.
+# Se ejecutan desde la carpeta backend/, por ejemplo:
+#   python -m benchmarks.bench_serializacion
+
+import http.client
+import os
+import socket
+import time
+
+# auth.py exige SECRET_KEY al importarse
+os.environ.setdefault("SECRET_KEY", "clave_solo_para_benchmarks")
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from database import Base
+import models
+
+
+def crear_sesion_memoria():
+    """ Sesión sobre una base SQLite en memoria con todas las tablas creadas. """
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+
+def cargar_productos(db, cantidad: int, largo_descripcion: int = 400):
+    """ Inserta 'cantidad' productos de prueba con descripciones de texto largo. """
+    db.add_all([
+        models.Producto(
+            nombre_producto=f"Producto {i}",
+            descripcion=("Descripción de prueba. " * (largo_descripcion // 23 + 1))[:largo_descripcion],
+            marca=f"Marca {i % 7}",
+            categoria=f"Categoría {i % 5}",
+            precio=10 + (i % 300) * 1.5,
+            stock=i % 40,
+            imagen=f"https://example.com/img/{i}.jpg",
+        )
+        for i in range(cantidad)
+    ])
+    db.commit()
+
+
+def puerto_libre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def esperar_servidor(puerto: int, ruta: str = "/", timeout: float = 30.0, intervalo: float = 0.2):
+    """ Espera a que GET 'ruta' responda 200 en el puerto indicado. """
+    limite = time.monotonic() + timeout
+    while time.monotonic() < limite:
+        try:
+            conexion = http.client.HTTPConnection("127.0.0.1", puerto, timeout=1)
+            conexion.request("GET", ruta)
+            respuesta = conexion.getresponse()
+            respuesta.read()
+            if respuesta.status == 200:
+                return
+        except OSError:
+            pass
+        time.sleep(intervalo)
+    raise RuntimeError("El servidor no respondió a tiempo")
+
+
+def medir_cpu(fn, repeticiones: int) -> float:
+    """ Tiempo de CPU promedio por llamada, en milisegundos. """
+    fn()  # calentamiento
+    inicio = time.process_time()
+    for _ in range(repeticiones):
+        fn()
+    return (time.process_time() - inicio) * 1000 / repeticiones
+
+
+def imprimir_resultados(titulo: str, resultados: dict):
+    print(f"\n{titulo}")
+    print("-" * len(titulo))
+    ancho = max(len(nombre) for nombre in resultados)
+    for nombre, valor in resultados.items():
+        print(f"{nombre.ljust(ancho)}  {valor:8.3f} ms")
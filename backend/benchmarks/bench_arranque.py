@@ -0,0 +1,93 @@
+# backend/benchmarks/bench_arranque.py
+# Tiempo hasta el primer request rápido: levanta servidor.py (1 worker) sobre
+# una base temporal, con y sin calentamiento (ARRANQUE_CALENTAR), y mide
+# cuándo responde por primera vez, cuándo está listo (GET /api/sistema/listo)
+# y cuánto tardan los primeros requests del frontend.
+#
+#   python -m benchmarks.bench_arranque [corridas]
+
+import http.client
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks._comun import cargar_productos, esperar_servidor, puerto_libre
+from database import Base
+
+# Lo que pide el frontend al entrar (ver App.jsx)
+PRIMEROS_REQUESTS = (
+    "/api/products?page=1&limit=6&view=card",
+    "/api/products/count?page=1&limit=6",
+)
+
+
+def _get(puerto: int, ruta: str) -> tuple:
+    conexion = http.client.HTTPConnection("127.0.0.1", puerto, timeout=30)
+    inicio = time.perf_counter()
+    conexion.request("GET", ruta)
+    respuesta = conexion.getresponse()
+    cuerpo = respuesta.read()
+    return (time.perf_counter() - inicio) * 1000, cuerpo
+
+
+def _corrida(url: str, backend: str, calentar: bool) -> dict:
+    puerto = puerto_libre()
+    entorno = dict(
+        os.environ,
+        SQLALCHEMY_DATABASE_URL=url,
+        WEB_HOST="127.0.0.1",
+        WEB_PORT=str(puerto),
+        WEB_WORKERS="1",
+        ARRANQUE_CALENTAR="1" if calentar else "0",
+    )
+    inicio = time.perf_counter()
+    proceso = subprocess.Popen(
+        [sys.executable, "servidor.py"], cwd=backend, env=entorno,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        esperar_servidor(puerto, intervalo=0.01)
+        responde = (time.perf_counter() - inicio) * 1000
+        esperar_servidor(puerto, "/api/sistema/listo", intervalo=0.01)
+        listo = (time.perf_counter() - inicio) * 1000
+        _, cuerpo = _get(puerto, "/api/sistema/listo")
+        arranque = json.loads(cuerpo)
+        primeros = [_get(puerto, ruta)[0] for ruta in PRIMEROS_REQUESTS]
+        return {
+            "importación": arranque["importacion_ms"],
+            "responde": responde,
+            "listo": listo,
+            "primeros requests": sum(primeros),
+        }
+    finally:
+        proceso.terminate()
+        proceso.wait()
+
+
+def main():
+    corridas = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+    directorio = tempfile.mkdtemp()
+    url = f"sqlite:///{os.path.join(directorio, 'bench.db')}"
+
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    cargar_productos(sessionmaker(bind=engine)(), 5000)
+    engine.dispose()
+
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    print(f"\nArranque de un worker (ms, promedio de {corridas} corridas)")
+    for calentar in (False, True):
+        resultados = [_corrida(url, backend, calentar) for _ in range(corridas)]
+        promedios = {nombre: sum(r[nombre] for r in resultados) / corridas for nombre in resultados[0]}
+        detalle = "  ".join(f"{nombre}: {valor:8.1f}" for nombre, valor in promedios.items())
+        print(f"{'con' if calentar else 'sin'} calentamiento  {detalle}")
+
+
+if __name__ == "__main__":
+    main()
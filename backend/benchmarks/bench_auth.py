@@ -0,0 +1,69 @@
+# backend/benchmarks/bench_auth.py
+# Costo de renovar la sesión: POST /api/auth/login (bcrypt) contra
+# POST /api/auth/refresh (búsqueda por sha256 + rotación del token).
+#
+#   python -m benchmarks.bench_auth
+
+import os
+import tempfile
+import time
+
+# La app lee la URL de la base al importarse
+_directorio = tempfile.mkdtemp()
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{os.path.join(_directorio, 'bench.db')}"
+
+from fastapi.testclient import TestClient
+
+from benchmarks._comun import imprimir_resultados
+from database import Base, engine
+import main
+
+REPETICIONES = 50
+
+
+def _medir(fn, repeticiones: int) -> tuple:
+    """ (tiempo real, tiempo de CPU) promedio por llamada, en milisegundos. """
+    fn()  # calentamiento
+    inicio_real, inicio_cpu = time.perf_counter(), time.process_time()
+    for _ in range(repeticiones):
+        fn()
+    return (
+        (time.perf_counter() - inicio_real) * 1000 / repeticiones,
+        (time.process_time() - inicio_cpu) * 1000 / repeticiones,
+    )
+
+
+def main_bench():
+    Base.metadata.create_all(bind=engine)
+
+    with TestClient(main.app) as cliente:
+        cliente.post("/api/auth/register", json={
+            "nombre_usuario": "bench", "email": "bench@example.com", "password": "clave_bench",
+            "nombre": "Bench", "apellido": "Bench",
+        })
+        credenciales = {"username": "bench", "password": "clave_bench"}
+        refresh_token = cliente.post("/api/auth/login", data=credenciales).json()["refresh_token"]
+
+        def login():
+            respuesta = cliente.post("/api/auth/login", data=credenciales)
+            assert respuesta.status_code == 200, respuesta.text
+
+        def refresh():
+            nonlocal refresh_token
+            respuesta = cliente.post("/api/auth/refresh", json={"refresh_token": refresh_token})
+            assert respuesta.status_code == 200, respuesta.text
+            refresh_token = respuesta.json()["refresh_token"]
+
+        login_real, login_cpu = _medir(login, REPETICIONES)
+        refresh_real, refresh_cpu = _medir(refresh, REPETICIONES)
+
+    imprimir_resultados("Renovación de la sesión (por request)", {
+        "login (tiempo real)": login_real,
+        "login (CPU)": login_cpu,
+        "refresh (tiempo real)": refresh_real,
+        "refresh (CPU)": refresh_cpu,
+    })
+
+
+if __name__ == "__main__":
+    main_bench()
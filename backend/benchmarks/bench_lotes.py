@@ -0,0 +1,78 @@
+# backend/benchmarks/bench_lotes.py
+# Carga inicial del frontend: los cuatro GETs por separado (como antes)
+# contra un solo POST /api/batch con las mismas rutas.
+#
+#   python -m benchmarks.bench_lotes
+
+import os
+import tempfile
+import time
+
+# La app lee la URL de la base al importarse
+_directorio = tempfile.mkdtemp()
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{os.path.join(_directorio, 'bench.db')}"
+
+from fastapi.testclient import TestClient
+
+from benchmarks._comun import cargar_productos, imprimir_resultados
+from database import Base, SessionLocal, engine
+import main
+
+REPETICIONES = 200
+
+# Lo que pide el frontend al entrar (ver App.jsx)
+RUTAS = (
+    "/api/products?page=1&limit=6&view=card",
+    "/api/products/count?page=1&limit=6",
+    "/api/cart",
+    "/api/orders",
+)
+
+
+def _medir(fn, repeticiones: int) -> tuple:
+    """ (tiempo real, tiempo de CPU) promedio por llamada, en milisegundos. """
+    fn()  # calentamiento
+    inicio_real, inicio_cpu = time.perf_counter(), time.process_time()
+    for _ in range(repeticiones):
+        fn()
+    return (
+        (time.perf_counter() - inicio_real) * 1000 / repeticiones,
+        (time.process_time() - inicio_cpu) * 1000 / repeticiones,
+    )
+
+
+def main_bench():
+    Base.metadata.create_all(bind=engine)
+    cargar_productos(SessionLocal(), 500)
+
+    with TestClient(main.app) as cliente:
+        cliente.post("/api/auth/register", json={
+            "nombre_usuario": "bench", "email": "bench@example.com", "password": "clave_bench",
+            "nombre": "Bench", "apellido": "Bench",
+        })
+        token = cliente.post("/api/auth/login", data={"username": "bench", "password": "clave_bench"}).json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        def separados():
+            for ruta in RUTAS:
+                respuesta = cliente.get(ruta, headers=headers)
+                assert respuesta.status_code == 200, respuesta.text
+
+        def lote():
+            respuesta = cliente.post("/api/batch", json={"rutas": list(RUTAS)}, headers=headers)
+            assert respuesta.status_code == 200, respuesta.text
+            assert all(r["status"] == 200 for r in respuesta.json()["respuestas"])
+
+        separados_real, separados_cpu = _medir(separados, REPETICIONES)
+        lote_real, lote_cpu = _medir(lote, REPETICIONES)
+
+    imprimir_resultados(f"Carga inicial: {len(RUTAS)} GETs (por página)", {
+        "requests separados (tiempo real)": separados_real,
+        "requests separados (CPU)": separados_cpu,
+        "POST /api/batch (tiempo real)": lote_real,
+        "POST /api/batch (CPU)": lote_cpu,
+    })
+
+
+if __name__ == "__main__":
+    main_bench()
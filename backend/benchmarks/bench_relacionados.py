@@ -0,0 +1,72 @@
+# backend/benchmarks/bench_relacionados.py
+# Cálculo de "comprados juntos" (relacionados.py) sobre pedidos sintéticos:
+# tiempo total y pico de memoria de los conteos según los ids de producto
+# por pasada. Menos productos por pasada = menos memoria y más pasadas.
+#
+#   python -m benchmarks.bench_relacionados [pedidos]
+
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+# La app lee la URL de la base al importarse
+_directorio = tempfile.mkdtemp()
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{os.path.join(_directorio, 'bench.db')}"
+
+from sqlalchemy import insert
+
+from database import Base, SessionLocal, engine
+import models
+import relacionados
+
+PRODUCTOS = 20000
+PASADAS = (20000, 5000, 1000)
+
+
+def _cargar_pedidos(cantidad: int):
+    """ Pedidos de 1 a 8 productos; unos pocos productos venden mucho más que el resto. """
+    azar = random.Random(42)
+    db = SessionLocal()
+    db.execute(insert(models.Usuario.__table__), [{
+        "id_usuario": 1, "nombre_usuario": "bench", "email": "bench@example.com",
+        "password_hash": "x", "nombre": "Bench", "apellido": "Bench",
+    }])
+    pedidos, items = [], []
+    for id_pedido in range(1, cantidad + 1):
+        pedidos.append({"id_pedido": id_pedido, "id_usuario": 1, "total": 0, "direccion_envio": "-"})
+        productos = {int(azar.paretovariate(1.2)) % PRODUCTOS + 1 for _ in range(azar.randint(1, 8))}
+        items.extend(
+            {"id_pedido": id_pedido, "id_producto": id_producto, "cantidad": 1, "precio_unitario": 1, "subtotal": 1}
+            for id_producto in productos
+        )
+    db.execute(insert(models.Pedido.__table__), pedidos)
+    db.execute(insert(models.ItemPedido.__table__), items)
+    db.commit()
+    db.close()
+    return len(items)
+
+
+def main():
+    pedidos = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    Base.metadata.create_all(bind=engine)
+    lineas = _cargar_pedidos(pedidos)
+
+    print(f"\nRelacionados: {pedidos} pedidos, {lineas} items")
+    for por_pasada in PASADAS:
+        tracemalloc.start()
+        inicio = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            relacionados.recalcular(productos_por_pasada=por_pasada)
+        total = time.perf_counter() - inicio
+        _, pico = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(f"{por_pasada:6d} productos por pasada  {total:7.2f} s  pico {pico / 2**20:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+# backend/benchmarks/bench_sentencias.py
+# CPU por ejecución de las consultas frecuentes: armando la Query en cada
+# request (como antes) contra las sentencias definidas una sola vez a nivel
+# de módulo con bindparam (las que usan hoy dependencies.py y api/).
+# Ambas pasan por la caché de sentencias compiladas: la diferencia es el
+# armado de la consulta y el cálculo de su clave de caché.
+#
+#   python -m benchmarks.bench_sentencias
+
+from sqlalchemy import case, func
+from sqlalchemy.orm import joinedload
+
+from benchmarks._comun import crear_sesion_memoria, cargar_productos, medir_cpu, imprimir_resultados
+from api import messages, orders, products
+import dependencies
+import models
+
+REPETICIONES = 2000
+
+
+def main():
+    db = crear_sesion_memoria()
+    cargar_productos(db, 200)
+    usuario = models.Usuario(
+        nombre_usuario="bench", email="bench@example.com", password_hash="x", nombre="Bench", apellido="Bench"
+    )
+    db.add(usuario)
+    db.commit()
+    user_id = usuario.id_usuario
+
+    def usuario_antes():
+        db.query(models.Usuario).filter(models.Usuario.id_usuario == user_id).first()
+
+    def usuario_despues():
+        dependencies.cargar_usuario(db, user_id)
+
+    def pedidos_antes():
+        db.query(models.Pedido).options(
+            joinedload(models.Pedido.items).joinedload(models.ItemPedido.producto)
+        ).filter(models.Pedido.id_usuario == user_id).order_by(models.Pedido.fecha_pedido.desc()).all()
+
+    def pedidos_despues():
+        db.scalars(orders._PEDIDOS_DEL_USUARIO, {"id_usuario": user_id}).unique().all()
+
+    def bandeja_antes():
+        C = models.Conversacion
+        otro = case((C.id_usuario_remitente == user_id, C.id_usuario_destinatario), else_=C.id_usuario_remitente)
+        ranking = db.query(
+            C.id_conversacion,
+            func.row_number().over(partition_by=otro, order_by=C.fecha_envio.desc()).label("rn")
+        ).filter((C.id_usuario_remitente == user_id) | (C.id_usuario_destinatario == user_id)).subquery()
+        ids = [fila[0] for fila in db.query(ranking.c.id_conversacion).filter(ranking.c.rn == 1).all()]
+        db.query(C).options(
+            joinedload(C.usuario_remitente), joinedload(C.usuario_destinatario), joinedload(C.mensaje)
+        ).filter(C.id_conversacion.in_(ids)).order_by(C.fecha_envio.desc()).all()
+
+    def bandeja_despues():
+        db.scalars(messages._ULTIMAS_CONVERSACIONES, {"id_usuario": user_id}).all()
+
+    def filtros_antes():
+        P = models.Producto
+        db.query(P.id_producto).filter(
+            P.nombre_producto.ilike("%Producto 1%") | P.descripcion.ilike("%Producto 1%"),
+            P.categoria == "Categoría 1",
+            P.precio >= 10,
+        ).limit(10).all()
+
+    def filtros_despues():
+        products._apply_product_filters(
+            db.query(models.Producto.id_producto), "Producto 1", "Categoría 1", None, 10, None
+        ).limit(10).all()
+
+    casos = (
+        ("usuario por id", usuario_antes, usuario_despues),
+        ("pedidos del usuario", pedidos_antes, pedidos_despues),
+        ("bandeja de mensajes", bandeja_antes, bandeja_despues),
+        ("filtros del catálogo", filtros_antes, filtros_despues),
+    )
+    resultados = {}
+    for nombre, antes, despues in casos:
+        resultados[f"{nombre}: antes"] = medir_cpu(antes, REPETICIONES)
+        resultados[f"{nombre}: después"] = medir_cpu(despues, REPETICIONES)
+        db.expunge_all()
+
+    imprimir_resultados("CPU por ejecución de las consultas frecuentes", resultados)
+
+
+if __name__ == "__main__":
+    main()
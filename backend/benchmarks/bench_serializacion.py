@@ -0,0 +1,53 @@
+# backend/benchmarks/bench_serializacion.py
+# CPU por página de 100 productos: camino anterior (objetos ORM validados con
+# from_attributes + serialización de FastAPI + json.dumps) contra el actual
+# (consulta por columnas + pydantic_core.to_json).
+#
+#   python -m benchmarks.bench_serializacion
+
+import json
+from typing import List
+
+from pydantic import TypeAdapter
+
+from benchmarks._comun import crear_sesion_memoria, cargar_productos, medir_cpu, imprimir_resultados
+from serializers import filas_a_dicts, json_response
+import models
+import schemas
+
+TAMANIO_PAGINA = 100
+REPETICIONES = 300
+
+
+def main():
+    db = crear_sesion_memoria()
+    cargar_productos(db, 1000)
+
+    adaptador = TypeAdapter(List[schemas.ProductoResponse])
+    columnas = [getattr(models.Producto, campo) for campo in schemas.ProductoResponse.model_fields]
+
+    def antes():
+        productos = db.query(models.Producto).limit(TAMANIO_PAGINA).all()
+        # Lo que hace FastAPI con response_model: validar y luego serializar
+        validados = adaptador.validate_python(productos, from_attributes=True)
+        contenido = adaptador.dump_python(validados, mode="json")
+        db.expunge_all()
+        return json.dumps(contenido).encode()
+
+    def despues():
+        filas = db.query(*columnas).limit(TAMANIO_PAGINA).all()
+        return json_response(filas_a_dicts(filas)).body
+
+    assert json.loads(antes()) == json.loads(despues())
+
+    imprimir_resultados(
+        f"CPU por página de {TAMANIO_PAGINA} productos",
+        {
+            "antes (ORM + response_model)": medir_cpu(antes, REPETICIONES),
+            "después (filas + to_json)": medir_cpu(despues, REPETICIONES),
+        },
+    )
+
+
+if __name__ == "__main__":
+    main()
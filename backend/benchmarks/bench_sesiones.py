@@ -0,0 +1,109 @@
+# backend/benchmarks/bench_sesiones.py
+# Conexiones tomadas del pool por request autenticado (lecturas y escrituras),
+# contando el evento 'checkout' de los engines de los requests. Con la sesión
+# única por request (ver database.get_db) tiene que dar 1, también cuando el
+# stock y el carrito no están en memoria y se leen de la base: falla si no.
+#
+# La única excepción es la relectura de las versiones de caché
+# (cache._sincronizar): usa su propia conexión, como mucho una vez cada
+# CACHE_SYNC_INTERVAL segundos por proceso, y se cuenta aparte. El hilo
+# escritor (escritor.py) usa su propio engine y no entra en la cuenta.
+#
+#   python -m benchmarks.bench_sesiones
+
+import os
+import tempfile
+
+# La app lee la URL de la base al importarse
+_directorio = tempfile.mkdtemp()
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{os.path.join(_directorio, 'bench.db')}"
+
+from sqlalchemy import event
+from fastapi.testclient import TestClient
+
+from benchmarks._comun import cargar_productos
+from database import Base, SessionLocal, engine, read_engine
+from stock import disponibilidad_stock
+import cache
+import main
+
+REPETICIONES = 50
+
+
+def main_bench():
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    cargar_productos(db, 50)
+    db.close()
+
+    checkouts = [0]
+    sincronizaciones = [0]
+
+    def contar(*args):
+        checkouts[0] += 1
+
+    sincronizar = cache._sincronizar
+
+    def sincronizar_contando():
+        antes = cache._ultima_sync
+        sincronizar()
+        if cache._ultima_sync != antes:
+            sincronizaciones[0] += 1
+
+    def en_frio():
+        # Ni el stock ni el carrito en memoria: se leen con la sesión del request
+        disponibilidad_stock.invalidar()
+        cache.bump_version(cache.CARRITOS)
+
+    with TestClient(main.app) as cliente:
+        cliente.post("/api/auth/register", json={
+            "nombre_usuario": "bench", "email": "bench@example.com", "password": "clave_bench",
+            "nombre": "Bench", "apellido": "Bench",
+        })
+        token = cliente.post("/api/auth/login", data={
+            "username": "bench", "password": "clave_bench",
+        }).json()["access_token"]
+        cabeceras = {"Authorization": f"Bearer {token}"}
+        carrito = {"id_producto": 40, "cantidad": 1}
+        cliente.post("/api/cart/add", json=carrito, headers=cabeceras)
+
+        # nombre -> (preparación fuera de la cuenta, request)
+        llamadas = {
+            "GET /api/orders": (None, lambda: cliente.get("/api/orders", headers=cabeceras)),
+            "GET /api/conversations": (None, lambda: cliente.get("/api/conversations", headers=cabeceras)),
+            "PUT /api/cart/update": (None, lambda: cliente.put("/api/cart/update", json=carrito, headers=cabeceras)),
+            "PUT /api/cart/update (en frío)": (
+                en_frio, lambda: cliente.put("/api/cart/update", json=carrito, headers=cabeceras)
+            ),
+            "GET /api/cart (en frío)": (en_frio, lambda: cliente.get("/api/cart", headers=cabeceras)),
+        }
+
+        motores = {engine, read_engine}
+        for motor in motores:
+            event.listen(motor.pool, "checkout", contar)
+        cache._sincronizar = sincronizar_contando
+        try:
+            print("\nConexiones tomadas del pool por request")
+            print("---------------------------------------")
+            ancho = max(len(nombre) for nombre in llamadas)
+            print(f"{''.ljust(ancho)}  request  versiones")
+            for nombre, (preparar, llamada) in llamadas.items():
+                por_request = por_sync = 0
+                for _ in range(REPETICIONES):
+                    if preparar:
+                        preparar()
+                    checkouts[0] = sincronizaciones[0] = 0
+                    respuesta = llamada()
+                    assert respuesta.status_code < 400, respuesta.text
+                    por_request += checkouts[0] - sincronizaciones[0]
+                    por_sync += sincronizaciones[0]
+                print(f"{nombre.ljust(ancho)}  {por_request / REPETICIONES:7.2f}  {por_sync / REPETICIONES:9.2f}")
+                assert por_request == REPETICIONES, f"{nombre}: {por_request} conexiones en {REPETICIONES} requests"
+        finally:
+            cache._sincronizar = sincronizar
+            for motor in motores:
+                event.remove(motor.pool, "checkout", contar)
+
+
+if __name__ == "__main__":
+    main_bench()
@@ -0,0 +1,47 @@
+# backend/benchmarks/bench_sugerencias.py
+# Autocompletado: el filtro ILIKE '%...%' del listado (lo único que había)
+# contra el índice de prefijos en memoria de sugerencias.py, con 5000
+# productos. "prod" coincide con todo el catálogo: es el peor caso del índice.
+#
+#   python -m benchmarks.bench_sugerencias
+
+import os
+import tempfile
+
+# La app lee la URL de la base al importarse
+_directorio = tempfile.mkdtemp()
+os.environ["SQLALCHEMY_DATABASE_URL"] = f"sqlite:///{os.path.join(_directorio, 'bench.db')}"
+
+from benchmarks._comun import cargar_productos, medir_cpu, imprimir_resultados
+from database import Base, ReadSessionLocal, SessionLocal, engine
+from api import products
+from sugerencias import indice_sugerencias
+import models
+
+PRODUCTOS = 5000
+REPETICIONES = 200
+CONSULTAS = ("prod", "producto 12", "marca 3")
+
+
+def main():
+    Base.metadata.create_all(bind=engine)
+    cargar_productos(SessionLocal(), PRODUCTOS)
+    indice_sugerencias.cargar()
+    db = ReadSessionLocal()
+
+    resultados = {}
+    for texto in CONSULTAS:
+        def ilike():
+            products._apply_product_filters(
+                db.query(models.Producto.id_producto, models.Producto.nombre_producto), texto, None, None, None, None
+            ).limit(8).all()
+
+        resultados[f"'{texto}': ILIKE"] = medir_cpu(ilike, REPETICIONES)
+        resultados[f"'{texto}': índice"] = medir_cpu(lambda: indice_sugerencias.sugerir(texto, 8), REPETICIONES)
+    db.close()
+
+    imprimir_resultados(f"Autocompletado con {PRODUCTOS} productos (CPU por consulta)", resultados)
+
+
+if __name__ == "__main__":
+    main()
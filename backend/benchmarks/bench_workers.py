@@ -0,0 +1,83 @@
+# backend/benchmarks/bench_workers.py
+# Throughput de GET /api/products con 1, 2, 4... workers (hasta la cantidad
+# de núcleos). Cada corrida levanta servidor.py sobre una base temporal.
+#
+#   python -m benchmarks.bench_workers [segundos_por_corrida]
+
+import http.client
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from benchmarks._comun import cargar_productos, esperar_servidor, puerto_libre
+from database import Base
+
+CLIENTES = 32
+PAGINAS = 20
+
+
+def _medir(puerto: int, segundos: float) -> float:
+    fin = time.monotonic() + segundos
+    completados = [0] * CLIENTES
+
+    def cliente(indice: int):
+        conexion = http.client.HTTPConnection("127.0.0.1", puerto, timeout=10)
+        pagina = indice % PAGINAS
+        while time.monotonic() < fin:
+            conexion.request("GET", f"/api/products?page={pagina + 1}&limit=20")
+            conexion.getresponse().read()
+            completados[indice] += 1
+            pagina = (pagina + 1) % PAGINAS
+
+    hilos = [threading.Thread(target=cliente, args=(i,)) for i in range(CLIENTES)]
+    for hilo in hilos:
+        hilo.start()
+    for hilo in hilos:
+        hilo.join()
+    return sum(completados) / segundos
+
+
+def main():
+    segundos = float(sys.argv[1]) if len(sys.argv) > 1 else 10.0
+    directorio = tempfile.mkdtemp()
+    url = f"sqlite:///{os.path.join(directorio, 'bench.db')}"
+
+    engine = create_engine(url)
+    Base.metadata.create_all(bind=engine)
+    cargar_productos(sessionmaker(bind=engine)(), 2000)
+    engine.dispose()
+
+    nucleos = os.cpu_count() or 1
+    cantidades = sorted({1, *[n for n in (2, 4, 8, 16) if n <= nucleos]})
+    backend = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    print(f"\nThroughput de GET /api/products ({CLIENTES} clientes, {segundos:.0f} s por corrida)")
+    for workers in cantidades:
+        puerto = puerto_libre()
+        entorno = dict(
+            os.environ,
+            SQLALCHEMY_DATABASE_URL=url,
+            WEB_HOST="127.0.0.1",
+            WEB_PORT=str(puerto),
+            WEB_WORKERS=str(workers),
+        )
+        proceso = subprocess.Popen(
+            [sys.executable, "servidor.py"], cwd=backend, env=entorno,
+            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            esperar_servidor(puerto)
+            print(f"{workers:>2} worker(s): {_medir(puerto, segundos):9.1f} req/s")
+        finally:
+            proceso.terminate()
+            proceso.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+# backend/cache.py
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from sqlalchemy import select
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from database import engine
+import models
+
+logger = logging.getLogger(__name__)
+
+# =====================================================================
+# VERSIONES DE CACHÉ
+# =====================================================================
+# Cada espacio de nombres tiene un contador que se incrementa cuando cambian
+# sus datos. Las cachés guardan la versión con la que calcularon cada valor
+# y lo descartan si ya no coincide, así una escritura invalida todo de una vez.
+#
+# Los contadores viven en la tabla 'cache_versiones' para que todos los
+# workers (procesos) vean las invalidaciones de los demás: cada proceso
+# relee la tabla como mucho cada CACHE_SYNC_INTERVAL segundos, que es el
+# máximo tiempo que un worker puede servir datos de otra versión.
+
+CATALOGO = "catalogo"  # Cambios en productos (el stock que descuentan los pedidos solo si agota alguno)
+PRECIOS = "precios"    # Solo cambios de precio (o altas/bajas de productos)
+STOCK = "stock"        # Cualquier cambio de stock, incluidos los pedidos (ver stock.py)
+CARRITOS = "carritos"  # Carritos escritos a la base por algún worker (ver carritos.py)
+NOMBRES = "nombres"    # Altas, bajas y cambios de nombre o marca (ver sugerencias.py)
+
+CACHE_SYNC_INTERVAL = float(os.getenv("CACHE_SYNC_INTERVAL", 0.5))
+
+_tabla_versiones = models.CacheVersion.__table__
+_versiones = {}
+_lock = threading.Lock()
+_lock_sync = threading.Lock()
+_ultima_sync = 0.0
+# Se desactiva si la tabla no existe (migraciones sin aplicar): las
+# versiones quedan solo en memoria, como con un único worker.
+_bus_activo = True
+
+
+def _desactivar_bus(error: Exception) -> None:
+    global _bus_activo
+    if _bus_activo:
+        logger.warning("Invalidación entre workers desactivada (¿falta 'alembic upgrade head'?): %s", error)
+    _bus_activo = False
+
+
+def _sincronizar() -> None:
+    """ Relee las versiones de la tabla si pasó el intervalo de sincronización. """
+    global _ultima_sync
+    if not _bus_activo or time.monotonic() - _ultima_sync < CACHE_SYNC_INTERVAL:
+        return
+    # Si otro hilo ya está sincronizando, se usan las versiones actuales
+    if not _lock_sync.acquire(blocking=False):
+        return
+    try:
+        with engine.connect() as conexion:
+            filas = conexion.execute(select(_tabla_versiones.c.nombre, _tabla_versiones.c.version)).all()
+        with _lock:
+            for nombre, version in filas:
+                _versiones[nombre] = version
+        _ultima_sync = time.monotonic()
+    except SQLAlchemyError as e:
+        _desactivar_bus(e)
+    finally:
+        _lock_sync.release()
+
+
+def get_version(nombre: str) -> int:
+    """ Devuelve la versión actual del espacio de nombres. """
+    _sincronizar()
+    return _versiones.get(nombre, 0)
+
+
+_INCREMENTAR = sqlite_insert(_tabla_versiones).values(version=1)
+_INCREMENTAR = _INCREMENTAR.on_conflict_do_update(
+    index_elements=[_tabla_versiones.c.nombre],
+    set_={"version": _tabla_versiones.c.version + 1},
+).returning(_tabla_versiones.c.version)
+
+
+def bump_version(*nombres: str) -> None:
+    """ Invalida las cachés de los espacios de nombres indicados (en todos los workers). """
+    if _bus_activo:
+        try:
+            with engine.begin() as conexion:
+                nuevas = {
+                    nombre: conexion.execute(_INCREMENTAR, {"nombre": nombre}).scalar_one()
+                    for nombre in nombres
+                }
+            with _lock:
+                _versiones.update(nuevas)
+            return
+        except SQLAlchemyError as e:
+            _desactivar_bus(e)
+
+    with _lock:
+        for nombre in nombres:
+            _versiones[nombre] = _versiones.get(nombre, 0) + 1
+
+
+def bump_version_en(db, *nombres: str) -> dict:
+    """
+    Como bump_version, pero dentro de la transacción abierta de 'db' (p. ej.
+    la del escritor): la invalidación se confirma o se deshace junto con los
+    datos. Devuelve las versiones nuevas; este proceso las adopta con
+    'publicar_versiones' una vez confirmada la transacción.
+    """
+    if _bus_activo:
+        try:
+            with db.begin_nested():
+                return {nombre: db.execute(_INCREMENTAR, {"nombre": nombre}).scalar_one() for nombre in nombres}
+        except SQLAlchemyError as e:
+            _desactivar_bus(e)
+    with _lock:
+        return {nombre: _versiones.get(nombre, 0) + 1 for nombre in nombres}
+
+
+def publicar_versiones(versiones: dict) -> None:
+    """ Adopta en este proceso las versiones de un bump_version_en ya confirmado. """
+    with _lock:
+        for nombre, version in versiones.items():
+            if version > _versiones.get(nombre, 0):
+                _versiones[nombre] = version
+
+
+# =====================================================================
+# CACHÉ LRU VERSIONADA
+# =====================================================================
+
+class CacheVersionada:
+    """
+    Caché LRU acotada en memoria. Cada valor se guarda junto con la versión
+    del espacio de nombres vigente al calcularlo y deja de servirse cuando
+    esa versión cambia.
+    """
+
+    def __init__(self, nombre_version: str, maxsize: int = 256):
+        self.nombre_version = nombre_version
+        self.maxsize = maxsize
+        self._datos = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, clave):
+        version = get_version(self.nombre_version)
+        with self._lock:
+            entrada = self._datos.get(clave)
+            if entrada is None or entrada[0] != version:
+                return None
+            self._datos.move_to_end(clave)
+            return entrada[1]
+
+    def set(self, clave, valor, version: int = None):
+        if version is None:
+            version = get_version(self.nombre_version)
+        with self._lock:
+            self._datos[clave] = (version, valor)
+            self._datos.move_to_end(clave)
+            while len(self._datos) > self.maxsize:
+                self._datos.popitem(last=False)
+
+    def get_or_set(self, clave, calcular):
+        """
+        Devuelve el valor cacheado o lo calcula con 'calcular()'.
+        La versión se lee ANTES de calcular: si hubo una escritura mientras
+        tanto, el valor queda guardado con la versión vieja y no se sirve.
+        """
+        valor = self.get(clave)
+        if valor is not None:
+            return valor
+        version = get_version(self.nombre_version)
+        valor = calcular()
+        self.set(clave, valor, version)
+        return valor
+
+    def clear(self):
+        with self._lock:
+            self._datos.clear()
@@ -0,0 +1,599 @@
+# backend/carritos.py
+
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from itertools import chain
+from typing import NamedTuple, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import bindparam, delete, select, tuple_, update
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+import cache
+import models
+from database import ReadSessionLocal
+from escritor import ejecutar_escritura
+from tareas import TareaPeriodica
+
+# =====================================================================
+# CARRITOS EN MEMORIA (WRITE-BEHIND)
+# =====================================================================
+# Los carritos activos viven en memoria (LRU acotada, con desalojo por
+# inactividad). Las operaciones del carrito solo modifican la memoria y
+# marcan el carrito como 'sucio'; una tarea periódica escribe los carritos
+# sucios a SQLite en lotes, a través del escritor (ver escritor.py).
+#
+# - Un carrito sucio nunca se pierde al desalojarlo: pasa a '_desalojados'
+#   hasta que se escribe.
+# - El checkout (create_order) escribe el carrito del usuario en la misma
+#   transacción del pedido, y lo vacía en memoria recién cuando el pedido
+#   se confirmó.
+# - Al apagar, main.py escribe todo lo pendiente.
+#
+# Cada carrito lleva además su total y su cantidad de unidades, que se
+# actualizan de forma incremental en cada operación. El precio de cada línea
+# se toma al agregarla; si la versión 'precios' (ver cache.py) cambió desde
+# entonces, api/cart.py los revalida antes de responder.
+#
+# Con varios workers cada proceso tiene su propia memoria. Cada fila
+# 'carrito' tiene su versión, y una copia en memoria solo se escribe si la
+# fila sigue en la versión de la que partió. Si no (otro worker la escribió
+# o hubo un checkout), se relee la fila y se le aplican encima los cambios
+# de la copia, línea por línea: no se pisan datos más nuevos de la base ni
+# se pierde una modificación que ya se respondió.
+#
+# Al escribir se incrementa además la versión 'carritos' (ver cache.py), en
+# la misma transacción. Cuando un worker ve que la incrementó otro, no
+# descarta sus carritos: antes de usar cada copia limpia compara su versión
+# con la de su fila, y solo la relee si cambió.
+
+CARRITO_CACHE_MAX = int(os.getenv("CARRITO_CACHE_MAX", 10000))
+# Segundos sin uso tras los que un carrito sale de la memoria
+CARRITO_INACTIVO_SEGUNDOS = float(os.getenv("CARRITO_INACTIVO_SEGUNDOS", 1800))
+# Cada cuántos segundos se escriben los carritos sucios
+CARRITO_FLUSH_INTERVALO = float(os.getenv("CARRITO_FLUSH_INTERVALO", 2))
+# Carritos por transacción de escritura
+CARRITO_FLUSH_LOTE = int(os.getenv("CARRITO_FLUSH_LOTE", 500))
+
+
+class Instantanea(NamedTuple):
+    """ Copia del carrito tomada para escribirlo en la base o para el checkout. """
+    id_usuario: int
+    fecha_actualizacion: datetime
+    items: dict                      # id_producto -> cantidad
+    version: int
+    precios: dict                    # id_producto -> precio unitario (None si no se conoce)
+    total: float
+    version_precios: Optional[int]
+    version_db: Optional[int]        # Versión de la fila 'carrito' de la que parte (None si no existe)
+    base: dict                       # id_producto -> cantidad en esa fila
+
+
+class _Carrito:
+    __slots__ = (
+        "id_usuario", "items", "fecha_actualizacion", "version", "version_escrita", "ultimo_acceso",
+        "total", "cantidad_items", "version_precios", "version_db", "base", "epoca",
+    )
+
+    def __init__(self, id_usuario: int, items: dict, fecha_actualizacion: datetime):
+        self.id_usuario = id_usuario
+        # id_producto -> [cantidad, id_item_carrito (None hasta escribirse), precio (None si no se conoce)]
+        self.items = items
+        self.fecha_actualizacion = fecha_actualizacion
+        self.version = 0
+        self.version_escrita = 0
+        self.ultimo_acceso = time.monotonic()
+        self.total = 0.0
+        self.cantidad_items = 0
+        # Versión 'precios' con la que se tomaron los precios de las líneas
+        self.version_precios = None
+        # Versión de la fila 'carrito' en la base (None si todavía no existe)
+        # y sus items (id_producto -> cantidad): los cambios de la copia son
+        # las diferencias con 'base'
+        self.version_db = None
+        self.base = {id_producto: item[0] for id_producto, item in items.items()}
+        # Época de TiendaCarritos en la que se comprobó que la copia está al día
+        self.epoca = 0
+        self.recalcular()
+
+    def sucio(self) -> bool:
+        return self.version != self.version_escrita
+
+    def modificado(self):
+        self.version += 1
+        self.fecha_actualizacion = datetime.utcnow()
+
+    # --- Totales ---
+
+    def sumar_linea(self, item: list):
+        self.cantidad_items += item[0]
+        if item[2] is not None:
+            self.total = round(self.total + item[0] * item[2], 2)
+
+    def restar_linea(self, item: list):
+        self.cantidad_items -= item[0]
+        if item[2] is not None:
+            self.total = round(self.total - item[0] * item[2], 2)
+
+    def recalcular(self):
+        self.total = round(sum(item[0] * item[2] for item in self.items.values() if item[2] is not None), 2)
+        self.cantidad_items = sum(item[0] for item in self.items.values())
+
+    def rebasar(self, base: dict, items_db: dict, ids: dict, version_db: int):
+        """
+        Pasa la copia a la fila 'version_db' de la base, con items 'items_db'
+        (id_producto -> cantidad), conservando los cambios de la copia
+        respecto de 'base'. 'ids' da el id_item_carrito de cada producto.
+        """
+        cantidades = _fusionar(base, {id_producto: item[0] for id_producto, item in self.items.items()}, items_db)
+        anteriores = self.items
+        self.items = {
+            id_producto: [cantidad, ids.get(id_producto), anteriores[id_producto][2] if id_producto in anteriores else None]
+            for id_producto, cantidad in cantidades.items()
+        }
+        if any(id_producto not in anteriores for id_producto in self.items):
+            # Líneas que llegan de la base, sin precio: se revalidan al responder
+            self.version_precios = None
+        self.base = items_db
+        self.version_db = version_db
+        self.recalcular()
+
+    def instantanea(self) -> Instantanea:
+        return Instantanea(
+            self.id_usuario,
+            self.fecha_actualizacion,
+            {id_producto: item[0] for id_producto, item in self.items.items()},
+            self.version,
+            {id_producto: item[2] for id_producto, item in self.items.items()},
+            self.total,
+            self.version_precios,
+            self.version_db,
+            dict(self.base),
+        )
+
+    def estado(self) -> dict:
+        """ Copia con la forma de CarritoResponse (sin los datos del producto). """
+        return {
+            "id_usuario": self.id_usuario,
+            "fecha_actualizacion": self.fecha_actualizacion,
+            "items": [
+                {
+                    "id_item_carrito": item[1],
+                    "id_producto": id_producto,
+                    "cantidad": item[0],
+                    "subtotal": round(item[0] * item[2], 2) if item[2] is not None else None,
+                }
+                for id_producto, item in self.items.items()
+            ],
+            "total": self.total,
+            "cantidad_items": self.cantidad_items,
+            "version_precios": self.version_precios,
+        }
+
+
+def _fusionar(base: dict, propios: dict, ajenos: dict) -> dict:
+    """
+    Cantidades que resultan de aplicar sobre 'ajenos' las líneas en las que
+    'propios' difiere de 'base' (id_producto -> cantidad; sin la clave = quitada).
+    """
+    resultado = dict(ajenos)
+    for id_producto in base.keys() | propios.keys():
+        cantidad = propios.get(id_producto)
+        if cantidad == base.get(id_producto):
+            continue
+        if cantidad is None:
+            resultado.pop(id_producto, None)
+        else:
+            resultado[id_producto] = cantidad
+    return resultado
+
+
+# --- Escritura a la base (corre en el hilo escritor) ---
+
+_tabla_carrito = models.Carrito.__table__
+
+# Compare-and-set de la fila 'carrito': 0 filas afectadas = la base cambió
+_CREAR_CARRITO = sqlite_insert(_tabla_carrito).values(
+    id_usuario=bindparam("usuario"), fecha_actualizacion=bindparam("fecha"), version=1
+).on_conflict_do_nothing(index_elements=[_tabla_carrito.c.id_usuario])
+_AVANZAR_CARRITO = (
+    update(_tabla_carrito)
+    .where(_tabla_carrito.c.id_usuario == bindparam("usuario"), _tabla_carrito.c.version == bindparam("esperada"))
+    .values(fecha_actualizacion=bindparam("fecha"), version=_tabla_carrito.c.version + 1)
+)
+_VERSION_CARRITO = select(_tabla_carrito.c.version).where(_tabla_carrito.c.id_usuario == bindparam("usuario"))
+
+# Lectura de un carrito que no está en memoria
+_CARRITO_DEL_USUARIO = select(_tabla_carrito.c.fecha_actualizacion, _tabla_carrito.c.version).where(
+    _tabla_carrito.c.id_usuario == bindparam("usuario")
+)
+_ITEMS_DEL_USUARIO = (
+    select(models.ItemCarrito.id_producto, models.ItemCarrito.cantidad, models.ItemCarrito.id_item_carrito)
+    .where(models.ItemCarrito.id_carrito == bindparam("usuario"))
+    .order_by(models.ItemCarrito.id_item_carrito)
+)
+
+
+def _avanzar_fila(db: Session, inst: Instantanea) -> bool:
+    """ Compare-and-set de la fila 'carrito' de 'inst'. False si la fila ya no está en 'inst.version_db'. """
+    valores = {"usuario": inst.id_usuario, "fecha": inst.fecha_actualizacion, "esperada": inst.version_db}
+    if inst.version_db is None:
+        return bool(db.execute(_CREAR_CARRITO, valores).rowcount)
+    return bool(db.execute(_AVANZAR_CARRITO, valores).rowcount)
+
+
+def leer_fila(db: Session, user_id: int) -> tuple:
+    """ (versión, {id_producto: cantidad}, {id_producto: id_item_carrito}) del carrito en la base. """
+    version = db.execute(_VERSION_CARRITO, {"usuario": user_id}).scalar()
+    filas = db.execute(_ITEMS_DEL_USUARIO, {"usuario": user_id}).all()
+    return (
+        version,
+        {id_producto: cantidad for id_producto, cantidad, _ in filas},
+        {id_producto: id_item for id_producto, _, id_item in filas},
+    )
+
+
+def escribir_carritos(db: Session, instantaneas: list) -> tuple:
+    """
+    Deja en la base los carritos de 'instantaneas'. Si la fila de alguno
+    cambió desde que se leyó, sus cambios se aplican sobre lo que hay en la
+    base (ver _fusionar). Devuelve ({id_usuario: {id_producto: id_item_carrito}}
+    de los items escritos, {id_usuario: versión nueva de la fila},
+    {id_usuario: items escritos} de los que se fusionaron).
+    """
+    tabla_items = models.ItemCarrito.__table__
+
+    versiones, fusionados = {}, {}
+    escritas = []
+    for inst in instantaneas:
+        if not _avanzar_fila(db, inst):
+            # Otro worker (o un checkout) la cambió. El escritor es el único
+            # que escribe en esta transacción: el segundo intento no falla
+            version_db, items_db, _ = leer_fila(db, inst.id_usuario)
+            inst = inst._replace(items=_fusionar(inst.base, inst.items, items_db), version_db=version_db)
+            _avanzar_fila(db, inst)
+            fusionados[inst.id_usuario] = inst.items
+        versiones[inst.id_usuario] = (inst.version_db or 0) + 1
+        escritas.append(inst)
+    instantaneas = escritas
+    if not instantaneas:
+        return {}, versiones, fusionados
+    ids_usuario = [inst.id_usuario for inst in instantaneas]
+
+    # Items que ya no están en memoria
+    items_memoria = {(inst.id_usuario, id_producto) for inst in instantaneas for id_producto in inst.items}
+    existentes = db.execute(
+        select(tabla_items.c.id_carrito, tabla_items.c.id_producto).where(tabla_items.c.id_carrito.in_(ids_usuario))
+    ).all()
+    sobrantes = [tuple(fila) for fila in existentes if tuple(fila) not in items_memoria]
+    if sobrantes:
+        db.execute(
+            delete(tabla_items).where(tuple_(tabla_items.c.id_carrito, tabla_items.c.id_producto).in_(sobrantes))
+        )
+
+    if items_memoria:
+        stmt = sqlite_insert(tabla_items)
+        db.execute(
+            stmt.on_conflict_do_update(
+                index_elements=[tabla_items.c.id_carrito, tabla_items.c.id_producto],
+                set_={"cantidad": stmt.excluded.cantidad},
+            ),
+            [
+                {"id_carrito": inst.id_usuario, "id_producto": id_producto, "cantidad": cantidad}
+                for inst in instantaneas
+                for id_producto, cantidad in inst.items.items()
+            ],
+        )
+
+    filas = db.execute(
+        select(tabla_items.c.id_carrito, tabla_items.c.id_producto, tabla_items.c.id_item_carrito)
+        .where(tabla_items.c.id_carrito.in_(ids_usuario))
+    ).all()
+    ids = {}
+    for id_carrito, id_producto, id_item in filas:
+        ids.setdefault(id_carrito, {})[id_producto] = id_item
+    return ids, versiones, fusionados
+
+
+class TiendaCarritos:
+
+    def __init__(self, maxsize: int = CARRITO_CACHE_MAX, inactivo: float = CARRITO_INACTIVO_SEGUNDOS):
+        self.maxsize = maxsize
+        self.inactivo = inactivo
+        self._carritos = OrderedDict()
+        # Carritos sucios que salieron de la LRU y esperan ser escritos
+        self._desalojados = {}
+        self._lock = threading.Lock()
+        self._version_vista = None
+        # Aumenta cada vez que otro worker escribió carritos: las copias
+        # limpias de una época anterior se comprueban contra la base
+        self._epoca = 0
+
+    # --- Operaciones del carrito ---
+    # 'db' es la sesión del request: si el carrito no está en memoria se lee
+    # con ella (sin ella, con una sesión de lectura propia).
+
+    def leer(self, user_id: int, db: Session = None) -> dict:
+        return self._con_carrito(user_id, lambda carrito: carrito.estado(), db)
+
+    def agregar(self, user_id: int, producto_id: int, cantidad: int, stock: int, precio: float,
+                db: Session = None) -> dict:
+        def _agregar(carrito):
+            item = carrito.items.get(producto_id)
+            if item:
+                cantidad_nueva_total = item[0] + cantidad
+                if stock < cantidad_nueva_total:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Stock insuficiente. Stock disponible: {stock}. (En carrito: {item[0]})"
+                    )
+                carrito.restar_linea(item)
+                item[0] = cantidad_nueva_total
+                item[2] = precio
+            else:
+                if stock < cantidad:
+                    raise HTTPException(
+                        status_code=status.HTTP_400_BAD_REQUEST,
+                        detail=f"Stock insuficiente. Stock disponible: {stock}."
+                    )
+                item = carrito.items[producto_id] = [cantidad, None, precio]
+            carrito.sumar_linea(item)
+            carrito.modificado()
+            return carrito.estado()
+        return self._con_carrito(user_id, _agregar, db)
+
+    def actualizar(self, user_id: int, producto_id: int, cantidad: int, stock: int, precio: float,
+                   db: Session = None) -> dict:
+        def _actualizar(carrito):
+            if stock < cantidad:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=f"Stock insuficiente. Stock disponible: {stock}."
+                )
+            item = carrito.items.get(producto_id)
+            if not item:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado en el carrito.")
+            carrito.restar_linea(item)
+            item[0] = cantidad
+            item[2] = precio
+            carrito.sumar_linea(item)
+            carrito.modificado()
+            return carrito.estado()
+        return self._con_carrito(user_id, _actualizar, db)
+
+    def quitar(self, user_id: int, producto_id: int, db: Session = None) -> dict:
+        def _quitar(carrito):
+            if producto_id not in carrito.items:
+                raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado en el carrito.")
+            carrito.restar_linea(carrito.items.pop(producto_id))
+            carrito.modificado()
+            return carrito.estado()
+        return self._con_carrito(user_id, _quitar, db)
+
+    def revalidar_precios(self, user_id: int, precios: dict, version_precios: int, db: Session = None) -> dict:
+        """ Actualiza los precios de las líneas y recalcula los totales (no marca el carrito como sucio). """
+        def _revalidar(carrito):
+            for id_producto, item in carrito.items.items():
+                if id_producto in precios:
+                    item[2] = precios[id_producto]
+            carrito.recalcular()
+            carrito.version_precios = version_precios
+            return carrito.estado()
+        return self._con_carrito(user_id, _revalidar, db)
+
+    # --- Checkout (corre en el hilo escritor, dentro de la transacción del pedido) ---
+
+    def escribir_para_pedido(self, db: Session, user_id: int):
+        """
+        Escribe el carrito del usuario si tiene cambios pendientes. Devuelve su
+        instantánea o None. Si la fila de la base ya no es la que vio esta
+        copia (otro worker la cambió), la copia se pasa a la fila nueva
+        (conservando sus cambios) y se responde 409: el pedido se haría con
+        items que el usuario no está viendo.
+        """
+        with self._lock:
+            carrito = self._carritos.get(user_id) or self._desalojados.get(user_id)
+            if carrito is None:
+                return None
+            instantanea = carrito.instantanea()
+            sucio = carrito.sucio()
+        version_db = db.execute(_VERSION_CARRITO, {"usuario": user_id}).scalar()
+        if version_db == instantanea.version_db:
+            if sucio:
+                escribir_carritos(db, [instantanea])
+            return instantanea
+
+        version_db, items_db, ids = leer_fila(db, user_id)
+        with self._lock:
+            if carrito.version_db == instantanea.version_db:
+                carrito.rebasar(carrito.base, items_db, ids, version_db)
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="El carrito cambió en otra sesión. Revísalo antes de confirmar el pedido."
+        )
+
+    def vaciar_tras_pedido(self, user_id: int, instantanea, version_db: int, version_carritos: Optional[int]):
+        """
+        Quita de memoria los items que se acaban de comprar. Se llama después
+        del commit del pedido: si la transacción falla, la memoria queda como
+        estaba. 'version_db' es la versión de la fila tras el pedido.
+        """
+        self._adoptar_version(version_carritos)
+        with self._lock:
+            carrito = self._carritos.get(user_id) or self._desalojados.get(user_id)
+            if carrito is None or instantanea is None or carrito.version_db != instantanea.version_db:
+                # No estaba en memoria o ya se releyó de la base
+                return
+            for id_producto, cantidad in instantanea.items.items():
+                item = carrito.items.get(id_producto)
+                if item and item[0] == cantidad:
+                    carrito.restar_linea(carrito.items.pop(id_producto))
+            # Los items de la base se borraron: los que queden se reinsertan
+            for item in carrito.items.values():
+                item[1] = None
+            carrito.base = {}
+            carrito.version_db = version_db
+            if carrito.version == instantanea.version:
+                carrito.version_escrita = carrito.version
+                self._desalojados.pop(user_id, None)
+
+    # --- Escritura periódica ---
+
+    def flush(self) -> int:
+        """ Escribe todos los carritos sucios. Devuelve cuántos se escribieron. """
+        total = 0
+        while True:
+            instantaneas, escritos, versiones_cache = ejecutar_escritura(self._escribir_lote)
+            if not instantaneas:
+                break
+            cache.publicar_versiones(versiones_cache)
+            self._adoptar_version(versiones_cache.get(cache.CARRITOS))
+            self._marcar_escritos(instantaneas, *escritos)
+            total += len(escritos[1])
+            if len(instantaneas) < CARRITO_FLUSH_LOTE:
+                break
+        return total
+
+    def mantenimiento(self):
+        """ Tarea periódica: desaloja los carritos inactivos y escribe los sucios. """
+        limite = time.monotonic() - self.inactivo
+        with self._lock:
+            while self._carritos:
+                user_id, carrito = next(iter(self._carritos.items()))
+                if carrito.ultimo_acceso > limite:
+                    break
+                self._desalojar(user_id)
+        self.flush()
+
+    def _escribir_lote(self, db: Session):
+        # Las instantáneas se toman dentro del hilo escritor: así quedan
+        # ordenadas respecto de los checkouts, que corren en el mismo hilo.
+        with self._lock:
+            instantaneas = [
+                carrito.instantanea()
+                for carrito in chain(self._desalojados.values(), self._carritos.values())
+                if carrito.sucio()
+            ][:CARRITO_FLUSH_LOTE]
+        if not instantaneas:
+            return [], None, {}
+        escritos = escribir_carritos(db, instantaneas)
+        versiones_cache = cache.bump_version_en(db, cache.CARRITOS) if escritos[1] else {}
+        return instantaneas, escritos, versiones_cache
+
+    def _marcar_escritos(self, instantaneas: list, ids: dict, versiones: dict, fusionados: dict):
+        with self._lock:
+            for inst in instantaneas:
+                carrito = self._carritos.get(inst.id_usuario) or self._desalojados.get(inst.id_usuario)
+                if carrito is None or carrito.version_db != inst.version_db:
+                    continue
+                # Lo que se hizo en memoria mientras se escribía queda encima
+                # de lo escrito (que difiere de 'inst' si se fusionó)
+                escritos = fusionados.get(inst.id_usuario, inst.items)
+                carrito.rebasar(inst.items, escritos, ids.get(inst.id_usuario, {}), versiones[inst.id_usuario])
+                # Si cambió mientras se escribía, sigue sucio
+                if carrito.version == inst.version:
+                    carrito.version_escrita = inst.version
+                    self._desalojados.pop(inst.id_usuario, None)
+
+    def _adoptar_version(self, version: Optional[int]):
+        # La versión 'carritos' que acaba de incrementar este proceso no
+        # invalida sus propias copias (salvo que haya otras en el medio)
+        if version is None:
+            return
+        with self._lock:
+            if self._version_vista is None or version == self._version_vista + 1:
+                self._version_vista = version
+
+    # --- Memoria ---
+
+    def _con_carrito(self, user_id: int, fn, db: Session = None):
+        """ Ejecuta 'fn(carrito)' con el lock tomado, cargando el carrito si hace falta. """
+        while True:
+            carrito = self._obtener(user_id, db)
+            with self._lock:
+                # Pudo desalojarse entre '_obtener' y el lock
+                if self._carritos.get(user_id) is carrito:
+                    carrito.ultimo_acceso = time.monotonic()
+                    return fn(carrito)
+
+    def _obtener(self, user_id: int, db: Session = None) -> _Carrito:
+        version = cache.get_version(cache.CARRITOS)
+        with self._lock:
+            self._sincronizar(version)
+            epoca = self._epoca
+            carrito = self._carritos.get(user_id) or self._desalojados.pop(user_id, None)
+            if carrito is not None:
+                self._carritos[user_id] = carrito
+                self._carritos.move_to_end(user_id)
+                # Una copia sucia se comprueba (y se fusiona) al escribirla
+                if carrito.sucio() or carrito.epoca == epoca:
+                    return carrito
+                version_db = carrito.version_db
+
+        if carrito is not None and self._version_en_base(user_id, db) == version_db:
+            carrito.epoca = epoca
+            return carrito
+
+        nuevo = self._cargar(user_id, db)
+        nuevo.epoca = epoca
+        with self._lock:
+            actual = self._carritos.get(user_id) or self._desalojados.pop(user_id, None)
+            # La copia vieja se reemplaza salvo que se haya modificado mientras tanto
+            if actual is None or (actual is carrito and not actual.sucio()):
+                actual = nuevo
+            carrito = actual
+            self._carritos[user_id] = carrito
+            self._carritos.move_to_end(user_id)
+            while len(self._carritos) > self.maxsize:
+                self._desalojar(next(iter(self._carritos)))
+            return carrito
+
+    def _version_en_base(self, user_id: int, db: Session = None) -> Optional[int]:
+        if db is None:
+            db = ReadSessionLocal()
+            try:
+                return self._version_en_base(user_id, db)
+            finally:
+                db.close()
+        return db.execute(_VERSION_CARRITO, {"usuario": user_id}).scalar()
+
+    def _cargar(self, user_id: int, db: Session = None) -> _Carrito:
+        if db is None:
+            db = ReadSessionLocal()
+            try:
+                return self._cargar(user_id, db)
+            finally:
+                db.close()
+
+        fila = db.execute(_CARRITO_DEL_USUARIO, {"usuario": user_id}).first()
+        filas = db.execute(_ITEMS_DEL_USUARIO, {"usuario": user_id}).all()
+
+        # Sin precios: se revalidan al armar la respuesta o en el checkout
+        carrito = _Carrito(user_id, {id_producto: [cantidad, id_item, None] for id_producto, cantidad, id_item in filas}, None)
+        if fila is None:
+            # Sin carrito en la base: se crea (se escribirá en el próximo flush)
+            carrito.modificado()
+        else:
+            carrito.fecha_actualizacion, carrito.version_db = fila
+        return carrito
+
+    def _desalojar(self, user_id: int):
+        carrito = self._carritos.pop(user_id)
+        if carrito.sucio():
+            self._desalojados[user_id] = carrito
+
+    def _sincronizar(self, version: int):
+        if self._version_vista is not None and version != self._version_vista:
+            # Otro worker escribió carritos: las copias limpias se comprueban
+            # contra su fila antes de volver a usarse (ver _obtener)
+            self._epoca += 1
+        self._version_vista = version
+
+
+tienda_carritos = TiendaCarritos()
+
+tarea_flush_carritos = TareaPeriodica("carritos-flush", CARRITO_FLUSH_INTERVALO, tienda_carritos.mantenimiento)
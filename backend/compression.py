@@ -0,0 +1,198 @@
+# backend/compression.py
+
+import gzip
+import os
+from typing import Optional
+
+from fastapi import Request, Response
+
+# --- Compresores opcionales (se usan solo si están instalados) ---
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# =====================================================================
+# CONFIGURACIÓN
+# =====================================================================
+
+# Respuestas más chicas que esto se envían sin comprimir
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", 6))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", 5))
+COMPRESSION_ZSTD_LEVEL = int(os.getenv("COMPRESSION_ZSTD_LEVEL", 3))
+
+# Orden de preferencia cuando el cliente acepta varias
+CODIFICACIONES = [
+    codificacion for codificacion, disponible in (
+        ("br", brotli is not None),
+        ("zstd", zstandard is not None),
+        ("gzip", True),
+    ) if disponible
+]
+
+# Tipos de contenido que vale la pena comprimir
+_TIPOS_COMPRIMIBLES = ("application/json", "text/", "application/x-ndjson", "application/javascript")
+
+# =====================================================================
+# FUNCIONES DE COMPRESIÓN
+# =====================================================================
+
+def elegir_codificacion(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Elige la mejor codificación disponible según la cabecera Accept-Encoding
+    (respetando los 'q=0'). Devuelve None si no hay ninguna en común.
+    """
+    if not accept_encoding:
+        return None
+    aceptadas = {}
+    for parte in accept_encoding.lower().split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        q = 1.0
+        parametros = parametros.strip()
+        if parametros.startswith("q="):
+            try:
+                q = float(parametros[2:])
+            except ValueError:
+                q = 0.0
+        aceptadas[nombre.strip()] = q
+    comodin = aceptadas.get("*", 0.0)
+    for codificacion in CODIFICACIONES:
+        if aceptadas.get(codificacion, comodin) > 0:
+            return codificacion
+    return None
+
+
+def comprimir(datos: bytes, codificacion: str) -> bytes:
+    if codificacion == "br":
+        return brotli.compress(datos, quality=COMPRESSION_BROTLI_QUALITY)
+    if codificacion == "zstd":
+        return zstandard.ZstdCompressor(level=COMPRESSION_ZSTD_LEVEL).compress(datos)
+    return gzip.compress(datos, compresslevel=COMPRESSION_GZIP_LEVEL)
+
+
+def _es_comprimible(content_type: str) -> bool:
+    return content_type.startswith(_TIPOS_COMPRIMIBLES)
+
+
+def _con_vary(headers: list) -> list:
+    """
+    Headers ASGI con 'Accept-Encoding' en Vary (sin repetirlo). Va en toda
+    respuesta comprimible, también cuando esta vez sale sin comprimir: si
+    no, una caché compartida puede servir el cuerpo comprimido a un cliente
+    que no lo acepta, o al revés.
+    """
+    vary = [v for k, v in headers if k.lower() == b"vary"]
+    if any(b"accept-encoding" in v.lower() or v.strip() == b"*" for v in vary):
+        return headers
+    resto = [(k, v) for k, v in headers if k.lower() != b"vary"]
+    return resto + [(b"vary", b", ".join(vary + [b"Accept-Encoding"]))]
+
+# =====================================================================
+# PAYLOADS CACHEADOS (comprimidos una sola vez)
+# =====================================================================
+
+class PayloadCacheado:
+    """
+    Cuerpo de una respuesta guardado en caché. Las versiones comprimidas se
+    calculan la primera vez que se piden y se guardan junto al original,
+    así una página caliente se comprime una vez y no en cada request.
+    """
+
+    def __init__(self, contenido: bytes, headers: Optional[dict] = None, media_type: str = "application/json"):
+        self.contenido = contenido
+        self.headers = headers or {}
+        self.media_type = media_type
+        self._comprimidos = {}
+
+    def cuerpo(self, codificacion: Optional[str]) -> bytes:
+        if codificacion is None:
+            return self.contenido
+        comprimido = self._comprimidos.get(codificacion)
+        if comprimido is None:
+            comprimido = comprimir(self.contenido, codificacion)
+            self._comprimidos[codificacion] = comprimido
+        return comprimido
+
+    def respuesta(self, request: Request) -> Response:
+        headers = dict(self.headers)
+        codificacion = None
+        if len(self.contenido) >= COMPRESSION_MIN_SIZE:
+            codificacion = elegir_codificacion(request.headers.get("accept-encoding"))
+        headers["Vary"] = "Accept-Encoding"
+        if codificacion:
+            # El middleware no vuelve a comprimir respuestas con Content-Encoding
+            headers["Content-Encoding"] = codificacion
+        return Response(content=self.cuerpo(codificacion), headers=headers, media_type=self.media_type)
+
+# =====================================================================
+# MIDDLEWARE
+# =====================================================================
+
+class CompresionMiddleware:
+    """
+    Middleware ASGI que comprime las respuestas con brotli, zstd o gzip según
+    lo que acepte el cliente. No comprime respuestas chicas, ya comprimidas, de
+    tipos binarios ni en streaming (p. ej. la exportación del catálogo).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = None
+        for nombre, valor in scope["headers"]:
+            if nombre == b"accept-encoding":
+                accept_encoding = valor.decode("latin-1")
+                break
+        codificacion = elegir_codificacion(accept_encoding)
+
+        inicio = None
+        pasar_directo = False
+
+        async def send_comprimido(message):
+            nonlocal inicio, pasar_directo
+            if message["type"] == "http.response.start":
+                # Se retiene hasta ver el cuerpo
+                inicio = message
+                return
+            if message["type"] != "http.response.body" or pasar_directo:
+                await send(message)
+                return
+
+            headers = {k.lower(): v for k, v in inicio["headers"]}
+            cuerpo = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or b"content-encoding" in headers
+                or not _es_comprimible(headers.get(b"content-type", b"").decode("latin-1"))
+            ):
+                pasar_directo = True
+                await send(inicio)
+                await send(message)
+                return
+            if codificacion is None or len(cuerpo) < COMPRESSION_MIN_SIZE:
+                pasar_directo = True
+                await send({**inicio, "headers": _con_vary(inicio["headers"])})
+                await send(message)
+                return
+
+            comprimido = comprimir(cuerpo, codificacion)
+            nuevos_headers = _con_vary([(k, v) for k, v in inicio["headers"] if k.lower() != b"content-length"])
+            nuevos_headers += [
+                (b"content-encoding", codificacion.encode()),
+                (b"content-length", str(len(comprimido)).encode()),
+            ]
+            await send({**inicio, "headers": nuevos_headers})
+            await send({"type": "http.response.body", "body": comprimido})
+
+        await self.app(scope, receive, send_comprimido)
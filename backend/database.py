@@ -1,26 +1,159 @@
 # backend/database.py
 
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine.default import CACHE_HIT, CACHE_MISS
 from sqlalchemy.orm import declarative_base, sessionmaker
+from dotenv import load_dotenv
 import os
+import threading
+
+load_dotenv()
 
 # --- Configuración de SQLite ---
 # Usaremos un archivo de base de datos llamado 'sql_app.db' 
 # que se creará dentro de la carpeta 'backend/'
-SQLALCHEMY_DATABASE_URL = "sqlite:///./sql_app.db"
+SQLALCHEMY_DATABASE_URL = os.getenv("SQLALCHEMY_DATABASE_URL", "sqlite:///./sql_app.db")
+
+# Milisegundos que una conexión espera el lock de escritura antes de fallar
+SQLITE_BUSY_TIMEOUT = int(os.getenv("SQLITE_BUSY_TIMEOUT", 5000))
+
+# Sentencias compiladas que guarda cada engine (ver "Caché de sentencias")
+SQLALCHEMY_QUERY_CACHE_SIZE = int(os.getenv("SQLALCHEMY_QUERY_CACHE_SIZE", 1000))
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, 
     # 'connect_args' es necesario solo para SQLite
     # para permitir que sea usado por múltiples hilos (como FastAPI)
-    connect_args={"check_same_thread": False}
+    connect_args={"check_same_thread": False},
+    query_cache_size=SQLALCHEMY_QUERY_CACHE_SIZE,
 )
+
+@event.listens_for(engine, "connect")
+def _configurar_sqlite(dbapi_connection, connection_record):
+    # WAL: los lectores no bloquean al escritor (y viceversa), necesario
+    # cuando varios workers comparten el mismo archivo.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+    cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# --- Conexión del hilo escritor ---
+# El escritor (ver escritor.py) tiene su propia conexión, fuera del pool de
+# los requests: un request que espera su escritura mantiene tomada la suya,
+# y con el pool agotado el escritor nunca podría avanzar.
+
+if SQLALCHEMY_DATABASE_URL in ("sqlite://", "sqlite:///:memory:"):
+    write_engine = engine
+else:
+    write_engine = create_engine(
+        SQLALCHEMY_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        pool_size=1,
+        max_overflow=0,
+        query_cache_size=SQLALCHEMY_QUERY_CACHE_SIZE,
+    )
+    event.listen(write_engine, "connect", _configurar_sqlite)
+
+WriteSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=write_engine)
+
+# --- Conexiones de solo lectura ---
+# El tráfico de lectura (catálogo, conteos, listados) usa su propio engine y
+# pool, así nunca espera detrás de una transacción de escritura. Por defecto
+# es el mismo archivo abierto con 'mode=ro' (con WAL ve lo último confirmado);
+# SQLALCHEMY_READ_DATABASE_URL permite apuntar a una réplica.
+
+def _url_solo_lectura(url: str) -> str:
+    prefijo = "sqlite:///"
+    if not url.startswith(prefijo) or url in (prefijo, prefijo + ":memory:") or "?" in url:
+        return url
+    return f"{prefijo}file:{url[len(prefijo):]}?mode=ro&uri=true"
+
+SQLALCHEMY_READ_DATABASE_URL = os.getenv("SQLALCHEMY_READ_DATABASE_URL") or _url_solo_lectura(SQLALCHEMY_DATABASE_URL)
+READ_POOL_SIZE = int(os.getenv("READ_POOL_SIZE", 10))
+
+if SQLALCHEMY_READ_DATABASE_URL == SQLALCHEMY_DATABASE_URL:
+    # Base en memoria u otra URL sin modo de solo lectura: se comparte el engine
+    read_engine = engine
+else:
+    read_engine = create_engine(
+        SQLALCHEMY_READ_DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        pool_size=READ_POOL_SIZE,
+        query_cache_size=SQLALCHEMY_QUERY_CACHE_SIZE,
+    )
+
+    @event.listens_for(read_engine, "connect")
+    def _configurar_sqlite_lectura(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+        cursor.execute("PRAGMA query_only=1")
+        cursor.close()
+
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine)
+
+# --- Caché de sentencias ---
+# SQLAlchemy guarda la compilación de cada sentencia según su estructura; las
+# consultas frecuentes están definidas una sola vez a nivel de módulo, con
+# bindparam, así no se arman en cada request (ver p. ej. dependencies.py).
+# Se cuentan los aciertos de esa caché en todos los engines.
+
+_estadisticas_cache = {"aciertos": 0, "fallos": 0, "sin_cache": 0}
+_lock_estadisticas = threading.Lock()
+
+def _contar_cache_sentencias(conn, cursor, statement, parameters, context, executemany):
+    if context.cache_hit is CACHE_HIT:
+        clave = "aciertos"
+    elif context.cache_hit is CACHE_MISS:
+        clave = "fallos"
+    else:
+        # SQL textual o sentencias sin clave de caché
+        clave = "sin_cache"
+    with _lock_estadisticas:
+        _estadisticas_cache[clave] += 1
+
+for _motor in {engine, write_engine, read_engine}:
+    event.listen(_motor, "after_cursor_execute", _contar_cache_sentencias)
+
+def estadisticas_cache_sentencias() -> dict:
+    """ Ejecuciones con y sin acierto en la caché de sentencias compiladas. """
+    with _lock_estadisticas:
+        estadisticas = dict(_estadisticas_cache)
+    cacheables = estadisticas["aciertos"] + estadisticas["fallos"]
+    estadisticas["tasa_aciertos"] = round(estadisticas["aciertos"] / cacheables, 4) if cacheables else 0.0
+    estadisticas["tamanio_maximo"] = SQLALCHEMY_QUERY_CACHE_SIZE
+    return estadisticas
+
 Base = declarative_base()
 
-def get_db():
-    db = SessionLocal()
+# --- Sesión del request (unidad de trabajo) ---
+# Una sola sesión por request: la comparten get_current_user y el handler,
+# porque FastAPI resuelve una vez por request cada dependencia. GET y HEAD
+# usan las conexiones de solo lectura; el resto, el engine principal.
+#
+# La sesión no toma una conexión del pool hasta su primera consulta (y la
+# devuelve al cerrarse), así que un request que no lee la base no ocupa
+# ninguna.
+
+_METODOS_LECTURA = ("GET", "HEAD")
+# POST /api/batch solo ejecuta GETs internos (ver api/batch.py)
+_RUTAS_LECTURA = ("/api/batch",)
+
+# Clave de scope["state"] con la sesión que comparten los sub-requests de un lote
+SESION_COMPARTIDA = "sesion_compartida"
+
+def get_db(request: Request):
+    """ Dependencia con la sesión de la base de datos del request. """
+    compartida = request.scope.get("state", {}).get(SESION_COMPARTIDA)
+    if compartida is not None:
+        # La abre y la cierra el request del lote
+        yield compartida
+        return
+    lectura = request.method in _METODOS_LECTURA or request.scope["path"] in _RUTAS_LECTURA
+    fabrica = ReadSessionLocal if lectura else SessionLocal
+    db = fabrica()
     try:
         yield db
     finally:
@@ -1,26 +1,17 @@
 # backend/dependencies.py
 
-from fastapi import Depends, HTTPException, status, Header
+from fastapi import Depends, HTTPException, Request, status, Header
 from fastapi.security import OAuth2PasswordBearer
+from sqlalchemy import bindparam, select
 from sqlalchemy.orm import Session
+from typing import Optional
 
 # Importaciones de nuestros módulos
-from database import SessionLocal
+from database import get_db
 import models
 import schemas
 import auth # <-- Importamos el nuevo archivo auth
-
-# =====================================================================
-# DEPENDENCIAS DE BASE DE DATOS
-# =====================================================================
-
-def get_db():
-    """ Dependencia para obtener la sesión de la base de datos """
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+from actividad import actividad_usuarios
 
 # =====================================================================
 # DEPENDENCIAS DE AUTENTICACIÓN (Issue 9)
@@ -29,7 +20,17 @@ def get_db():
 # Usamos el scheme definido en auth.py
 oauth2_scheme = auth.oauth2_scheme
 
+# Se arma una sola vez: corre en cada request autenticado
+_USUARIO_POR_ID = select(models.Usuario).where(models.Usuario.id_usuario == bindparam("id_usuario")).limit(1)
+
+def cargar_usuario(db: Session, user_id: int) -> Optional[models.Usuario]:
+    return db.scalars(_USUARIO_POR_ID, {"id_usuario": user_id}).first()
+
+# Clave de scope["state"] con el usuario ya autenticado por POST /api/batch
+USUARIO_AUTENTICADO = "usuario_autenticado"
+
 async def get_current_user(
+    request: Request,
     token: str = Depends(oauth2_scheme), 
     db: Session = Depends(get_db)
 ) -> models.Usuario:
@@ -38,6 +39,11 @@ async def get_current_user(
     Decodifica el token JWT y obtiene el usuario de la DB.
     """
     
+    # Sub-request de un lote: el token se verificó una vez para todo el lote
+    usuario = request.scope.get("state", {}).get(USUARIO_AUTENTICADO)
+    if usuario is not None:
+        return usuario
+    
     payload = auth.decodificar_token(token)
     user_id: int = payload.get("user_id")
     
@@ -48,7 +54,7 @@ async def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    usuario = db.query(models.Usuario).filter(models.Usuario.id_usuario == user_id).first()
+    usuario = cargar_usuario(db, user_id)
     
     if usuario is None:
         raise HTTPException(
@@ -56,6 +62,8 @@ async def get_current_user(
             detail="Usuario no encontrado (token inválido)",
         )
     
+    # Último acceso: se anota en memoria y se escribe en lote (ver actividad.py)
+    actividad_usuarios.registrar(usuario.id_usuario)
     return usuario
 
 # =====================================================================
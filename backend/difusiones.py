@@ -0,0 +1,211 @@
+# backend/difusiones.py
+
+import logging
+import os
+import threading
+
+from sqlalchemy import bindparam, func, insert, select, update
+from sqlalchemy.orm import Session
+
+import models
+from database import ReadSessionLocal
+from escritor import ejecutar_escritura
+
+logger = logging.getLogger(__name__)
+
+# =====================================================================
+# DIFUSIONES (mensajes de un admin a muchos usuarios)
+# =====================================================================
+# El mensaje se guarda una sola vez en 'mensajes'; cada destinatario recibe
+# una fila en 'conversaciones' que apunta a él, así la bandeja, los no
+# leídos y las respuestas funcionan como con cualquier otro mensaje.
+#
+# El reparto corre en un hilo en segundo plano: toma los destinatarios de
+# a DIFUSION_LOTE (por id_usuario, desde la sesión de lectura) y escribe
+# cada lote con un executemany del mismo INSERT en su propia transacción
+# del escritor (ver escritor.py). Nunca retiene el lock de escritura por
+# mucho tiempo y el resto de las escrituras se intercalan entre lotes.
+# El progreso queda en la tabla 'difusiones' (GET /api/broadcasts/{id}).
+
+DIFUSION_LOTE = int(os.getenv("DIFUSION_LOTE", 1000))
+# Máximo de parámetros por 'IN (...)' al comprobar qué ids existen
+_IN_CHUNK_SIZE = 500
+
+# Conversacion.tipo_participacion de las filas repartidas
+TIPO_DIFUSION = "difusion"
+
+_usuarios = models.Usuario.__table__
+_conversaciones = models.Conversacion.__table__
+_difusiones = models.Difusion.__table__
+
+_id_usuario = _usuarios.c.id_usuario
+_DESTINATARIOS = (
+    select(_id_usuario)
+    .where(_id_usuario != bindparam("id_remitente"), _id_usuario > bindparam("desde"))
+    .order_by(_id_usuario)
+    .limit(bindparam("limite"))
+)
+_DESTINATARIOS_POR_ROL = _DESTINATARIOS.where(_usuarios.c.tipo_usuario == bindparam("tipo_usuario"))
+_CONTAR = select(func.count()).select_from(_usuarios).where(_id_usuario != bindparam("id_remitente"))
+_CONTAR_POR_ROL = _CONTAR.where(_usuarios.c.tipo_usuario == bindparam("tipo_usuario"))
+_EXISTENTES = select(_id_usuario).where(
+    _id_usuario.in_(bindparam("ids", expanding=True)), _id_usuario != bindparam("id_remitente")
+)
+_REPARTIR = insert(_conversaciones)
+_AVANZAR = (
+    update(_difusiones)
+    .where(_difusiones.c.id_difusion == bindparam("difusion"))
+    .values(enviados=_difusiones.c.enviados + bindparam("cantidad"), estado="enviando")
+)
+
+
+def contar_destinatarios(db: Session, id_remitente: int, tipo_usuario: str = None) -> int:
+    """ Usuarios que recibirán una difusión a todos (o a un rol), sin contar al remitente. """
+    if tipo_usuario is None:
+        return db.execute(_CONTAR, {"id_remitente": id_remitente}).scalar_one()
+    return db.execute(_CONTAR_POR_ROL, {"id_remitente": id_remitente, "tipo_usuario": tipo_usuario}).scalar_one()
+
+
+def filtrar_existentes(db: Session, ids: list, id_remitente: int) -> list:
+    """ Los ids de 'ids' que existen (sin el remitente), ordenados y sin repetir. """
+    pedidos = sorted(set(ids))
+    existentes = []
+    for i in range(0, len(pedidos), _IN_CHUNK_SIZE):
+        existentes.extend(db.execute(
+            _EXISTENTES, {"ids": pedidos[i:i + _IN_CHUNK_SIZE], "id_remitente": id_remitente}
+        ).scalars())
+    return sorted(existentes)
+
+
+# --- ESCRITURAS (hilo escritor) ---
+# No hacen commit; devuelven datos planos.
+
+def crear_difusion(db: Session, id_remitente: int, asunto: str, contenido: str,
+                   destino: str, tipo_usuario, total: int) -> tuple:
+    """ Guarda el mensaje y la difusión. Devuelve (id_difusion, id_mensaje, fecha del mensaje). """
+    mensaje = models.Mensaje(
+        id_usuario=id_remitente,
+        asunto=asunto,
+        mensaje=contenido,
+        estado="no_leido",
+        tipo=TIPO_DIFUSION,
+    )
+    db.add(mensaje)
+    db.flush()
+
+    difusion = models.Difusion(
+        id_mensaje=mensaje.id_mensaje,
+        id_usuario=id_remitente,
+        destino=destino,
+        tipo_usuario=tipo_usuario,
+        total=total,
+        enviados=0,
+        # Sin destinatarios no hay nada que repartir
+        estado="pendiente" if total else "completada",
+        fecha_fin=None if total else func.now(),
+    )
+    db.add(difusion)
+    db.flush()
+    return difusion.id_difusion, mensaje.id_mensaje, mensaje.fecha_mensaje
+
+
+def _repartir_lote(db: Session, id_difusion: int, id_mensaje: int, id_remitente: int, fecha, ids: list):
+    # executemany de una sentencia ya compilada: un VALUES de mil filas se
+    # volvería a compilar en cada lote
+    db.execute(_REPARTIR, [
+        {
+            "id_usuario_remitente": id_remitente,
+            "id_usuario_destinatario": id_destinatario,
+            "id_mensaje": id_mensaje,
+            "fecha_envio": fecha,
+            "leido": False,
+            "tipo_participacion": TIPO_DIFUSION,
+        }
+        for id_destinatario in ids
+    ])
+    db.execute(_AVANZAR, {"difusion": id_difusion, "cantidad": len(ids)})
+
+
+def _finalizar(db: Session, id_difusion: int, estado: str):
+    db.execute(
+        update(_difusiones)
+        .where(_difusiones.c.id_difusion == id_difusion)
+        .values(estado=estado, fecha_fin=func.now())
+    )
+
+
+# --- REPARTO EN SEGUNDO PLANO ---
+
+def _lotes_por_id(id_remitente: int, tipo_usuario: str = None):
+    """ Destinatarios de a DIFUSION_LOTE, recorriendo 'usuario' por id. """
+    consulta = _DESTINATARIOS if tipo_usuario is None else _DESTINATARIOS_POR_ROL
+    desde = 0
+    while True:
+        db = ReadSessionLocal()
+        try:
+            ids = list(db.execute(consulta, {
+                "id_remitente": id_remitente, "tipo_usuario": tipo_usuario,
+                "desde": desde, "limite": DIFUSION_LOTE,
+            }).scalars())
+        finally:
+            db.close()
+        if not ids:
+            return
+        yield ids
+        desde = ids[-1]
+
+
+class RepartoDifusiones:
+    """ Un hilo por difusión en curso. Se detienen entre lotes al apagar la app (main.py). """
+
+    def __init__(self):
+        self._hilos = set()
+        self._lock = threading.Lock()
+        self._detener = threading.Event()
+
+    def iniciar(self, id_difusion: int, id_mensaje: int, id_remitente: int, fecha,
+                tipo_usuario: str = None, ids: list = None):
+        """ Reparte la difusión a todos, a un rol o a la lista 'ids' (ya filtrada). """
+        hilo = threading.Thread(
+            target=self._repartir,
+            args=(id_difusion, id_mensaje, id_remitente, fecha, tipo_usuario, ids),
+            name=f"difusion-{id_difusion}",
+            daemon=True,
+        )
+        with self._lock:
+            self._hilos.add(hilo)
+        hilo.start()
+
+    def _repartir(self, id_difusion, id_mensaje, id_remitente, fecha, tipo_usuario, ids):
+        try:
+            if ids is not None:
+                lotes = (ids[i:i + DIFUSION_LOTE] for i in range(0, len(ids), DIFUSION_LOTE))
+            else:
+                lotes = _lotes_por_id(id_remitente, tipo_usuario)
+            estado = "completada"
+            for lote in lotes:
+                if self._detener.is_set():
+                    estado = "interrumpida"
+                    break
+                ejecutar_escritura(_repartir_lote, id_difusion, id_mensaje, id_remitente, fecha, lote)
+            ejecutar_escritura(_finalizar, id_difusion, estado)
+        except Exception:
+            logger.exception("Error en el reparto de la difusión %s", id_difusion)
+            try:
+                ejecutar_escritura(_finalizar, id_difusion, "error")
+            except Exception:
+                logger.exception("No se pudo marcar la difusión %s con error", id_difusion)
+        finally:
+            with self._lock:
+                self._hilos.discard(threading.current_thread())
+
+    def detener(self):
+        """ Corta los repartos en curso después del lote actual (quedan 'interrumpida'). """
+        self._detener.set()
+        with self._lock:
+            hilos = list(self._hilos)
+        for hilo in hilos:
+            hilo.join()
+
+
+reparto_difusiones = RepartoDifusiones()
@@ -0,0 +1,193 @@
+# backend/escritor.py
+
+import logging
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+
+from fastapi import HTTPException, status
+from sqlalchemy.exc import SQLAlchemyError
+
+from database import WriteSessionLocal
+
+logger = logging.getLogger(__name__)
+
+# =====================================================================
+# COLA DE ESCRITURA (UN SOLO ESCRITOR)
+# =====================================================================
+# SQLite admite un escritor a la vez. En lugar de que cada hilo del
+# threadpool abra su propia transacción de escritura (y choque con las
+# demás: "database is locked"), las mutaciones se encolan y las ejecuta un
+# único hilo escritor.
+#
+# Cada trabajo es una función 'fn(db, *args)' que recibe la sesión del
+# escritor. Reglas:
+#   - NO hace commit ni rollback (lo hace el escritor).
+#   - Devuelve datos planos (ids, dicts), nunca objetos ORM: la sesión del
+#     escritor se cierra al terminar el lote.
+#   - Puede lanzar HTTPException; se propaga tal cual al request.
+#
+# Los trabajos 'agrupables' (escrituras chicas, p. ej. el carrito) se juntan
+# en una sola transacción: cada uno corre en su SAVEPOINT, así un error solo
+# deshace el suyo, y el lote se confirma con un único COMMIT.
+#
+# ESCRITURA_TIMEOUT solo corre mientras el trabajo espera en la cola: si se
+# vence, el trabajo se cancela y el escritor lo saltea (503 sin efectos).
+# Uno que ya empezó se espera hasta el final, porque puede confirmarse; un
+# 503 ahí haría que el cliente reintente algo que sí se guardó (p. ej. un
+# pedido duplicado).
+
+ESCRITURA_COLA_MAX = int(os.getenv("ESCRITURA_COLA_MAX", 1000))
+ESCRITURA_LOTE_MAX = int(os.getenv("ESCRITURA_LOTE_MAX", 50))
+# Segundos que un request espera a que su escritura empiece
+ESCRITURA_TIMEOUT = float(os.getenv("ESCRITURA_TIMEOUT", 30))
+
+
+class _Trabajo:
+    __slots__ = ("fn", "args", "agrupable", "futuro")
+
+    def __init__(self, fn, args, agrupable: bool):
+        self.fn = fn
+        self.args = args
+        self.agrupable = agrupable
+        self.futuro = Future()
+
+
+_DETENER = object()
+
+
+def _ocupado() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="El servidor está ocupado. Intenta nuevamente.",
+        headers={"Retry-After": "1"},
+    )
+
+
+class ColaEscritura:
+
+    def __init__(self, maxsize: int = ESCRITURA_COLA_MAX, lote_max: int = ESCRITURA_LOTE_MAX):
+        self.lote_max = lote_max
+        self._cola = queue.Queue(maxsize=maxsize)
+        self._hilo = None
+        self._lock = threading.Lock()
+        # Trabajo no agrupable sacado de la cola mientras se armaba un lote
+        self._pendiente = None
+
+    # --- API para los handlers ---
+
+    def ejecutar(self, fn, *args, agrupable: bool = False):
+        """ Encola 'fn(db, *args)', espera a que se confirme y devuelve su resultado. """
+        self._iniciar()
+        trabajo = _Trabajo(fn, args, agrupable)
+        limite = time.monotonic() + ESCRITURA_TIMEOUT
+        try:
+            self._cola.put(trabajo, timeout=ESCRITURA_TIMEOUT)
+        except queue.Full:
+            raise _ocupado()
+        try:
+            return trabajo.futuro.result(timeout=max(limite - time.monotonic(), 0))
+        except FutureTimeoutError:
+            # cancel() solo funciona si el escritor todavía no lo tomó
+            if trabajo.futuro.cancel():
+                raise _ocupado()
+        return trabajo.futuro.result()
+
+    def detener(self):
+        """ Procesa lo que queda en la cola y termina el hilo escritor. """
+        with self._lock:
+            hilo = self._hilo
+            self._hilo = None
+        if hilo is not None:
+            self._cola.put(_DETENER)
+            hilo.join()
+
+    # --- Hilo escritor ---
+
+    def _iniciar(self):
+        if self._hilo is not None:
+            return
+        with self._lock:
+            if self._hilo is None:
+                self._hilo = threading.Thread(target=self._bucle, name="escritor-sqlite", daemon=True)
+                self._hilo.start()
+
+    def _siguiente_lote(self):
+        """
+        Devuelve el próximo lote: un trabajo suelto o hasta 'lote_max'
+        trabajos agrupables seguidos. None significa que hay que terminar.
+        """
+        primero = self._pendiente if self._pendiente is not None else self._cola.get()
+        self._pendiente = None
+        if primero is _DETENER:
+            return None
+
+        lote = [primero]
+        if primero.agrupable:
+            while len(lote) < self.lote_max:
+                try:
+                    trabajo = self._cola.get_nowait()
+                except queue.Empty:
+                    break
+                if trabajo is _DETENER or not trabajo.agrupable:
+                    # Queda para el próximo lote
+                    self._pendiente = trabajo
+                    break
+                lote.append(trabajo)
+        return lote
+
+    def _bucle(self):
+        while True:
+            lote = self._siguiente_lote()
+            if lote is None:
+                break
+            self._ejecutar_lote(lote)
+
+    def _ejecutar_lote(self, lote):
+        # Descarta los cancelados por timeout; los demás ya no se pueden cancelar
+        lote = [trabajo for trabajo in lote if trabajo.futuro.set_running_or_notify_cancel()]
+        if not lote:
+            return
+        db = WriteSessionLocal()
+        resultados = []
+        try:
+            # Tomamos el lock de escritura de entrada: evita que la transacción
+            # falle al pasar de lectura a escritura si otro proceso escribió.
+            db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+            for trabajo in lote:
+                try:
+                    if len(lote) > 1:
+                        with db.begin_nested():
+                            resultado = trabajo.fn(db, *trabajo.args)
+                    else:
+                        resultado = trabajo.fn(db, *trabajo.args)
+                        db.flush()
+                    resultados.append((trabajo, resultado))
+                except Exception as e:
+                    if len(lote) == 1:
+                        raise
+                    trabajo.futuro.set_exception(e)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            if not isinstance(e, (HTTPException, SQLAlchemyError)):
+                logger.exception("Error inesperado en el escritor")
+            for trabajo in lote:
+                if not trabajo.futuro.done():
+                    trabajo.futuro.set_exception(e)
+            return
+        finally:
+            db.close()
+
+        for trabajo, resultado in resultados:
+            trabajo.futuro.set_result(resultado)
+
+
+cola_escritura = ColaEscritura()
+
+
+def ejecutar_escritura(fn, *args, agrupable: bool = False):
+    """ Atajo para 'cola_escritura.ejecutar'. """
+    return cola_escritura.ejecutar(fn, *args, agrupable=agrupable)
@@ -1,18 +1,61 @@
 # backend/main.py
 
+import time
+
+# Tiempo de importación de la app (routers, passlib, jose, SQLAlchemy...)
+_inicio_importacion = time.perf_counter()
+
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
 from database import Base, engine
 from routes import router
+from compression import CompresionMiddleware
+from admision import AdmisionMiddleware
+from escritor import cola_escritura
+from carritos import tienda_carritos, tarea_flush_carritos
+from archivo_mensajes import tarea_archivo_mensajes
+from actividad import actividad_usuarios, tarea_flush_actividad
+from sugerencias import tarea_ventas_sugerencias
+from difusiones import reparto_difusiones
+from arranque import estado_arranque, iniciar_calentamiento
+
+estado_arranque.importacion_ms = round((time.perf_counter() - _inicio_importacion) * 1000, 3)
 
 # --- CORRECCIÓN ---
 # Esta línea entra en conflicto con Alembic y causa el error de "InvalidForeignKey".
 # La creación de tablas debe ser manejada ÚNICAMENTE por 'alembic upgrade head'.
 # Base.metadata.create_all(bind=engine)
 
-app = FastAPI(title="E-commerce API", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # GET /api/sistema/listo responde 503 hasta que termina (ver arranque.py)
+    iniciar_calentamiento()
+    tarea_flush_carritos.iniciar()
+    tarea_archivo_mensajes.iniciar()
+    tarea_flush_actividad.iniciar()
+    tarea_ventas_sugerencias.iniciar()
+    yield
+    # Al apagar: escribir los carritos y los últimos accesos en memoria y
+    # confirmar las escrituras encoladas antes de salir
+    reparto_difusiones.detener()
+    tarea_ventas_sugerencias.detener()
+    tarea_flush_actividad.detener()
+    tarea_archivo_mensajes.detener()
+    tarea_flush_carritos.detener()
+    tienda_carritos.flush()
+    actividad_usuarios.flush()
+    cola_escritura.detener()
+
+
+app = FastAPI(title="E-commerce API", version="1.0.0", lifespan=lifespan)
+
+# Control de admisión por clase de ruta (ver admision.py). Va por dentro de
+# CORS para que los 503 también lleven sus cabeceras.
+app.add_middleware(AdmisionMiddleware)
 
 # Configurar CORS
 app.add_middleware(
@@ -21,8 +64,13 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Cabecera de la paginación por cursor (GET /api/products)
+    expose_headers=["X-Next-Cursor"],
 )
 
+# Compresión gzip/brotli/zstd de las respuestas (ver compression.py)
+app.add_middleware(CompresionMiddleware)
+
 # Incluir todas las rutas
 app.include_router(router)
 
@@ -2,7 +2,7 @@
 
 # --- IMPORTACIÓN MODIFICADA ---
 # Se cambió DECIMAL por Float
-from sqlalchemy import Column, Integer, String, Text, Float, DateTime, Boolean, ForeignKey, UniqueConstraint
+from sqlalchemy import Column, Integer, String, Text, Float, Date, DateTime, Boolean, ForeignKey, UniqueConstraint, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from database import Base
@@ -58,6 +58,18 @@ class Producto(Base):
     items_pedido = relationship("ItemPedido", back_populates="producto")
     items_carrito = relationship("ItemCarrito", back_populates="producto")
 
+    # Índices para listar ordenado sin ordenar en memoria:
+    # (categoria, clave de orden, id) para el catálogo filtrado por categoría
+    # y (clave de orden, id) para el catálogo completo.
+    __table_args__ = (
+        Index('ix_productos_categoria_precio', 'categoria', 'precio', 'id_producto'),
+        Index('ix_productos_categoria_fecha', 'categoria', 'fecha_agregado', 'id_producto'),
+        Index('ix_productos_categoria_nombre', 'categoria', 'nombre_producto', 'id_producto'),
+        Index('ix_productos_precio', 'precio', 'id_producto'),
+        Index('ix_productos_fecha', 'fecha_agregado', 'id_producto'),
+        Index('ix_productos_nombre', 'nombre_producto', 'id_producto'),
+    )
+
 class Pedido(Base):
     __tablename__ = "pedidos"
     
@@ -76,6 +88,11 @@ class Pedido(Base):
     usuario = relationship("Usuario", back_populates="pedidos")
     items = relationship("ItemPedido", back_populates="pedido", cascade="all, delete-orphan")
 
+    __table_args__ = (
+        # Rangos de fechas del backfill de analítica (ver analitica.py)
+        Index('ix_pedidos_fecha_pedido', 'fecha_pedido'),
+    )
+
 class Mensaje(Base):
     __tablename__ = "mensajes"
     
@@ -106,6 +123,12 @@ class ItemPedido(Base):
     pedido = relationship("Pedido", back_populates="items")
     producto = relationship("Producto", back_populates="items_pedido")
 
+    __table_args__ = (
+        # Items de cada pedido (joinedload de Pedido.items) y recorrido por
+        # pedido del cálculo de relacionados (ver relacionados.py), sin ir a la tabla
+        Index('ix_itemspedido_pedido_producto', 'id_pedido', 'id_producto'),
+    )
+
 class Conversacion(Base):
     __tablename__ = "conversaciones"
     
@@ -129,12 +152,22 @@ class Conversacion(Base):
     )
     mensaje = relationship("Mensaje", back_populates="conversaciones")
 
+    __table_args__ = (
+        # Historial de un par de usuarios (en cada sentido) ordenado por fecha
+        Index('ix_conversaciones_par_fecha', 'id_usuario_remitente', 'id_usuario_destinatario', 'fecha_envio'),
+        # El archivado busca mensajes que ya no referencia ninguna conversación
+        Index('ix_conversaciones_mensaje', 'id_mensaje'),
+    )
+
 class Carrito(Base):
     __tablename__ = "carrito"
     
     id_usuario = Column(Integer, ForeignKey('usuario.id_usuario'), primary_key=True)
     fecha_creacion = Column(DateTime, default=func.now())
     fecha_actualizacion = Column(DateTime, default=func.now(), onupdate=func.now())
+    # Se incrementa en cada escritura del carrito: los workers solo escriben
+    # su copia en memoria si la fila sigue en la versión que leyeron (carritos.py)
+    version = Column(Integer, nullable=False, default=0, server_default="0")
 
     usuario = relationship("Usuario", back_populates="carrito", uselist=False)
     items = relationship("ItemCarrito", back_populates="carrito", cascade="all, delete-orphan")
@@ -152,4 +185,136 @@ class ItemCarrito(Base):
     )
     
     carrito = relationship("Carrito", back_populates="items")
-    producto = relationship("Producto", back_populates="items_carrito")
\ No newline at end of file
+    producto = relationship("Producto", back_populates="items_carrito")
+
+class CacheVersion(Base):
+    """
+    Versión de cada espacio de nombres de caché (ver cache.py). Es el canal
+    de invalidación compartido entre workers: quien escribe incrementa la
+    versión y los demás procesos la leen periódicamente.
+    """
+    __tablename__ = "cache_versiones"
+
+    nombre = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+
+
+# --- ROLLUPS DE ANALÍTICA (ver analitica.py) ---
+# Acumulados por día que create_order actualiza en su transacción; los
+# reportes suman días en lugar de recorrer pedidos e items.
+
+class VentaDiaria(Base):
+    __tablename__ = "ventas_diarias"
+
+    fecha = Column(Date, primary_key=True)
+    pedidos = Column(Integer, nullable=False, default=0)
+    unidades = Column(Integer, nullable=False, default=0)
+    ingresos = Column(Float, nullable=False, default=0)
+
+class VentaProductoDiaria(Base):
+    __tablename__ = "ventas_productos_diarias"
+
+    fecha = Column(Date, primary_key=True)
+    # Sin FK: el histórico se conserva aunque el producto se borre
+    id_producto = Column(Integer, primary_key=True)
+    unidades = Column(Integer, nullable=False, default=0)
+    ingresos = Column(Float, nullable=False, default=0)
+
+class VentaCategoriaDiaria(Base):
+    __tablename__ = "ventas_categorias_diarias"
+
+    fecha = Column(Date, primary_key=True)
+    categoria = Column(String(50), primary_key=True)
+    unidades = Column(Integer, nullable=False, default=0)
+    ingresos = Column(Float, nullable=False, default=0)
+
+
+# --- ARCHIVO DE MENSAJERÍA (ver archivo_mensajes.py) ---
+# Conversaciones y mensajes viejos que salieron de las tablas activas. Mismas
+# columnas y mismos ids; sin FKs, porque una conversación archivada puede
+# apuntar a un mensaje que sigue activo (y al revés).
+
+class ConversacionArchivo(Base):
+    __tablename__ = "conversaciones_archivo"
+
+    id_conversacion = Column(Integer, primary_key=True)
+    id_usuario_remitente = Column(Integer, nullable=False)
+    id_usuario_destinatario = Column(Integer, nullable=False)
+    id_mensaje = Column(Integer, nullable=False)
+    fecha_envio = Column(DateTime)
+    leido = Column(Boolean, default=False)
+    tipo_participacion = Column(String(20), nullable=True)
+
+    __table_args__ = (
+        Index('ix_conversaciones_archivo_par_fecha', 'id_usuario_remitente', 'id_usuario_destinatario', 'fecha_envio'),
+    )
+
+class MensajeArchivo(Base):
+    __tablename__ = "mensajes_archivo"
+
+    id_mensaje = Column(Integer, primary_key=True)
+    id_usuario = Column(Integer, nullable=False)
+    asunto = Column(String(200), nullable=False)
+    mensaje = Column(Text, nullable=False)
+    fecha_mensaje = Column(DateTime)
+    estado = Column(String(20), default='no_leido')
+    tipo = Column(String(50), nullable=True)
+    email_contacto = Column(String(100), nullable=True)
+
+
+# --- REFRESH TOKENS (ver api/auth.py) ---
+# Solo se guarda el sha256 del token. Los tokens que salen de un mismo login
+# comparten 'familia': si se presenta uno ya rotado, se revoca la familia.
+
+class RefreshToken(Base):
+    __tablename__ = "refresh_tokens"
+
+    id_refresh_token = Column(Integer, primary_key=True, autoincrement=True)
+    id_usuario = Column(Integer, ForeignKey("usuario.id_usuario"), nullable=False)
+    token_hash = Column(String(64), nullable=False)
+    familia = Column(String(32), nullable=False)
+    fecha_creacion = Column(DateTime, default=func.now())
+    fecha_expiracion = Column(DateTime, nullable=False)
+    usado = Column(Boolean, nullable=False, default=False)
+    revocado = Column(Boolean, nullable=False, default=False)
+
+    __table_args__ = (
+        Index('ix_refresh_tokens_hash', 'token_hash', unique=True),
+        Index('ix_refresh_tokens_familia', 'familia'),
+        Index('ix_refresh_tokens_usuario', 'id_usuario'),
+    )
+
+
+# --- PRODUCTOS COMPRADOS JUNTOS (ver relacionados.py) ---
+# Los K productos que más veces aparecen en los mismos pedidos que cada
+# producto, ya ordenados: GET /products/{id}/related lee un rango de la PK.
+
+class ProductoRelacionado(Base):
+    __tablename__ = "productos_relacionados"
+
+    # Sin FK: se recalcula por lotes; la consulta cruza con 'productos'
+    id_producto = Column(Integer, primary_key=True)
+    posicion = Column(Integer, primary_key=True)
+    id_relacionado = Column(Integer, nullable=False)
+    pedidos = Column(Integer, nullable=False) # pedidos en los que aparecen juntos
+
+
+# --- DIFUSIONES (ver difusiones.py) ---
+# Un mensaje de un admin a muchos usuarios: el Mensaje se guarda una sola vez
+# y cada destinatario recibe su fila en 'conversaciones'. El reparto corre en
+# segundo plano y esta tabla lleva su progreso.
+
+class Difusion(Base):
+    __tablename__ = "difusiones"
+
+    id_difusion = Column(Integer, primary_key=True, autoincrement=True)
+    id_mensaje = Column(Integer, ForeignKey('mensajes.id_mensaje'), nullable=False)
+    id_usuario = Column(Integer, ForeignKey('usuario.id_usuario'), nullable=False) # el admin que la envía
+    destino = Column(String(20), nullable=False) # 'todos' | 'rol' | 'lista'
+    tipo_usuario = Column(String(20), nullable=True) # con destino 'rol'
+    total = Column(Integer, nullable=False, default=0)
+    enviados = Column(Integer, nullable=False, default=0)
+    # 'pendiente' | 'enviando' | 'completada' | 'interrumpida' | 'error'
+    estado = Column(String(20), nullable=False, default='pendiente')
+    fecha_creacion = Column(DateTime, default=func.now())
+    fecha_fin = Column(DateTime, nullable=True)
\ No newline at end of file
@@ -0,0 +1,148 @@
+# backend/relacionados.py
+# "Comprados juntos": para cada producto, los RELACIONADOS_TOP productos que
+# aparecen en más pedidos junto a él (tabla productos_relacionados, que lee
+# GET /api/products/{id}/related). Se recalcula desde backend/, p. ej. con
+# un cron nocturno:
+#
+#   python relacionados.py [--top 10] [--productos 5000]
+#
+# Memoria acotada: el cálculo se hace por pasadas sobre rangos de ids de
+# producto. Cada pasada recorre en orden de pedido (por índice, de a
+# RELACIONADOS_FILAS_POR_LECTURA filas) los pedidos con algún producto del
+# rango, cuenta los pares cuyo primer producto cae en el rango y guarda el
+# top del rango en una transacción corta, así puede correr con la app
+# levantada. La memoria depende de --productos, no de la cantidad de pedidos.
+
+import argparse
+import heapq
+import os
+from collections import Counter
+
+from sqlalchemy import bindparam, delete, func, insert, select
+from sqlalchemy.orm import Session
+
+import models
+from database import ReadSessionLocal, SessionLocal
+
+RELACIONADOS_TOP = int(os.getenv("RELACIONADOS_TOP", 10))
+RELACIONADOS_PRODUCTOS_POR_PASADA = int(os.getenv("RELACIONADOS_PRODUCTOS_POR_PASADA", 5000))
+RELACIONADOS_FILAS_POR_LECTURA = 10000
+
+_items = models.ItemPedido.__table__
+_relacionados = models.ProductoRelacionado.__table__
+
+# Solo los pedidos con algún producto del rango de la pasada. Sale del
+# índice ix_itemspedido_pedido_producto, sin ordenar en memoria
+_PEDIDOS_DEL_RANGO = select(_items.c.id_pedido).where(
+    _items.c.id_producto >= bindparam("desde"), _items.c.id_producto < bindparam("hasta")
+)
+_LINEAS_POR_PEDIDO = (
+    select(_items.c.id_pedido, _items.c.id_producto)
+    .where(_items.c.id_pedido.in_(_PEDIDOS_DEL_RANGO))
+    .order_by(_items.c.id_pedido)
+    .execution_options(yield_per=RELACIONADOS_FILAS_POR_LECTURA)
+)
+
+
+def _pedidos(db: Session, desde: int, hasta: int):
+    """ Productos distintos de cada pedido con más de un producto (y alguno del rango), de a un pedido. """
+    actual, productos = None, set()
+    for particion in db.execute(_LINEAS_POR_PEDIDO, {"desde": desde, "hasta": hasta}).partitions():
+        for id_pedido, id_producto in particion:
+            if id_pedido != actual:
+                if len(productos) > 1:
+                    yield productos
+                actual, productos = id_pedido, set()
+            productos.add(id_producto)
+    if len(productos) > 1:
+        yield productos
+
+
+def _contar_pasada(db: Session, desde: int, hasta: int) -> dict:
+    """ {id_producto: Counter(id_relacionado: pedidos)} de los productos en [desde, hasta). """
+    conteos = {}
+    for productos in _pedidos(db, desde, hasta):
+        for id_producto in productos:
+            if desde <= id_producto < hasta:
+                conteo = conteos.get(id_producto)
+                if conteo is None:
+                    conteo = conteos[id_producto] = Counter()
+                # Incluye al propio producto; se descarta al elegir el top
+                conteo.update(productos)
+    return conteos
+
+
+def _mejores(conteos: dict, top: int) -> list:
+    filas = []
+    for id_producto, conteo in conteos.items():
+        del conteo[id_producto]
+        # A igual cantidad de pedidos, el id más bajo (resultado estable)
+        mejores = heapq.nlargest(top, conteo.items(), key=lambda par: (par[1], -par[0]))
+        filas.extend(
+            {"id_producto": id_producto, "posicion": posicion, "id_relacionado": id_relacionado, "pedidos": pedidos}
+            for posicion, (id_relacionado, pedidos) in enumerate(mejores)
+        )
+    return filas
+
+
+def _guardar_pasada(db: Session, desde: int, hasta: int, filas: list):
+    """ Reemplaza los relacionados de los productos en [desde, hasta) en una transacción. """
+    db.connection().exec_driver_sql("BEGIN IMMEDIATE")
+    try:
+        db.execute(delete(_relacionados).where(
+            _relacionados.c.id_producto >= desde, _relacionados.c.id_producto < hasta
+        ))
+        if filas:
+            db.execute(insert(_relacionados), filas)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+
+def recalcular(top: int = RELACIONADOS_TOP, productos_por_pasada: int = RELACIONADOS_PRODUCTOS_POR_PASADA) -> int:
+    """
+    Recalcula productos_relacionados desde los pedidos, de a
+    'productos_por_pasada' ids de producto por pasada. Devuelve la cantidad
+    de productos con relacionados.
+    """
+    lectura = ReadSessionLocal()
+    escritura = SessionLocal()
+    try:
+        # También los ids que ya no venden, para limpiar sus filas viejas
+        maximo = max(
+            lectura.execute(select(func.max(_items.c.id_producto))).scalar() or 0,
+            lectura.execute(select(func.max(_relacionados.c.id_producto))).scalar() or 0,
+        )
+        lectura.rollback()
+
+        con_relacionados = 0
+        for desde in range(0, maximo + 1, productos_por_pasada):
+            hasta = desde + productos_por_pasada
+            conteos = _contar_pasada(lectura, desde, hasta)
+            lectura.rollback()
+            filas = _mejores(conteos, top)
+            con_relacionados += len(conteos)
+            _guardar_pasada(escritura, desde, hasta, filas)
+            print(f"Relacionados recalculados: productos {desde} a {hasta - 1} ({len(conteos)} con compras en común)")
+        return con_relacionados
+    finally:
+        lectura.close()
+        escritura.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recalcula los productos comprados juntos desde los pedidos.")
+    parser.add_argument("--top", type=int, default=RELACIONADOS_TOP, help="Relacionados por producto")
+    parser.add_argument(
+        "--productos", type=int, default=RELACIONADOS_PRODUCTOS_POR_PASADA,
+        help="Ids de producto por pasada (acota la memoria)",
+    )
+    args = parser.parse_args()
+
+    productos = recalcular(max(args.top, 1), max(args.productos, 1))
+    print(f"Listo: {productos} producto(s) con relacionados.")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@
 from fastapi import APIRouter
 
 # Importamos los routers individuales desde la nueva carpeta 'api'
-from api import products, cart, orders, messages, auth
+from api import products, cart, orders, messages, auth, analytics, sistema, batch
 
 router = APIRouter()
 
@@ -17,6 +17,9 @@ router.include_router(products.router, prefix="/api", tags=["Productos"])
 router.include_router(cart.router, prefix="/api", tags=["Carrito"])
 router.include_router(orders.router, prefix="/api", tags=["Pedidos"])
 router.include_router(messages.router, prefix="/api", tags=["Mensajería"])
+router.include_router(analytics.router, prefix="/api", tags=["Analítica"])
+router.include_router(sistema.router, prefix="/api", tags=["Sistema"])
+router.include_router(batch.router, prefix="/api", tags=["Lotes"])
 
 @router.get("/")
 def root():
@@ -1,8 +1,8 @@
 # backend/schemas.py
 
-from pydantic import BaseModel, Field
-from typing import List, Optional
-from datetime import datetime
+from pydantic import BaseModel, Field, model_validator
+from typing import Any, Dict, List, Literal, Optional
+from datetime import date, datetime
 
 # ============= SCHEMAS DE PRODUCTO (Issues 3 y 4) =============
 
@@ -27,6 +27,88 @@ class ProductoResponse(ProductoBase):
     class Config:
         from_attributes = True
 
+# Schemas para la importación masiva (POST /products/bulk)
+class ProductoImportError(BaseModel):
+    """ Error de validación o de escritura de una fila del archivo importado """
+    fila: int
+    detalle: str
+
+class ProductoImportResponse(BaseModel):
+    """ Resumen de la importación masiva de productos """
+    filas_procesadas: int
+    importados: int
+    errores: List[ProductoImportError] = Field(default_factory=list)
+    # Errores no listados por superar el máximo reportado
+    errores_omitidos: int = 0
+
+# Schemas para la actualización masiva de stock/precio (PATCH /products/stock)
+class ProductoStockItem(BaseModel):
+    id_producto: int
+    stock: Optional[int] = None
+    precio: Optional[float] = Field(default=None, gt=0)
+    # 'absoluto' reemplaza el stock; 'delta' lo suma (puede ser negativo).
+    # El precio siempre es un valor absoluto.
+    modo: Literal["absoluto", "delta"] = "absoluto"
+
+    @model_validator(mode="after")
+    def validar_valores(self):
+        if self.stock is None and self.precio is None:
+            raise ValueError("Se debe indicar stock y/o precio")
+        if self.modo == "absoluto" and self.stock is not None and self.stock < 0:
+            raise ValueError("El stock absoluto no puede ser negativo")
+        return self
+
+class ProductoStockBatch(BaseModel):
+    items: List[ProductoStockItem] = Field(..., min_length=1)
+
+    @model_validator(mode="after")
+    def validar_ids_unicos(self):
+        # Los cambios se aplican agrupados por forma, no en el orden del
+        # lote: dos items del mismo producto darían un resultado ambiguo
+        vistos, repetidos = set(), set()
+        for item in self.items:
+            (repetidos if item.id_producto in vistos else vistos).add(item.id_producto)
+        if repetidos:
+            raise ValueError(
+                f"Cada producto puede aparecer una sola vez por lote (repetidos: {', '.join(map(str, sorted(repetidos)))})"
+            )
+        return self
+
+class ProductoStockBatchResponse(BaseModel):
+    actualizados: int
+    ids_inexistentes: List[int] = Field(default_factory=list)
+
+# Schemas de facetas para los menús de filtros (GET /products/facets)
+class FacetaValor(BaseModel):
+    valor: str
+    cantidad: int
+
+class FacetaRangoPrecio(BaseModel):
+    desde: Optional[float] = None  # None = sin límite inferior
+    hasta: Optional[float] = None  # None = sin límite superior
+    cantidad: int
+
+class FacetasResponse(BaseModel):
+    total: int
+    categorias: List[FacetaValor] = Field(default_factory=list)
+    marcas: List[FacetaValor] = Field(default_factory=list)
+    precios: List[FacetaRangoPrecio] = Field(default_factory=list)
+
+# Sugerencias del autocompletado (GET /products/suggest)
+class ProductoSugerenciaResponse(BaseModel):
+    id_producto: int
+    nombre_producto: str
+    marca: str
+
+# "Comprados juntos" (GET /products/{id}/related)
+class ProductoRelacionadoResponse(BaseModel):
+    id_producto: int
+    nombre_producto: str
+    precio: float
+    stock: Optional[int] = None
+    imagen: Optional[str] = None
+    pedidos: int # pedidos en los que aparece junto al producto consultado
+
 # ============= SCHEMAS CARRITO (Issue 5) =============
 
 # Schema para mostrar detalles del producto DENTRO del carrito
@@ -41,9 +123,10 @@ class ProductoEnCarritoResponse(BaseModel):
 
 # Schema para un ítem individual en el carrito (respuesta)
 class ItemCarritoResponse(BaseModel):
-    id_item_carrito: int
+    id_item_carrito: Optional[int] = None # Se asigna al escribirse el carrito en la base
     id_producto: int
     cantidad: int
+    subtotal: Optional[float] = None # precio * cantidad (None si el producto ya no existe)
     producto: ProductoEnCarritoResponse # Objeto anidado con detalles del producto
 
     class Config:
@@ -54,6 +137,8 @@ class CarritoResponse(BaseModel):
     id_usuario: int # ID del dueño del carrito
     fecha_actualizacion: Optional[datetime] = None
     items: List[ItemCarritoResponse] = Field(default_factory=list)
+    total: float = 0 # Suma de los subtotales, mantenida por el servidor
+    cantidad_items: int = 0 # Unidades en el carrito
 
     class Config:
         from_attributes = True
@@ -94,6 +179,71 @@ class PedidoResponse(BaseModel):
     class Config:
         from_attributes = True
 
+# ============= SCHEMAS DE ANALÍTICA =============
+
+class VentaDiariaResponse(BaseModel):
+    """ Ventas de un día (GET /analytics/revenue) """
+    fecha: date
+    pedidos: int
+    unidades: int
+    ingresos: float
+
+class VentaProductoResponse(BaseModel):
+    """ Ventas acumuladas de un producto en el rango (GET /analytics/top-products) """
+    id_producto: int
+    nombre_producto: Optional[str] = None # None si el producto se borró
+    unidades: int
+    ingresos: float
+
+class VentaCategoriaResponse(BaseModel):
+    """ Ventas acumuladas de una categoría en el rango (GET /analytics/categories) """
+    categoria: str
+    unidades: int
+    ingresos: float
+
+# ============= SCHEMAS DE SISTEMA =============
+
+class AdmisionClaseResponse(BaseModel):
+    """ Métricas del control de admisión de una clase de ruta (GET /sistema/admision) """
+    en_curso: int
+    esperando: int
+    admitidos: int
+    encolados: int
+    rechazados: int
+    vencidos: int
+    espera_promedio_ms: float
+    espera_max_ms: float
+
+class ArranqueResponse(BaseModel):
+    """ Estado del arranque del proceso (GET /sistema/listo) """
+    listo: bool
+    importacion_ms: Optional[float] = None
+    calentamiento_ms: Optional[float] = None
+    pasos: Dict[str, float] # milisegundos por paso de calentamiento
+
+class CacheSentenciasResponse(BaseModel):
+    """ Caché de sentencias compiladas (GET /sistema/consultas) """
+    aciertos: int
+    fallos: int
+    sin_cache: int # SQL textual o sentencias sin clave de caché
+    tasa_aciertos: float # aciertos / (aciertos + fallos)
+    tamanio_maximo: int
+
+# ============= SCHEMAS DE LOTES (POST /batch) =============
+
+class BatchRequest(BaseModel):
+    """ GETs internos a ejecutar en un solo request, p. ej. "/api/products?page=1&view=card" """
+    rutas: List[str] = Field(..., min_length=1)
+
+class BatchItemResponse(BaseModel):
+    ruta: str
+    status: int
+    headers: Dict[str, str] # los de la sub-respuesta, p. ej. X-Next-Cursor
+    cuerpo: Any = None
+
+class BatchResponse(BaseModel):
+    respuestas: List[BatchItemResponse] # en el mismo orden que 'rutas'
+
 # ============= SCHEMAS DE MENSAJERÍA (Issue 7) =============
 
 # --- AUXILIAR: Para mostrar quién participa sin exponer contraseñas ---
@@ -152,6 +302,34 @@ class NotificacionUnreadResponse(BaseModel):
     # El número total de conversaciones que tienen al menos un mensaje no leído
     total_conversaciones_no_leidas: int
 
+# ============= SCHEMAS DE DIFUSIONES =============
+
+class DifusionCreate(BaseModel):
+    """ Mensaje de un admin a todos los usuarios, a un rol o a una lista (POST /broadcasts) """
+    asunto: str = Field(default="Aviso", min_length=1, max_length=200)
+    contenido: str = Field(..., min_length=1)
+    tipo_usuario: Optional[str] = Field(default=None, max_length=20) # p. ej. 'cliente'
+    ids_usuario: Optional[List[int]] = Field(default=None, min_length=1)
+
+    @model_validator(mode="after")
+    def validar_destino(self):
+        if self.tipo_usuario is not None and self.ids_usuario is not None:
+            raise ValueError("Se debe indicar tipo_usuario o ids_usuario, no ambos")
+        return self
+
+class DifusionResponse(BaseModel):
+    """ Progreso de una difusión (GET /broadcasts/{id}) """
+    id_difusion: int
+    id_mensaje: int
+    destino: str
+    tipo_usuario: Optional[str] = None
+    total: int
+    enviados: int
+    estado: str
+    fecha_creacion: Optional[datetime] = None
+    fecha_fin: Optional[datetime] = None
+    ids_inexistentes: List[int] = Field(default_factory=list) # solo al crearla, con ids_usuario
+
 # =====================================================================
 # SCHEMAS DE AUTENTICACIÓN (Issue 9)
 # =====================================================================
@@ -185,6 +363,11 @@ class Token(BaseModel):
     """ Schema para la respuesta del Login (el token JWT) """
     access_token: str
     token_type: str
+    refresh_token: Optional[str] = None # Para POST /auth/refresh
+
+class RefreshTokenRequest(BaseModel):
+    """ Schema para POST /auth/refresh y /auth/logout """
+    refresh_token: str
 
 class TokenData(BaseModel):
     """ Schema para el contenido (payload) decodificado del JWT """
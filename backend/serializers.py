@@ -0,0 +1,29 @@
+# backend/serializers.py
+
+from typing import Any, Optional
+
+from fastapi import Response
+from pydantic_core import to_json
+
+# =====================================================================
+# SERIALIZACIÓN RÁPIDA A JSON
+# =====================================================================
+# Los endpoints de listas devuelven filas de consultas por columnas (no
+# objetos ORM) ya convertidas a dict. Al devolver un Response, FastAPI no
+# vuelve a validar contra el 'response_model' (que se mantiene para la
+# documentación): los dicts se pasan directo a bytes JSON con pydantic_core.
+
+
+def filas_a_dicts(filas) -> list:
+    """ Convierte filas de SQLAlchemy (Row) en dicts. """
+    return [fila._asdict() for fila in filas]
+
+
+def json_response(datos: Any, status_code: int = 200, headers: Optional[dict] = None) -> Response:
+    """ Serializa 'datos' (dicts, listas, fechas...) directo a bytes JSON. """
+    return Response(
+        content=to_json(datos),
+        status_code=status_code,
+        headers=headers,
+        media_type="application/json",
+    )
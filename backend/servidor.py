@@ -0,0 +1,65 @@
+# backend/servidor.py
+# Lanzador del API con varios workers (procesos). Uso, desde backend/:
+#
+#   WEB_WORKERS=4 python servidor.py
+#
+# - Con gunicorn instalado: la app se importa una vez en el proceso maestro
+#   (preload) y los workers se crean con fork compartiendo esa memoria.
+#   'kill -HUP <pid maestro>' recarga los workers sin cortar conexiones.
+# - Sin gunicorn: supervisor multiproceso de uvicorn. 'kill -HUP <pid>'
+#   reinicia los workers y SIGTTIN / SIGTTOU suman o restan uno.
+#
+# Las cachés en memoria se mantienen coherentes entre workers a través de la
+# tabla 'cache_versiones' (ver cache.py).
+
+import os
+
+import uvicorn
+from dotenv import load_dotenv
+
+load_dotenv()
+
+WEB_HOST = os.getenv("WEB_HOST", "0.0.0.0")
+WEB_PORT = int(os.getenv("WEB_PORT", 8000))
+WEB_WORKERS = int(os.getenv("WEB_WORKERS", 1))
+# Segundos que se espera a los requests en curso al reiniciar/apagar
+WEB_GRACEFUL_TIMEOUT = int(os.getenv("WEB_GRACEFUL_TIMEOUT", 30))
+
+
+def _lanzar_gunicorn() -> bool:
+    """ Lanza gunicorn con workers de uvicorn. Devuelve False si no está instalado. """
+    try:
+        from gunicorn.app.base import BaseApplication
+    except ImportError:
+        return False
+
+    class _AplicacionGunicorn(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{WEB_HOST}:{WEB_PORT}")
+            self.cfg.set("workers", WEB_WORKERS)
+            self.cfg.set("worker_class", "uvicorn.workers.UvicornWorker")
+            self.cfg.set("preload_app", True)
+            self.cfg.set("graceful_timeout", WEB_GRACEFUL_TIMEOUT)
+
+        def load(self):
+            from main import app
+            return app
+
+    _AplicacionGunicorn().run()
+    return True
+
+
+def main():
+    if WEB_WORKERS > 1 and _lanzar_gunicorn():
+        return
+    uvicorn.run(
+        "main:app",
+        host=WEB_HOST,
+        port=WEB_PORT,
+        workers=WEB_WORKERS,
+        timeout_graceful_shutdown=WEB_GRACEFUL_TIMEOUT,
+    )
+
+
+if __name__ == "__main__":
+    main()
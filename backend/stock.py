@@ -0,0 +1,95 @@
+# backend/stock.py
+
+import threading
+
+from sqlalchemy import bindparam, select
+from sqlalchemy.orm import Session
+
+import cache
+import models
+from database import ReadSessionLocal
+
+# =====================================================================
+# DISPONIBILIDAD DE STOCK EN MEMORIA
+# =====================================================================
+# Mapa id_producto -> stock disponible para las validaciones del carrito,
+# que así no leen la tabla 'productos'. Es solo una estimación: el
+# descuento real se valida dentro de la transacción del pedido.
+#
+# Quien cambia el stock (pedidos, edición de productos) primero incrementa
+# la versión 'stock' (ver cache.py) y después actualiza el mapa con
+# 'fijar' o 'invalidar'. Si la versión cambia por otro worker, el mapa se
+# descarta entero y se vuelve a cargar a demanda.
+
+_STOCK_POR_IDS = select(models.Producto.id_producto, models.Producto.stock).where(
+    models.Producto.id_producto.in_(bindparam("ids", expanding=True))
+)
+
+
+class DisponibilidadStock:
+
+    def __init__(self):
+        self._stock = {}
+        self._lock = threading.Lock()
+        self._version_vista = None
+
+    def consultar(self, ids, db: Session = None) -> dict:
+        """
+        Devuelve {id_producto: stock} de los ids pedidos (los inexistentes no
+        aparecen). Los que no están en memoria se leen con 'db' (la sesión del
+        request) o, sin ella, con una sesión de lectura propia.
+        """
+        version = cache.get_version(cache.STOCK)
+        with self._lock:
+            if version != self._version_vista:
+                self._stock.clear()
+                self._version_vista = version
+            disponibles = {id_producto: self._stock[id_producto] for id_producto in ids if id_producto in self._stock}
+        faltantes = [id_producto for id_producto in ids if id_producto not in disponibles]
+        if not faltantes:
+            return disponibles
+
+        if db is not None:
+            filas = db.execute(_STOCK_POR_IDS, {"ids": faltantes}).all()
+        else:
+            db = ReadSessionLocal()
+            try:
+                filas = db.execute(_STOCK_POR_IDS, {"ids": faltantes}).all()
+            finally:
+                db.close()
+
+        leidos = {id_producto: stock or 0 for id_producto, stock in filas}
+        with self._lock:
+            # Si el stock cambió mientras se leía, no se guarda lo leído
+            if self._version_vista == version:
+                self._stock.update(leidos)
+        disponibles.update(leidos)
+        return disponibles
+
+    def fijar(self, stocks: dict):
+        """ Registra el stock nuevo de los productos (tras incrementar la versión 'stock'). """
+        with self._lock:
+            self._sincronizar()
+            self._stock.update(stocks)
+
+    def invalidar(self, ids=None):
+        """ Olvida el stock de los ids indicados (de todos si es None); se relee a demanda. """
+        with self._lock:
+            self._sincronizar()
+            if ids is None:
+                self._stock.clear()
+            else:
+                for id_producto in ids:
+                    self._stock.pop(id_producto, None)
+
+    def _sincronizar(self):
+        # La versión acaba de incrementarla quien llama: se toma como vista
+        # para no descartar el mapa por un cambio propio.
+        version = cache.get_version(cache.STOCK)
+        if self._version_vista is not None and version != self._version_vista + 1:
+            # Hubo otros cambios además del propio: se descarta todo
+            self._stock.clear()
+        self._version_vista = version
+
+
+disponibilidad_stock = DisponibilidadStock()
@@ -0,0 +1,202 @@
+# backend/sugerencias.py
+
+import heapq
+import os
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from itertools import islice
+
+from sqlalchemy import func, select
+
+import cache
+import models
+from database import ReadSessionLocal
+from tareas import TareaPeriodica
+
+# =====================================================================
+# AUTOCOMPLETADO DE PRODUCTOS
+# =====================================================================
+# Índice en memoria para GET /api/products/suggest: una lista ordenada de
+# pares (token, id_producto) con los tokens normalizados (minúsculas, sin
+# acentos) de nombre_producto y marca. Un prefijo se resuelve con dos
+# búsquedas binarias, sin tocar la base; con varios términos se intersectan
+# los productos de cada uno. Los resultados se ordenan por unidades
+# vendidas (itemspedido).
+#
+# Las altas, bajas y cambios de nombre o marca incrementan la versión
+# 'nombres' (ver cache.py) y después actualizan el índice con 'agregar' o
+# 'quitar', como el stock en stock.py. Si la versión cambia por otro
+# worker, el índice se vuelve a armar entero en la próxima consulta. Las
+# ventas se releen cada SUGERENCIAS_INTERVALO_VENTAS segundos.
+
+SUGERENCIAS_INTERVALO_VENTAS = float(os.getenv("SUGERENCIAS_INTERVALO_VENTAS", 300))
+
+_PALABRA = re.compile(r"[^\W_]+")
+# Mayor que cualquier token que empiece con el prefijo
+_FIN_PREFIJO = "\U0010ffff"
+# Con más coincidencias que esto por resultado pedido, conviene recorrer el
+# ranking hasta juntar 'limite' en vez de ordenar las coincidencias
+_COINCIDENCIAS_POR_RESULTADO = 32
+
+_PRODUCTOS = select(models.Producto.id_producto, models.Producto.nombre_producto, models.Producto.marca)
+_VENTAS = select(
+    models.ItemPedido.id_producto, func.sum(models.ItemPedido.cantidad)
+).group_by(models.ItemPedido.id_producto)
+
+
+def normalizar(texto: str) -> str:
+    """ Minúsculas y sin acentos: 'Cámara Sony' -> 'camara sony'. """
+    descompuesto = unicodedata.normalize("NFKD", texto.casefold())
+    return "".join(c for c in descompuesto if not unicodedata.combining(c))
+
+
+def tokenizar(texto: str) -> list:
+    """ Palabras normalizadas de 'texto', sin repetir y en orden. """
+    return list(dict.fromkeys(_PALABRA.findall(normalizar(texto or ""))))
+
+
+class IndiceSugerencias:
+
+    def __init__(self):
+        self._tokens = []     # (token, id_producto), ordenados
+        self._ids = []        # id_producto de cada posición de _tokens
+        self._productos = {}  # id_producto -> (nombre_producto, marca, tokens, nombre normalizado)
+        self._ventas = {}     # id_producto -> unidades vendidas
+        self._orden = []      # id_producto, los más vendidos primero (luego por nombre)
+        self._rango = {}      # id_producto -> posición en _orden
+        self._lock = threading.Lock()
+        self._lock_carga = threading.Lock()
+        self._version_vista = None
+
+    def sugerir(self, texto: str, limite: int) -> list:
+        """ Productos cuyos tokens empiezan con cada término de 'texto', los más vendidos primero. """
+        terminos = tokenizar(texto)
+        if not terminos:
+            return []
+        self.cargar()
+        with self._lock:
+            ids = None
+            # Los términos más largos primero: rangos más cortos
+            for termino in sorted(terminos, key=len, reverse=True):
+                desde = bisect_left(self._tokens, (termino,))
+                hasta = bisect_left(self._tokens, (termino + _FIN_PREFIJO,), desde)
+                coincidencias = set(self._ids[desde:hasta])
+                ids = coincidencias if ids is None else ids & coincidencias
+                if not ids:
+                    return []
+            if len(ids) > limite * _COINCIDENCIAS_POR_RESULTADO:
+                mejores = list(islice((i for i in self._orden if i in ids), limite))
+            else:
+                mejores = heapq.nsmallest(limite, ids, key=self._rango.__getitem__)
+            productos = self._productos
+            return [
+                {"id_producto": i, "nombre_producto": productos[i][0], "marca": productos[i][1]}
+                for i in mejores
+            ]
+
+    def cargar(self):
+        """ Arma el índice si todavía no está o si la versión 'nombres' cambió. """
+        version = cache.get_version(cache.NOMBRES)
+        if version == self._version_vista:
+            return
+        with self._lock_carga:
+            if version == self._version_vista:
+                return
+            # La versión se lee ANTES de leer los productos: si hubo una
+            # escritura mientras tanto, la próxima consulta vuelve a armarlo
+            db = ReadSessionLocal()
+            try:
+                filas = db.execute(_PRODUCTOS).all()
+                ventas = dict(db.execute(_VENTAS).all())
+            finally:
+                db.close()
+
+            productos = {}
+            tokens = []
+            for id_producto, nombre, marca in filas:
+                palabras = tokenizar(f"{nombre} {marca}")
+                productos[id_producto] = (nombre, marca, palabras, normalizar(nombre))
+                tokens.extend((palabra, id_producto) for palabra in palabras)
+            tokens.sort()
+            with self._lock:
+                self._tokens = tokens
+                self._ids = [id_producto for _, id_producto in tokens]
+                self._productos = productos
+                self._ventas = ventas
+                self._ordenar()
+                self._version_vista = version
+
+    def refrescar_ventas(self):
+        """ Relee las unidades vendidas por producto (tarea periódica). """
+        if self._version_vista is None:
+            return
+        db = ReadSessionLocal()
+        try:
+            ventas = dict(db.execute(_VENTAS).all())
+        finally:
+            db.close()
+        with self._lock:
+            self._ventas = ventas
+            self._ordenar()
+
+    def agregar(self, id_producto: int, nombre: str, marca: str):
+        """ Registra un producto nuevo o editado (tras incrementar la versión 'nombres'). """
+        with self._lock:
+            if not self._sincronizar():
+                return
+            self._quitar(id_producto)
+            palabras = tokenizar(f"{nombre} {marca}")
+            self._productos[id_producto] = (nombre, marca, palabras, normalizar(nombre))
+            for palabra in palabras:
+                posicion = bisect_left(self._tokens, (palabra, id_producto))
+                self._tokens.insert(posicion, (palabra, id_producto))
+                self._ids.insert(posicion, id_producto)
+            self._ordenar()
+
+    def quitar(self, id_producto: int):
+        """ Saca un producto borrado (tras incrementar la versión 'nombres'). """
+        with self._lock:
+            if self._sincronizar():
+                self._quitar(id_producto)
+                self._ordenar()
+
+    def invalidar(self):
+        """ Descarta el índice entero; se vuelve a armar en la próxima consulta. """
+        with self._lock:
+            self._version_vista = None
+
+    def _quitar(self, id_producto: int):
+        anterior = self._productos.pop(id_producto, None)
+        if anterior is None:
+            return
+        for palabra in anterior[2]:
+            posicion = bisect_left(self._tokens, (palabra, id_producto))
+            if posicion < len(self._tokens) and self._tokens[posicion] == (palabra, id_producto):
+                del self._tokens[posicion]
+                del self._ids[posicion]
+
+    def _ordenar(self):
+        ventas, productos = self._ventas, self._productos
+        self._orden = sorted(productos, key=lambda i: (-ventas.get(i, 0), productos[i][3], i))
+        self._rango = {id_producto: posicion for posicion, id_producto in enumerate(self._orden)}
+
+    def _sincronizar(self) -> bool:
+        # La versión acaba de incrementarla quien llama: si solo cambió por
+        # eso, el índice se actualiza en el lugar. False si hay que rearmarlo.
+        if self._version_vista is None:
+            return False
+        version = cache.get_version(cache.NOMBRES)
+        if version != self._version_vista + 1:
+            # Hubo otros cambios además del propio
+            self._version_vista = None
+            return False
+        self._version_vista = version
+        return True
+
+
+indice_sugerencias = IndiceSugerencias()
+tarea_ventas_sugerencias = TareaPeriodica(
+    "sugerencias-ventas", SUGERENCIAS_INTERVALO_VENTAS, indice_sugerencias.refrescar_ventas
+)
@@ -0,0 +1,47 @@
+# backend/tareas.py
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# =====================================================================
+# TAREAS PERIÓDICAS EN SEGUNDO PLANO
+# =====================================================================
+# Un hilo por tarea que llama a 'fn()' cada 'intervalo' segundos. Se
+# arrancan en el lifespan de la app (main.py) y no al importar: con
+# gunicorn --preload la app se importa en el maestro y los hilos no
+# sobreviven al fork de los workers.
+
+
+class TareaPeriodica:
+
+    def __init__(self, nombre: str, intervalo: float, fn):
+        self.nombre = nombre
+        self.intervalo = intervalo
+        self.fn = fn
+        self._hilo = None
+        self._detener = threading.Event()
+
+    def iniciar(self):
+        if self._hilo is not None:
+            return
+        self._detener.clear()
+        self._hilo = threading.Thread(target=self._bucle, name=self.nombre, daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        """ Detiene el hilo (espera a que termine la ejecución en curso). """
+        if self._hilo is None:
+            return
+        self._detener.set()
+        self._hilo.join()
+        self._hilo = None
+
+    def _bucle(self):
+        while not self._detener.wait(self.intervalo):
+            try:
+                self.fn()
+            except Exception:
+                # Un error no debe matar la tarea: se reintenta en el próximo ciclo
+                logger.exception("Error en la tarea periódica '%s'", self.nombre)
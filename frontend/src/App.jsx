@@ -18,6 +18,39 @@ apiClient.interceptors.request.use(
   (error) => Promise.reject(error)
 );
 
+// Si el access token venció, se renueva una vez con el refresh token
+// (sin volver a pedir la contraseña) y se reintenta el request
+apiClient.interceptors.response.use(
+  (response) => response,
+  async (error) => {
+    const original = error.config;
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (error.response?.status !== 401 || !refreshToken || original._reintentado || original.url === '/api/auth/refresh') {
+      return Promise.reject(error);
+    }
+    original._reintentado = true;
+    try {
+      const { data } = await apiClient.post('/api/auth/refresh', { refresh_token: refreshToken });
+      localStorage.setItem('token', data.access_token);
+      localStorage.setItem('refresh_token', data.refresh_token);
+      return apiClient(original);
+    } catch (refreshError) {
+      localStorage.removeItem('refresh_token');
+      return Promise.reject(error);
+    }
+  }
+);
+
+// Varios GETs en un solo request (POST /api/batch): un JWT, una sesión y
+// una respuesta. Devuelve los cuerpos en el mismo orden que 'rutas'
+const getLote = async (rutas) => {
+  const { data } = await apiClient.post('/api/batch', { rutas });
+  return data.respuestas.map(({ ruta, status, cuerpo }) => {
+    if (status >= 400) throw new Error(`${ruta}: ${cuerpo?.detail || status}`);
+    return cuerpo;
+  });
+};
+
 function App() {
   // --- Estados Auth ---
   const [registerForm, setRegisterForm] = useState({ nombre_usuario: '', email: '', password: '', nombre: '', apellido: '' });
@@ -54,18 +87,19 @@ function App() {
           if (searchTerm) params.append('search', searchTerm);
           if (category) params.append('category', category);
 
-          // Peticiones en paralelo
-          const [prodRes, countRes, cartRes, ordersRes] = await Promise.all([
-            apiClient.get(`/api/products?${params.toString()}`),
-            apiClient.get(`/api/products/count?${params.toString()}`),
-            apiClient.get('/api/cart'),
-            apiClient.get('/api/orders')
+          // Todo en un solo request
+          const [productos, conteo, carrito, pedidos] = await getLote([
+            // La grilla solo usa los campos de la vista 'card'
+            `/api/products?${params.toString()}&view=card`,
+            `/api/products/count?${params.toString()}`,
+            '/api/cart',
+            '/api/orders'
           ]);
 
-          setProducts(prodRes.data);
-          setTotalPages(Math.ceil(countRes.data.total / LIMIT));
-          setCart(cartRes.data);
-          setOrders(ordersRes.data);
+          setProducts(productos);
+          setTotalPages(Math.ceil(conteo.total / LIMIT));
+          setCart(carrito);
+          setOrders(pedidos);
 
         } catch (err) {
           console.error("Error:", err);
@@ -105,11 +139,14 @@ function App() {
       });
       setToken(response.data.access_token);
       localStorage.setItem('token', response.data.access_token);
+      localStorage.setItem('refresh_token', response.data.refresh_token);
     } catch (err) { setError(err.response?.data?.detail || 'Error en login'); }
   };
 
   const handleLogout = () => {
-    setToken(null); localStorage.removeItem('token');
+    const refreshToken = localStorage.getItem('refresh_token');
+    if (refreshToken) apiClient.post('/api/auth/logout', { refresh_token: refreshToken }).catch(() => {});
+    setToken(null); localStorage.removeItem('token'); localStorage.removeItem('refresh_token');
     setProducts([]); setCart(null); setView('catalog');
   };
 
@@ -130,10 +167,9 @@ function App() {
       const response = await apiClient.post('/api/orders');
       alert(`¡Compra exitosa! Orden #${response.data.id_pedido} generada.`);
       // Recargar datos y limpiar vista
-      const newCart = await apiClient.get('/api/cart');
-      const newOrders = await apiClient.get('/api/orders');
-      setCart(newCart.data);
-      setOrders(newOrders.data);
+      const [newCart, newOrders] = await getLote(['/api/cart', '/api/orders']);
+      setCart(newCart);
+      setOrders(newOrders);
       setView('orders'); // Llevar al historial
     } catch (err) { 
       alert(`Error al comprar: ${err.response?.data?.detail || 'Error desconocido'}`); 
@@ -142,7 +178,8 @@ function App() {
 
   const calculateTotal = () => {
     if (!cart) return 0;
-    return cart.items.reduce((acc, item) => acc + (item.producto.precio * item.cantidad), 0).toFixed(2);
+    // El servidor mantiene el total del carrito
+    return Number(cart.total ?? 0).toFixed(2);
   };
   
   // --- ADMIN HANDLERS (NUEVO) ---
@@ -288,11 +325,11 @@ function App() {
                   </thead>
                   <tbody>
                     {cart.items.map((item) => (
-                      <tr key={item.id_item_carrito}>
+                      <tr key={item.id_producto}>
                         <td>{item.producto.nombre_producto}</td>
                         <td>{item.cantidad}</td>
                         <td>${item.producto.precio}</td>
-                        <td>${(item.producto.precio * item.cantidad).toFixed(2)}</td>
+                        <td>${(item.subtotal ?? item.producto.precio * item.cantidad).toFixed(2)}</td>
                       </tr>
                     ))}
                   </tbody>